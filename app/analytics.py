@@ -0,0 +1,365 @@
+# app/analytics.py
+# Сводки прохождения курсов для администраторов: фоновое инкрементальное обновление
+# таблиц course_analytics / lesson_analytics. Полный пересчёт: python -m app.analytics
+
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import and_, bindparam, case, delete, exists, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.database import AsyncSessionLocal
+from app.database.upsert import insert_for
+from app.models import utcnow
+from app.models.analytics import AnalyticsState, CourseAnalytics, LessonAnalytics
+from app.models.course import Course
+from app.models.course_progress import CourseProgressCounter
+from app.models.lesson import Lesson
+from app.models.progress import Progress
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Период фонового обновления в секундах; 0 - не запускать (только вручную).
+ANALYTICS_REFRESH_SECONDS = int(os.getenv("ANALYTICS_REFRESH_SECONDS", "300"))
+# Насколько водяной знак отстаёт от начала обновления: прогресс из ещё не
+# зафиксированных транзакций с более ранним updated_at должен попасть в следующий проход.
+ANALYTICS_LAG_SECONDS = int(os.getenv("ANALYTICS_LAG_SECONDS", "60"))
+# Окно «активных» учащихся: отмечали уроки за последние N дней.
+ANALYTICS_ACTIVE_DAYS = int(os.getenv("ANALYTICS_ACTIVE_DAYS", "7"))
+# Сколько курсов пересчитывать одним запросом (размер списка IN).
+ANALYTICS_BATCH_ROWS = 500
+# Ключ advisory-блокировки PostgreSQL: обновляет только один воркер.
+ANALYTICS_LOCK_ID = 7_310_201
+ANALYTICS_STATE_ID = 1
+
+
+def _chunks(items: list, size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+async def _try_lock(db: AsyncSession) -> bool:
+    if db.bind.dialect.name != "postgresql":
+        # SQLite: блокировки нет - от двойного учёта защищает захват окна в _claim_window.
+        return True
+    # Блокировка транзакционная - снимается при commit/rollback.
+    return bool((await db.execute(select(func.pg_try_advisory_xact_lock(ANALYTICS_LOCK_ID)))).scalar())
+
+
+async def _claim_window(db: AsyncSession, until: datetime) -> Optional[tuple[Optional[datetime], datetime]]:
+    """
+    Захватывает окно обновления: сдвигает водяной знак сравнением с прочитанным
+    значением (compare-and-set) первой записью транзакции. Два воркера, прочитавшие
+    один и тот же знак, не прибавят одни и те же прохождения дважды - у второго
+    UPDATE не найдёт строку, и он откатится. Возвращает (прежний знак, новый) или None.
+    """
+    await db.execute(
+        insert_for(db, AnalyticsState)
+        .values(id=ANALYTICS_STATE_ID, courses=0, lessons=0)
+        .on_conflict_do_nothing(index_elements=[AnalyticsState.id])
+    )
+    watermark = await db.scalar(select(AnalyticsState.watermark).where(AnalyticsState.id == ANALYTICS_STATE_ID))
+    if watermark is not None and until < watermark:
+        # Отставание увеличили между запусками - окно пустое, знак не сдвигаем назад.
+        until = watermark
+    claimed = await db.execute(
+        update(AnalyticsState)
+        .where(AnalyticsState.id == ANALYTICS_STATE_ID, AnalyticsState.watermark.is_not_distinct_from(watermark))
+        .values(watermark=until)
+        .execution_options(synchronize_session=False)
+    )
+    if claimed.rowcount != 1:
+        return None
+    return watermark, until
+
+
+async def _refresh_lessons(db: AsyncSession, since: Optional[datetime], until: datetime) -> tuple[int, set[int]]:
+    """
+    Прохождения уроков за [since, until) по индексу progress.updated_at прибавляются к
+    lesson_analytics. Отметка урока - однократный переход в is_completed (updated_at
+    выставляется в этот момент), поэтому каждая запись учитывается ровно один раз.
+    Без since - пересчёт с нуля. Возвращает число строк и затронутые курсы.
+    """
+    completed = (
+        select(Progress.lesson_id, Lesson.course_id, func.count(Progress.id).label("completions"))
+        .join(Lesson, Lesson.id == Progress.lesson_id)
+        .where(Progress.is_completed == True, Progress.updated_at < until)
+        .group_by(Progress.lesson_id, Lesson.course_id)
+    )
+    if since is None:
+        await db.execute(delete(LessonAnalytics))
+        result = await db.execute(
+            insert(LessonAnalytics).from_select(["lesson_id", "course_id", "completions"], completed)
+        )
+        return result.rowcount, set()
+
+    rows = (await db.execute(completed.where(Progress.updated_at >= since))).all()
+    for batch in _chunks(rows, ANALYTICS_BATCH_ROWS):
+        stmt = insert_for(db, LessonAnalytics).values([
+            {"lesson_id": lesson_id, "course_id": course_id, "completions": completions}
+            for lesson_id, course_id, completions in batch
+        ])
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=[LessonAnalytics.lesson_id],
+            set_={
+                "course_id": stmt.excluded.course_id,
+                "completions": LessonAnalytics.completions + stmt.excluded.completions,
+            },
+        ))
+    # Уроки удаляются вместе с прогрессом - их строки сводки больше не нужны.
+    await db.execute(
+        delete(LessonAnalytics).where(~exists().where(Lesson.id == LessonAnalytics.lesson_id))
+    )
+    return len(rows), {course_id for _, course_id, _ in rows}
+
+
+def _course_rollup_query(until: datetime, course_ids: Optional[list[int]] = None):
+    """
+    Сводка курса за то же окно [.., until), что и lesson_analytics: счётчики прогресса
+    поддерживаются при записи, из них вычитаются прохождения после until - их немного,
+    и они читаются по индексу updated_at. Так completions курса равны сумме по его
+    урокам, а доля завершивших не смешивает отложенные и текущие данные.
+    course_ids ограничивает и чтение счётчиков, а не только итоговые строки.
+    """
+    counter = CourseProgressCounter
+    late = (
+        select(Lesson.course_id, Progress.user_id, func.count(Progress.id).label("late"))
+        .join(Lesson, Lesson.id == Progress.lesson_id)
+        .where(Progress.is_completed == True, Progress.updated_at >= until)
+        .group_by(Lesson.course_id, Progress.user_id)
+        .subquery()
+    )
+    done = (
+        select(
+            counter.course_id,
+            counter.user_id,
+            (counter.completed_count - func.coalesce(late.c.late, 0)).label("completed"),
+        )
+        .outerjoin(late, and_(late.c.course_id == counter.course_id, late.c.user_id == counter.user_id))
+        .where(counter.completed_count > 0)
+    )
+    if course_ids is not None:
+        done = done.where(counter.course_id.in_(course_ids))
+    done = done.subquery()
+    rollup = (
+        select(
+            Course.id,
+            Course.lesson_count,
+            func.count(done.c.user_id).label("learners"),
+            func.coalesce(func.sum(case(
+                (and_(Course.lesson_count > 0, done.c.completed >= Course.lesson_count), 1),
+                else_=0,
+            )), 0).label("completers"),
+            func.coalesce(func.sum(done.c.completed), 0).label("completions"),
+        )
+        .outerjoin(done, and_(done.c.course_id == Course.id, done.c.completed > 0))
+        .group_by(Course.id, Course.lesson_count)
+    )
+    if course_ids is not None:
+        rollup = rollup.where(Course.id.in_(course_ids))
+    return rollup
+
+
+async def _refresh_courses(
+    db: AsyncSession, course_ids: Optional[set[int]], until: datetime, now: datetime
+) -> int:
+    """Пересчитывает сводки указанных курсов (None - всех) на момент until."""
+    if course_ids is None:
+        batches = [(await db.execute(_course_rollup_query(until))).all()]
+    else:
+        batches = [
+            (await db.execute(_course_rollup_query(until, ids))).all()
+            for ids in _chunks(sorted(course_ids), ANALYTICS_BATCH_ROWS)
+        ]
+
+    count = 0
+    for rows in batches:
+        for batch in _chunks(rows, ANALYTICS_BATCH_ROWS):
+            stmt = insert_for(db, CourseAnalytics).values([
+                {
+                    "course_id": row.id,
+                    "lesson_count": row.lesson_count,
+                    "learners": row.learners,
+                    "completers": row.completers,
+                    "completions": row.completions,
+                    "active_learners": 0,
+                    "updated_at": now,
+                }
+                for row in batch
+            ])
+            await db.execute(stmt.on_conflict_do_update(
+                index_elements=[CourseAnalytics.course_id],
+                set_={
+                    name: stmt.excluded[name]
+                    for name in ("lesson_count", "learners", "completers", "completions", "updated_at")
+                },
+            ))
+            count += len(batch)
+    await db.execute(
+        delete(CourseAnalytics).where(~exists().where(Course.id == CourseAnalytics.course_id))
+    )
+    return count
+
+
+async def _refresh_active_learners(db: AsyncSession, now: datetime) -> None:
+    # Окно сдвигается без записей, поэтому пересчитывается каждый раз - по индексу
+    # updated_at читается только прогресс за последние ANALYTICS_ACTIVE_DAYS дней.
+    active = (await db.execute(
+        select(Lesson.course_id, func.count(func.distinct(Progress.user_id)))
+        .join(Lesson, Lesson.id == Progress.lesson_id)
+        .where(
+            Progress.is_completed == True,
+            Progress.updated_at >= now - timedelta(days=ANALYTICS_ACTIVE_DAYS),
+        )
+        .group_by(Lesson.course_id)
+    )).all()
+    await db.execute(
+        update(CourseAnalytics).where(CourseAnalytics.active_learners > 0).values(active_learners=0)
+    )
+    if active:
+        # executemany по таблице (не по ORM-модели) - обычный UPDATE с параметрами на каждую строку.
+        table = CourseAnalytics.__table__
+        await db.execute(
+            update(table)
+            .where(table.c.course_id == bindparam("b_course_id"))
+            .values(active_learners=bindparam("b_active")),
+            [{"b_course_id": course_id, "b_active": learners} for course_id, learners in active],
+        )
+
+
+async def refresh_analytics(db: AsyncSession, full: bool = False) -> Optional[dict]:
+    """
+    Одна транзакция обновления сводок. Первый запуск и full=True пересчитывают всё,
+    дальше обрабатываются только изменения после водяного знака. Возвращает None,
+    если обновление уже идёт в другом воркере или он успел обработать это окно.
+    """
+    started = time.perf_counter()
+    if not await _try_lock(db):
+        await db.rollback()
+        return None
+
+    now = utcnow()
+    window = await _claim_window(db, now - timedelta(seconds=ANALYTICS_LAG_SECONDS))
+    if window is None:
+        # Другой воркер успел сдвинуть водяной знак - это окно уже обработано.
+        await db.rollback()
+        return None
+    watermark, until = window
+    since = None if full else watermark
+
+    lessons, touched = await _refresh_lessons(db, since, until)
+    if since is None:
+        course_ids = None
+    else:
+        # Курсы с новыми прохождениями и изменённые (уроки добавлены/удалены, пересчёт счётчиков).
+        changed = await db.execute(select(Course.id).where(Course.updated_at >= since))
+        course_ids = touched | set(changed.scalars().all())
+    courses = await _refresh_courses(db, course_ids, until, now)
+    await _refresh_active_learners(db, now)
+
+    duration_ms = round((time.perf_counter() - started) * 1000, 2)
+    await db.execute(
+        update(AnalyticsState)
+        .where(AnalyticsState.id == ANALYTICS_STATE_ID)
+        .values(refreshed_at=now, duration_ms=duration_ms, courses=courses, lessons=lessons)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return {
+        "full": since is None,
+        "watermark": until,
+        "courses": courses,
+        "lessons": lessons,
+        "duration_ms": duration_ms,
+    }
+
+
+class AnalyticsRefresher:
+    """Фоновая задача обновления сводок; стартует и останавливается вместе с приложением."""
+
+    def __init__(self, interval: int):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        # Ручной запуск и фоновый в одном процессе не пересекаются.
+        self._lock = asyncio.Lock()
+        self._runs = 0
+        self._skipped = 0
+        self._failures = 0
+        self._last: Optional[dict] = None
+        self._last_error: Optional[str] = None
+
+    def start(self) -> None:
+        if self.interval <= 0 or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._loop(), name="analytics-refresh")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                # Ошибка уже учтена в stats(); следующий проход повторит с того же водяного знака.
+                logger.exception("Analytics refresh failed")
+            await asyncio.sleep(self.interval)
+
+    async def refresh(self, full: bool = False) -> Optional[dict]:
+        async with self._lock:
+            try:
+                async with AsyncSessionLocal() as db:
+                    result = await refresh_analytics(db, full)
+            except Exception as exc:
+                self._failures += 1
+                self._last_error = f"{type(exc).__name__}: {exc}"
+                raise
+        if result is None:
+            self._skipped += 1
+            return None
+        self._runs += 1
+        self._last = result
+        self._last_error = None
+        logger.info(
+            "Analytics refreshed in %.1f ms: %d courses, %d lessons%s",
+            result["duration_ms"], result["courses"], result["lessons"], " (full)" if result["full"] else "",
+        )
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "interval_seconds": self.interval,
+            "running": self._task is not None and not self._task.done(),
+            "runs": self._runs,
+            "skipped": self._skipped,
+            "failures": self._failures,
+            "last": self._last,
+            "last_error": self._last_error,
+        }
+
+
+analytics_refresher = AnalyticsRefresher(ANALYTICS_REFRESH_SECONDS)
+
+
+async def main() -> None:
+    async with AsyncSessionLocal() as db:
+        print(json.dumps(await refresh_analytics(db, full=True), default=str))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,291 @@
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.analytics import ANALYTICS_STATE_ID, analytics_refresher
+from app.api.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+
+from app.api.compression import accepts_gzip
+from app.auth.hashing import password_hasher
+from app.auth.token_cache import token_cache
+from app.auth.utils import get_current_admin_principal
+from app.cache.catalog import COURSES_TAG, catalog_cache
+from app.catalog_import import import_ndjson
+from app.database.database import engine, get_db, get_read_db, read_engine
+from app.database.pool import pool_status
+from app.database.routing import CATALOG_SCOPE, sticky_reads
+from app.events.progress import progress_events
+from app.export import EXPORT_FORMATS, ExportEntity, ExportFormat, export_rows, watermark
+from app.models.analytics import AnalyticsState, CourseAnalytics, LessonAnalytics
+from app.models.course import Course
+from app.models.lesson import Lesson
+from app.progress_counters import rebuild_counters
+from app.schemas.analytics import CourseAnalyticsDetail, CourseAnalyticsOut
+from app.schemas.catalog_import import ImportReport
+from app.schemas.user import Principal
+from app.search.index import reindex
+from app.metrics.route import TimedRoute
+
+router = APIRouter(prefix="/admin", tags=["Admin"], route_class=TimedRoute)
+
+
+@router.get(
+    "/password-hashing",
+    summary="Состояние пула хеширования паролей [Admin]",
+    description="Возвращает глубину очереди, количество выполняемых операций bcrypt, задержки хеширования и ожидания в очереди. Доступно только администраторам."
+)
+async def get_password_hashing_stats(current_user: Principal = Depends(get_current_admin_principal)):
+    return password_hasher.stats()
+
+
+@router.get(
+    "/token-cache",
+    summary="Статистика кеша проверенных JWT [Admin]",
+    description="Возвращает размер кеша проверенных токенов, количество попаданий, промахов и вытеснений. Доступно только администраторам."
+)
+async def get_token_cache_stats(current_user: Principal = Depends(get_current_admin_principal)):
+    return token_cache.stats()
+
+
+@router.get(
+    "/cache",
+    summary="Статистика кеша каталога [Admin]",
+    description="Возвращает тип бэкенда кеша каталога, долю попаданий, занятый объём и счётчики вытеснений и инвалидаций. Доступно только администраторам."
+)
+async def get_catalog_cache_stats(current_user: Principal = Depends(get_current_admin_principal)):
+    return catalog_cache.stats()
+
+
+@router.get(
+    "/events",
+    summary="Состояние потоков событий прогресса [Admin]",
+    description="Возвращает число открытых потоков `GET /progress/events` в этом воркере и лимиты, количество опубликованных, доставленных и отброшенных (медленные клиенты) событий, отклонённые подключения и состояние брокера. Доступно только администраторам."
+)
+async def get_events_stats(current_user: Principal = Depends(get_current_admin_principal)):
+    return progress_events.stats()
+
+
+@router.get(
+    "/db-pool",
+    summary="Состояние пула соединений с БД [Admin]",
+    description="Для основной БД и реплики (если задан `DATABASE_READ_URL`) возвращает размер пула, количество выданных соединений, насыщение (доля занятых от максимума), время ожидания соединения (p50/p95/max) и число таймаутов; при реплике - состояние read-your-writes (`sticky_reads`). Доступно только администраторам."
+)
+async def get_db_pool_stats(current_user: Principal = Depends(get_current_admin_principal)):
+    stats = {"primary": pool_status(engine.pool)}
+    if read_engine is not engine:
+        stats["replica"] = pool_status(read_engine.pool)
+        stats["sticky_reads"] = sticky_reads.stats()
+    return stats
+
+
+@router.post(
+    "/rebuild-counters",
+    summary="Пересчитать счётчики прогресса [Admin]",
+    description="Пересчитывает количество уроков в курсах и количество пройденных уроков по пользователям с нуля, устраняя возможную рассинхронизацию. Доступно только администраторам."
+)
+async def rebuild_progress_counters(
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin_principal)
+):
+    return await rebuild_counters(db)
+
+
+@router.post(
+    "/reindex-search",
+    summary="Перестроить поисковый индекс [Admin]",
+    description="Строит полнотекстовый индекс каталога заново из текущих курсов, уроков и материалов. Нужен после заполнения БД в обход API (миграции, прямые вставки). Доступно только администраторам."
+)
+async def reindex_search(
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin_principal)
+):
+    return await reindex(db)
+
+
+@router.post(
+    "/import",
+    response_model=ImportReport,
+    summary="Импорт каталога из NDJSON [Admin]",
+    description="Принимает поток NDJSON: каждая строка - курс с вложенными уроками и материалами, например `{\"title\": \"...\", \"lessons\": [{\"title\": \"...\", \"scheduled_at\": \"...\", \"materials\": [{\"title\": \"...\", \"text\": \"...\"}]}]}`. Строки разбираются по мере получения и вставляются пачками; строки с ошибками попадают в отчёт и не прерывают импорт. Доступно только администраторам.",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/x-ndjson": {"schema": {"type": "string", "format": "binary"}}},
+        }
+    },
+)
+async def import_catalog(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin_principal)
+):
+    report = await import_ndjson(db, request.stream())
+    if report["courses"]:
+        await sticky_reads.mark(CATALOG_SCOPE)
+        await catalog_cache.invalidate(tags=[COURSES_TAG])
+    return report
+
+
+@router.get(
+    "/export/{entity}",
+    summary="Выгрузка каталога и прогресса [Admin]",
+    description="Потоково отдаёт все строки таблицы (`courses`, `lessons`, `materials`, `progress`) в NDJSON или CSV, читая их серверным курсором. С `since` отдаются только строки, изменённые начиная с этого момента (по `updated_at`, UTC). Заголовок `X-Export-Watermark` - значение `since` для следующей выгрузки; строки на границе могут прийти повторно, сопоставляйте их по `id`. Удаления не выгружаются. При `Accept-Encoding: gzip` ответ сжимается. Доступно только администраторам."
+)
+async def export_table(
+    request: Request,
+    entity: ExportEntity,
+    format: ExportFormat = Query(ExportFormat.ndjson, description="Формат выгрузки"),
+    since: Optional[datetime] = Query(None, description="Выгрузить только строки, изменённые начиная с этого момента"),
+    current_user: Principal = Depends(get_current_admin_principal)
+):
+    if since is not None and since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    # Водяной знак фиксируется до начала чтения - всё изменённое позже попадёт в следующую выгрузку.
+    headers = {
+        "X-Export-Watermark": watermark().isoformat(),
+        "Content-Disposition": f'attachment; filename="{entity.value}.{format.value}"',
+        "Vary": "Accept-Encoding",
+    }
+    compress = accepts_gzip(request)
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        export_rows(entity.value, format.value, since, compress),
+        media_type=EXPORT_FORMATS[format.value],
+        headers=headers,
+    )
+
+
+
+def _percent(part: int, whole: int) -> float:
+    return round(part / whole * 100, 2) if whole else 0.0
+
+
+def _course_analytics_query():
+    # Сводка курса и его название; курсы без сводки (ещё не обработаны) дают нули.
+    return (
+        select(
+            Course.id.label("course_id"),
+            Course.title,
+            func.coalesce(CourseAnalytics.lesson_count, Course.lesson_count).label("lesson_count"),
+            func.coalesce(CourseAnalytics.learners, 0).label("learners"),
+            func.coalesce(CourseAnalytics.completers, 0).label("completers"),
+            func.coalesce(CourseAnalytics.completions, 0).label("completions"),
+            func.coalesce(CourseAnalytics.active_learners, 0).label("active_learners"),
+            CourseAnalytics.updated_at,
+        )
+        .outerjoin(CourseAnalytics, CourseAnalytics.course_id == Course.id)
+    )
+
+
+def _course_analytics(row) -> dict:
+    return {
+        **row._asdict(),
+        "completion_rate": _percent(row.completers, row.learners),
+    }
+
+
+@router.get(
+    "/analytics/courses",
+    response_model=List[CourseAnalyticsOut],
+    summary="Сводка прохождения курсов [Admin]",
+    description="Для каждого курса: сколько учащихся начали и завершили его, доля завершивших, всего пройденных уроков и активные за последние дни учащиеся. Читается из сводных таблиц, которые обновляются в фоне (`ANALYTICS_REFRESH_SECONDS`), поэтому данные отстают от прогресса на период обновления. Для перехода на следующую страницу передайте значение заголовка `X-Next-Cursor` в параметре `cursor`. Доступно только администраторам."
+)
+async def get_courses_analytics(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Курсор следующей страницы из заголовка X-Next-Cursor"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Максимальное количество курсов для возврата"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_admin_principal)
+):
+    query = _course_analytics_query().order_by(Course.id).limit(limit + 1)
+    if cursor:
+        (last_id,) = decode_cursor(cursor, (int,))
+        query = query.where(Course.id > last_id)
+    rows = (await db.execute(query)).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].course_id)
+    return [_course_analytics(row) for row in rows]
+
+
+@router.get(
+    "/analytics/courses/{course_id}",
+    response_model=CourseAnalyticsDetail,
+    summary="Сводка прохождения курса по урокам [Admin]",
+    description="Сводка курса и уроки в порядке расписания: сколько учащихся прошли каждый урок, доля от начавших курс и отток - насколько меньше прохождений, чем у предыдущего урока. Читается из сводных таблиц, обновляемых в фоне. Доступно только администраторам."
+)
+async def get_course_analytics(
+    course_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_admin_principal)
+):
+    course = (await db.execute(_course_analytics_query().where(Course.id == course_id))).one_or_none()
+    if course is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+    # Уроки курса по индексу (course_id, scheduled_at), прохождения - из сводки по первичному ключу.
+    lessons = (await db.execute(
+        select(
+            Lesson.id.label("lesson_id"),
+            Lesson.title,
+            Lesson.scheduled_at,
+            func.coalesce(LessonAnalytics.completions, 0).label("completions"),
+        )
+        .outerjoin(LessonAnalytics, LessonAnalytics.lesson_id == Lesson.id)
+        .where(Lesson.course_id == course_id)
+        .order_by(Lesson.scheduled_at, Lesson.id)
+    )).all()
+
+    detail = _course_analytics(course)
+    detail["lessons"] = []
+    previous = None
+    for lesson in lessons:
+        detail["lessons"].append({
+            **lesson._asdict(),
+            "completion_rate": _percent(lesson.completions, course.learners),
+            "drop_off": previous - lesson.completions if previous is not None else None,
+        })
+        previous = lesson.completions
+    return detail
+
+
+@router.get(
+    "/analytics/status",
+    summary="Состояние обновления аналитики [Admin]",
+    description="Когда и за сколько миллисекунд сводки обновлялись последний раз, сколько курсов и уроков пересчитано, водяной знак обработанного прогресса, а также счётчики запусков, пропусков (обновляет другой воркер) и ошибок в этом воркере. Доступно только администраторам."
+)
+async def get_analytics_status(
+    db: AsyncSession = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_admin_principal)
+):
+    # Последнее обновление могло пройти в другом воркере - его итог берём из БД.
+    state = await db.get(AnalyticsState, ANALYTICS_STATE_ID)
+    return {
+        "last_refresh": None if state is None else {
+            "refreshed_at": state.refreshed_at,
+            "watermark": state.watermark,
+            "duration_ms": state.duration_ms,
+            "courses": state.courses,
+            "lessons": state.lessons,
+        },
+        "worker": analytics_refresher.stats(),
+    }
+
+
+@router.post(
+    "/analytics/refresh",
+    summary="Обновить сводки аналитики [Admin]",
+    description="Сразу обновляет сводки, не дожидаясь фонового запуска: инкрементально (только прогресс после водяного знака) или, с `full=true`, пересчитывая всё с нуля. Возвращает 409, если обновление уже выполняет другой воркер. Доступно только администраторам."
+)
+async def refresh_analytics_now(
+    full: bool = Query(False, description="Пересчитать сводки с нуля"),
+    current_user: Principal = Depends(get_current_admin_principal)
+):
+    result = await analytics_refresher.refresh(full)
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Analytics refresh is already running")
+    return result
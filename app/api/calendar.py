@@ -0,0 +1,246 @@
+import os
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from dotenv import load_dotenv
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from jose import JWTError
+from sqlalchemy import Select, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.conditional import collection_etag, etag_matches, not_modified
+from app.api.fast_json import FAST_LIST_RESPONSES, json_response, row_dicts
+from app.api.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.auth.revocation import token_versions
+from app.auth.utils import create_calendar_token, decode_calendar_token, get_current_principal
+from app.database.database import get_db
+from app.database.routing import get_catalog_read_db, get_user_read_db
+from app.metrics.route import TimedRoute
+from app.models.course import Course
+from app.models.course_progress import CourseProgressCounter
+from app.models.lesson import Lesson
+from app.models.progress import Progress
+from app.schemas.calendar import CalendarFeed, CalendarLesson
+from app.schemas.user import Principal
+
+load_dotenv()
+
+# Окно календаря по умолчанию и максимальное, в днях.
+CALENDAR_DEFAULT_DAYS = int(os.getenv("CALENDAR_DEFAULT_DAYS", "30"))
+CALENDAR_MAX_DAYS = int(os.getenv("CALENDAR_MAX_DAYS", "366"))
+# Длительность урока в iCalendar (в модели её нет) и предел событий в одном файле.
+CALENDAR_EVENT_MINUTES = int(os.getenv("CALENDAR_EVENT_MINUTES", "90"))
+CALENDAR_ICS_MAX_EVENTS = int(os.getenv("CALENDAR_ICS_MAX_EVENTS", "1000"))
+
+router = APIRouter(prefix="/calendar", tags=["Calendar"], route_class=TimedRoute)
+
+CALENDAR_FIELDS = list(CalendarLesson.model_fields)
+
+
+def calendar_window(start: Optional[datetime], end: Optional[datetime]) -> tuple[datetime, datetime]:
+    # Как в create_lesson: scheduled_at хранится без часового пояса, пояс отбрасывается.
+    start = start.replace(tzinfo=None) if start else datetime.now()
+    end = end.replace(tzinfo=None) if end else start + timedelta(days=CALENDAR_DEFAULT_DAYS)
+    if end <= start:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="`end` must be after `start`")
+    if end - start > timedelta(days=CALENDAR_MAX_DAYS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Calendar window exceeds {CALENDAR_MAX_DAYS} days"
+        )
+    return start, end
+
+
+def upcoming_lessons_query(
+    user_id: int,
+    start: datetime,
+    end: datetime,
+    course_ids: Optional[List[int]] = None,
+) -> Select:
+    """
+    Непройденные пользователем уроки в интервале [start, end) одним запросом.
+    Без course_ids - по курсам, в которых пользователь прошёл хотя бы один урок.
+    Диапазон по scheduled_at и фильтр по course_id покрывает индекс (scheduled_at, course_id).
+    """
+    if course_ids:
+        courses = course_ids
+    else:
+        courses = select(CourseProgressCounter.course_id).where(CourseProgressCounter.user_id == user_id)
+    return (
+        select(Lesson.id, Lesson.course_id, Course.title.label("course_title"), Lesson.title, Lesson.scheduled_at)
+        .join(Course, Course.id == Lesson.course_id)
+        .outerjoin(Progress, (Progress.lesson_id == Lesson.id) & (Progress.user_id == user_id))
+        .where(
+            Lesson.scheduled_at >= start,
+            Lesson.scheduled_at < end,
+            Lesson.course_id.in_(courses),
+            Progress.is_completed.is_not(True),
+        )
+        .order_by(Lesson.scheduled_at, Lesson.id)
+    )
+
+
+@router.get(
+    "/upcoming",
+    response_model=List[CalendarLesson],
+    summary="Ближайшие уроки пользователя",
+    description=f"Возвращает непройденные текущим пользователем уроки в интервале `[start, end)`, упорядоченные по дате проведения. По умолчанию - с текущего момента на {CALENDAR_DEFAULT_DAYS} дней вперёд по курсам, в которых пользователь прошёл хотя бы один урок; `course_id` задаёт курсы явно. Для перехода на следующую страницу передайте значение заголовка `X-Next-Cursor` в параметре `cursor`. Поддерживает `If-None-Match`."
+)
+async def get_upcoming_lessons(
+    request: Request,
+    response: Response,
+    start: Optional[datetime] = Query(None, description="Начало интервала (по умолчанию - сейчас)"),
+    end: Optional[datetime] = Query(None, description="Конец интервала, не включительно"),
+    course_id: Optional[List[int]] = Query(None, description="Только эти курсы"),
+    cursor: Optional[str] = Query(None, description="Курсор следующей страницы из заголовка X-Next-Cursor"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Максимальное количество уроков для возврата"),
+    db: AsyncSession = Depends(get_user_read_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    start, end = calendar_window(start, end)
+    query = upcoming_lessons_query(current_user.id, start, end, course_id).limit(limit + 1)
+    if cursor:
+        last_scheduled_at, last_id = decode_cursor(cursor, (datetime, int))
+        query = query.where(tuple_(Lesson.scheduled_at, Lesson.id) > tuple_(last_scheduled_at, last_id))
+    lessons = (await db.execute(query)).all()
+
+    headers = {}
+    if len(lessons) > limit:
+        lessons = lessons[:limit]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(lessons[-1].scheduled_at, lessons[-1].id)
+
+    # Ответ персональный и не кешируется; 304 избавляет от сериализации и передачи тела.
+    etag = collection_etag([tuple(row) for row in lessons], headers)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    for name, value in headers.items():
+        response.headers[name] = value
+    body = row_dicts(lessons, CALENDAR_FIELDS)
+    if FAST_LIST_RESPONSES:
+        return json_response(body, response)
+    return body
+
+
+def _ics_text(value: str) -> str:
+    # RFC 5545, 3.3.11: экранирование в TEXT.
+    return value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _ics_line(line: str) -> str:
+    # RFC 5545, 3.1: строки длиннее 75 октетов переносятся, продолжение начинается с пробела.
+    raw = line.encode("utf-8")
+    if len(raw) <= 75:
+        return line + "\r\n"
+    parts, current = [], b""
+    for char in line:
+        encoded = char.encode("utf-8")
+        if len(current) + len(encoded) > (75 if not parts else 74):
+            parts.append(current.decode("utf-8"))
+            current = b""
+        current += encoded
+    parts.append(current.decode("utf-8"))
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _ics_datetime(value: datetime) -> str:
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def render_ics(lessons, host: str) -> str:
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//courses//calendar//RU",
+        "CALSCALE:GREGORIAN",
+    ]
+    for lesson in lessons:
+        # Время урока хранится без пояса - в календаре оно «плавающее» (местное).
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:lesson-{lesson.id}@{host}",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART:{_ics_datetime(lesson.scheduled_at)}",
+            f"DTEND:{_ics_datetime(lesson.scheduled_at + timedelta(minutes=CALENDAR_EVENT_MINUTES))}",
+            f"SUMMARY:{_ics_text(lesson.title)}",
+            f"DESCRIPTION:{_ics_text(lesson.course_title or '')}",
+            "END:VEVENT",
+        ]
+    lines.append("END:VCALENDAR")
+    return "".join(_ics_line(line) for line in lines)
+
+
+def ics_response(lessons, request: Request) -> Response:
+    return Response(
+        content=render_ics(lessons, request.url.hostname or "localhost"),
+        media_type="text/calendar; charset=utf-8",
+        headers={"Content-Disposition": 'attachment; filename="upcoming.ics"'},
+    )
+
+
+@router.get(
+    "/upcoming.ics",
+    response_class=Response,
+    summary="Ближайшие уроки пользователя в формате iCalendar",
+    description=f"Те же уроки, что и `/calendar/upcoming`, файлом iCalendar (`text/calendar`) для разового импорта в календарь; не больше {CALENDAR_ICS_MAX_EVENTS} событий, без постраничной выборки. Требует заголовок `Authorization`, поэтому для подписки по ссылке не подходит - для неё есть `/calendar/feed`.",
+    responses={200: {"content": {"text/calendar": {}}}},
+)
+async def get_upcoming_lessons_ics(
+    request: Request,
+    start: Optional[datetime] = Query(None, description="Начало интервала (по умолчанию - сейчас)"),
+    end: Optional[datetime] = Query(None, description="Конец интервала, не включительно"),
+    course_id: Optional[List[int]] = Query(None, description="Только эти курсы"),
+    db: AsyncSession = Depends(get_user_read_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    start, end = calendar_window(start, end)
+    query = upcoming_lessons_query(current_user.id, start, end, course_id).limit(CALENDAR_ICS_MAX_EVENTS)
+    lessons = (await db.execute(query)).all()
+    return ics_response(lessons, request)
+
+
+@router.get(
+    "/feed",
+    response_model=CalendarFeed,
+    summary="Ссылка на ленту iCalendar для подписки",
+    description="Возвращает персональную ссылку на ленту ближайших уроков (`/calendar/feed.ics?token=...`), на которую можно подписаться в календаре: календари не умеют передавать заголовок `Authorization`, поэтому пользователь определяется подписанным токеном в ссылке. Токен не истекает; `POST /auth/logout-all` отзывает и его. Ссылку нужно хранить как пароль.",
+)
+async def get_calendar_feed(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    version = await token_versions.get(db, current_user.id)
+    token = create_calendar_token(current_user.id, version or 0)
+    return {"url": str(request.url_for("get_calendar_feed_ics").include_query_params(token=token))}
+
+
+@router.get(
+    "/feed.ics",
+    response_class=Response,
+    summary="Лента iCalendar по ссылке подписки",
+    description=f"Непройденные уроки владельца ссылки с текущего момента на {CALENDAR_DEFAULT_DAYS} дней вперёд по курсам, в которых он прошёл хотя бы один урок (не больше {CALENDAR_ICS_MAX_EVENTS} событий). Пользователь определяется токеном из `/calendar/feed`, заголовок `Authorization` не нужен.",
+    responses={200: {"content": {"text/calendar": {}}}},
+)
+async def get_calendar_feed_ics(
+    request: Request,
+    token: str = Query(..., description="Токен из ссылки /calendar/feed"),
+    # Календари опрашивают ленту раз в несколько часов - отставание реплики несущественно.
+    db: AsyncSession = Depends(get_catalog_read_db),
+):
+    try:
+        token_data = decode_calendar_token(token)
+        if token_data.sub is None:
+            raise JWTError
+    except JWTError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Ошибка аутентификации")
+    user_id = int(token_data.sub)
+    version = await token_versions.get(db, user_id)
+    if version is None or (token_data.ver or 0) != version:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Ошибка аутентификации")
+
+    start, end = calendar_window(None, None)
+    query = upcoming_lessons_query(user_id, start, end).limit(CALENDAR_ICS_MAX_EVENTS)
+    lessons = (await db.execute(query)).all()
+    return ics_response(lessons, request)
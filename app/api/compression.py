@@ -0,0 +1,33 @@
+import os
+
+from dotenv import load_dotenv
+from fastapi import Request
+
+load_dotenv()
+
+# Сжатие ответов (GZipMiddleware): ответы короче порога отдаются как есть.
+GZIP_MINIMUM_SIZE = int(os.getenv("GZIP_MINIMUM_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "5"))
+
+
+def accepts_gzip(request: Request) -> bool:
+    """
+    Разрешает ли Accept-Encoding клиента gzip. Явная запись gzip важнее `*`
+    (`*;q=0, gzip` - gzip разрешён), q=0 - запрет.
+    """
+    qualities = {}
+    for item in request.headers.get("accept-encoding", "").split(","):
+        coding, *params = item.split(";")
+        coding = coding.strip().lower()
+        if coding not in ("gzip", "*"):
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
@@ -0,0 +1,72 @@
+import hashlib
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from fastapi import Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.fast_json import FAST_LIST_RESPONSES, json_response
+from app.cache.catalog import catalog_cache
+from app.database.routing import cache_fill_allowed
+
+
+def entity_etag(kind: str, entity_id: int, version: int) -> str:
+    # Строгий ETag сущности: меняется вместе с её версией.
+    return f'"{kind}-{entity_id}-v{version}"'
+
+
+def collection_etag(*parts: Any) -> str:
+    # Строгий ETag списка: дайджест пар (id, version) и параметров страницы.
+    return '"' + hashlib.sha1(repr(parts).encode("utf-8")).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Для If-None-Match используется слабое сравнение (RFC 9110, 13.1.2).
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+async def cached_conditional_get(
+    request: Request,
+    response: Response,
+    db: AsyncSession,
+    key: str,
+    tags: Iterable[str],
+    load: Callable[[], Awaitable[dict]],
+    load_etag: Optional[Callable[[], Awaitable[Optional[str]]]] = None,
+    fast: bool = False,
+    partial: bool = False,
+):
+    """
+    GET каталога с кешем и If-None-Match; db - сессия, которой читает load.
+    load возвращает {"etag", "body", "headers"} и кешируется целиком; load_etag - дешёвый
+    запрос только версии, чтобы при промахе кеша ответить 304, не загружая строки.
+    fast - при FAST_LIST_RESPONSES тело отдаётся готовыми байтами без response_model.
+    partial - тело содержит не все поля схемы (fields=), response_model к нему неприменим.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    entry = await catalog_cache.get_json(key)
+    if entry is None:
+        if if_none_match and load_etag is not None:
+            etag = await load_etag()
+            if etag is not None and etag_matches(if_none_match, etag):
+                return not_modified(etag)
+        entry = await load()
+        if await cache_fill_allowed(db):
+            await catalog_cache.set_json(key, entry, tags)
+
+    if etag_matches(if_none_match, entry["etag"]):
+        return not_modified(entry["etag"])
+    response.headers["ETag"] = entry["etag"]
+    for name, value in entry.get("headers", {}).items():
+        response.headers[name] = value
+    if partial or (fast and FAST_LIST_RESPONSES):
+        return json_response(entry["body"], response)
+    return entry["body"]
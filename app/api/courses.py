@@ -1,16 +1,35 @@
-from typing import List
+from typing import List, Optional
 
-from sqlalchemy import select
+from sqlalchemy import insert, select, update
 
-from app.auth.utils import get_current_user, get_current_admin_user
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from app.api.conditional import cached_conditional_get, collection_etag, entity_etag
+from app.api.fast_json import row_dicts, schema_columns
+from app.api.fields import FIELDS_DESCRIPTION, parse_fields, projection_columns
+from app.api.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.auth.utils import get_current_principal, get_current_admin_principal
+from app.cache.catalog import (
+    COURSES_TAG,
+    catalog_cache,
+    course_key,
+    course_lessons_tag,
+    course_tag,
+    list_key,
+)
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database.database import get_db
-from app.models.user import User
+from app.database.routing import CATALOG_SCOPE, get_catalog_read_db, sticky_reads
+from app.schemas.user import Principal
 from app.models.course import Course
 from app.schemas.course import CourseCreate, CourseUpdate, CourseOut
+from app.search.index import COURSE, course_document, search_index
+from app.metrics.route import TimedRoute
+
+router = APIRouter(prefix="/courses", tags=["Courses"], route_class=TimedRoute)
 
-router = APIRouter(prefix="/courses", tags=["Courses"])
+COURSE_FIELDS = list(CourseOut.model_fields)
+# Колонки, доступные для fields=, и служебная version.
+COURSE_COLUMNS = {name: getattr(Course, name) for name in (*COURSE_FIELDS, "version")}
 
 @router.post(
     "/",
@@ -22,12 +41,17 @@ router = APIRouter(prefix="/courses", tags=["Courses"])
 async def create_course(
     course: CourseCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User=Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_principal)
 ):
-    db_course = Course(**course.model_dump())
-    db.add(db_course)
+    # Один INSERT ... RETURNING: ответ собирается из возвращённых колонок, без повторного SELECT.
+    db_course = (await db.execute(
+        insert(Course).values(**course.model_dump()).returning(*schema_columns(CourseOut, Course))
+    )).one()
+    # Поисковый индекс меняется в той же транзакции.
+    await search_index.upsert(db, [course_document(db_course.id, db_course.title, db_course.description)])
     await db.commit()
-    await db.refresh(db_course)
+    await sticky_reads.mark(CATALOG_SCOPE)
+    await catalog_cache.invalidate(tags=[COURSES_TAG])
     return db_course
 
 
@@ -41,16 +65,22 @@ async def update_course(
     course_id: int,
     course: CourseUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User=Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_principal)
 ):
-    db_course = await db.get(Course, course_id)
-    if not db_course:
-        raise HTTPException(status_code=404, detail="Course not found")
     update_data = course.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_course, key, value)
+    db_course = (await db.execute(
+        update(Course)
+        .where(Course.id == course_id)
+        .values(**update_data, version=Course.version + 1)
+        .returning(*schema_columns(CourseOut, Course))
+    )).one_or_none()
+    if db_course is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+    if "title" in update_data or "description" in update_data:
+        await search_index.upsert(db, [course_document(course_id, db_course.title, db_course.description)])
     await db.commit()
-    await db.refresh(db_course)
+    await sticky_reads.mark(CATALOG_SCOPE)
+    await catalog_cache.invalidate(tags=[course_tag(course_id), COURSES_TAG])
     return db_course
 
 
@@ -63,13 +93,18 @@ async def update_course(
 async def delete_course(
     course_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User=Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_principal)
 ):
     db_course = await db.get(Course, course_id)
     if not db_course:
         raise HTTPException(status_code=404, detail="Course not found")
     await db.delete(db_course)
+    await search_index.delete(db, COURSE, [course_id])
     await db.commit()
+    await sticky_reads.mark(CATALOG_SCOPE)
+    await catalog_cache.invalidate(
+        tags=[course_tag(course_id), COURSES_TAG, course_lessons_tag(course_id)]
+    )
     return
 
 
@@ -77,27 +112,81 @@ async def delete_course(
     "/{course_id}",
     response_model=CourseOut,
     summary="Получить курс по ID",
-    description="Возвращает подробную информацию о конкретном учебном курсе по его ID. Доступно для всех пользователей."
+    description="Возвращает подробную информацию о конкретном учебном курсе по его ID. Поддерживает `If-None-Match`: если курс не менялся, возвращается `304 Not Modified`. Доступно для всех пользователей."
 )
-async def get_course(course_id: int, db: AsyncSession = Depends(get_db)):
-    course = await db.get(Course, course_id)
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
-    return course
+async def get_course(
+    course_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_catalog_read_db)
+):
+    async def load():
+        course = await db.get(Course, course_id)
+        if not course:
+            raise HTTPException(status_code=404, detail="Course not found")
+        return {
+            "etag": entity_etag("course", course.id, course.version),
+            "body": CourseOut.model_validate(course).model_dump(mode="json"),
+        }
+
+    async def load_etag():
+        version = await db.scalar(select(Course.version).where(Course.id == course_id))
+        return None if version is None else entity_etag("course", course_id, version)
+
+    return await cached_conditional_get(
+        request, response, db, course_key(course_id), [course_tag(course_id)], load, load_etag
+    )
 
 @router.get(
     "/",
     response_model=List[CourseOut],
     summary="Получить список всех курсов",
-    description="Возвращает список всех учебных курсов с поддержкой пагинации (`skip`, `limit`). Доступно для всех авторизованных пользователей."
+    description="Возвращает список всех учебных курсов, упорядоченных по ID. Для перехода на следующую страницу передайте значение заголовка `X-Next-Cursor` в параметре `cursor` (`skip` оставлен для совместимости). Параметр `fields` ограничивает набор полей в ответе. Поддерживает `If-None-Match`. Доступно для всех авторизованных пользователей."
 )
 async def get_all_courses(
-    skip: int = Query(0, ge=0, description="Сколько курсов пропустить (для пагинации)"),
-    limit: int = Query(100, ge=1, le=200, description="Максимальное количество курсов для возврата"),
-    db: AsyncSession = Depends(get_db),
-    current_user: User=Depends(get_current_user)
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Курсор следующей страницы из заголовка X-Next-Cursor"),
+    skip: int = Query(0, ge=0, description="Сколько курсов пропустить (устарело, используйте cursor)"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Максимальное количество курсов для возврата"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_catalog_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
-    query = select(Course).offset(skip).limit(limit)
-    result = await db.execute(query)
-    courses = result.scalars().all()
-    return courses
\ No newline at end of file
+    names = parse_fields(fields, COURSE_FIELDS)
+
+    async def load():
+        # Только запрошенные колонки (+ id для курсора и version для ETag), без ORM-объектов.
+        query = (
+            select(*projection_columns(COURSE_COLUMNS, names, "id", "version"))
+            .order_by(Course.id)
+            .limit(limit + 1)
+        )
+        if cursor:
+            (last_id,) = decode_cursor(cursor, (int,))
+            query = query.where(Course.id > last_id)
+        elif skip:
+            query = query.offset(skip)
+        result = await db.execute(query)
+        courses = result.all()
+
+        headers = {}
+        if len(courses) > limit:
+            courses = courses[:limit]
+            headers[NEXT_CURSOR_HEADER] = encode_cursor(courses[-1].id)
+        return {
+            "etag": collection_etag([(c.id, c.version) for c in courses], headers, names),
+            "body": row_dicts(courses, names),
+            "headers": headers,
+        }
+
+    return await cached_conditional_get(
+        request,
+        response,
+        db,
+        list_key("courses", cursor=cursor, skip=skip, limit=limit, fields=",".join(names)),
+        [COURSES_TAG],
+        load,
+        fast=True,
+        partial=names != COURSE_FIELDS,
+    )
@@ -0,0 +1,36 @@
+from typing import Any, Optional, Sequence
+
+from fastapi import HTTPException, status
+
+FIELDS_DESCRIPTION = "Поля ответа через запятую, например `id,title`; выбираются только нужные колонки"
+
+
+def parse_fields(
+    fields: Optional[str],
+    available: Sequence[str],
+    default: Optional[Sequence[str]] = None,
+) -> list[str]:
+    """
+    fields=title,id -> список полей в порядке схемы (порядок ключей ответа не зависит от запроса).
+    Без параметра - default, а если его нет - все поля.
+    """
+    if fields is None:
+        return list(default if default is not None else available)
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(available)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Available: {', '.join(available)}"
+        )
+    if not requested:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="No fields requested")
+    return [name for name in available if name in requested]
+
+
+def projection_columns(columns: dict[str, Any], names: Sequence[str], *keys: str) -> list:
+    """
+    Колонки выборки: сначала запрошенные поля (их берёт row_dicts), затем служебные
+    keys (курсор, версия для ETag), если их нет среди запрошенных.
+    """
+    return [columns[name] for name in names] + [columns[key] for key in keys if key not in names]
@@ -1,20 +1,66 @@
+import gzip
 from enum import Enum
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy import select, func
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy import LargeBinary, select, func, tuple_, type_coerce, update, delete, insert, literal
+from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.compression import accepts_gzip
+from app.api.conditional import (
+    cached_conditional_get,
+    collection_etag,
+    entity_etag,
+    etag_matches,
+    not_modified,
+)
+from app.api.fast_json import FAST_LIST_RESPONSES, json_response, row_dicts, schema_columns
+from app.api.fields import FIELDS_DESCRIPTION, parse_fields, projection_columns
+from app.api.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
 from app.database.database import get_db
+from app.database.queries import parent_rows, with_parent
+from app.database.routing import (
+    CATALOG_SCOPE,
+    cache_fill_allowed,
+    get_catalog_read_db,
+    get_user_read_db,
+    sticky_reads,
+)
 from app.models.course import Course
+from app.models.course_progress import CourseProgressCounter
 from app.models.lesson import Lesson
 from app.models.material import Material
 from app.models.progress import Progress
 from app.schemas.lesson import LessonCreate, LessonOut, LessonWithProgress
-from app.auth.utils import get_current_user, get_current_admin_user
-from app.models.user import User
+from app.auth.utils import get_current_principal, get_current_admin_principal
+from app.cache.catalog import (
+    catalog_cache,
+    course_lessons_tag,
+    lesson_key,
+    lesson_materials_tag,
+    lesson_tag,
+    list_key,
+    material_key,
+    material_tag,
+    material_text_key,
+)
+from app.schemas.user import Principal
 from app.schemas.material import MaterialUpdate, MaterialOut, MaterialCreate
-
-router = APIRouter(prefix="/lessons", tags=["Lessons & Materials"])
+from app.search.index import LESSON, MATERIAL, lesson_document, material_document, search_index
+from app.metrics.route import TimedRoute
+from app.metrics.timing import timed
+
+router = APIRouter(prefix="/lessons", tags=["Lessons & Materials"], route_class=TimedRoute)
+
+# Колонки, доступные для fields=, и служебная version.
+LESSON_FIELDS = list(LessonOut.model_fields)
+LESSON_COLUMNS = {name: getattr(Lesson, name) for name in (*LESSON_FIELDS, "version")}
+MATERIAL_FIELDS = list(MaterialOut.model_fields)
+MATERIAL_COLUMNS = {name: getattr(Material, name) for name in (*MATERIAL_FIELDS, "version")}
+# В списках материалов текст по умолчанию не выбирается: он бывает большим и нужен
+# только при открытии материала (GET /lessons/materials/{id} или fields=...,text).
+MATERIAL_LIST_FIELDS = [name for name in MATERIAL_FIELDS if name != "text"]
+LESSON_PROGRESS_FIELDS = list(LessonWithProgress.model_fields)
 
 @router.post(
     "/",
@@ -26,58 +72,177 @@ router = APIRouter(prefix="/lessons", tags=["Lessons & Materials"])
 async def create_lesson(
     lesson: LessonCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: Principal = Depends(get_current_admin_principal)
 ):
     lesson_data = lesson.model_dump()
 
     if lesson_data.get("scheduled_at"):
         lesson_data["scheduled_at"] = lesson_data["scheduled_at"].replace(tzinfo=None)
+    else:
+        # Не пишем NULL: дата участвует в ключе сортировки, пусть сработает default.
+        lesson_data.pop("scheduled_at", None)
+
+    # Счётчик уроков курса меняется в той же транзакции; заодно проверяем, что курс есть.
+    result = await db.execute(
+        update(Course)
+        .where(Course.id == lesson_data["course_id"])
+        .values(lesson_count=Course.lesson_count + 1)
+    )
+    if result.rowcount == 0:
+        await db.rollback()
+        raise HTTPException(status_code=404, detail="Course not found")
 
-    db_lesson = Lesson(**lesson_data)
-    db.add(db_lesson)
+    db_lesson = (await db.execute(
+        insert(Lesson).values(**lesson_data).returning(*schema_columns(LessonOut, Lesson))
+    )).one()
+    await search_index.upsert(db, [lesson_document(db_lesson.id, db_lesson.title)])
     await db.commit()
-    await db.refresh(db_lesson)
+    await sticky_reads.mark(CATALOG_SCOPE)
+    await catalog_cache.invalidate(tags=[course_lessons_tag(db_lesson.course_id)])
     return db_lesson
 
+@router.delete(
+    "/{lesson_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Удалить урок [Admin]",
+    description="Удаляет урок вместе с его материалами и записями о прогрессе и обновляет счётчики прогресса курса. Действие необратимо. Доступно только администраторам."
+)
+async def delete_lesson(
+    lesson_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin_principal)
+):
+    # Блокировка урока до конца транзакции: отметки прохождения (FOR KEY SHARE на уроке)
+    # ждут удаления и затем не находят урок, а не успевают между пересчётом счётчиков и
+    # удалением прогресса. В SQLite запись и так сериализована.
+    course_id = await db.scalar(select(Lesson.course_id).where(Lesson.id == lesson_id).with_for_update())
+    if course_id is None:
+        raise HTTPException(status_code=404, detail="Lesson not found")
+
+    completed_by = (
+        select(Progress.user_id)
+        .where(Progress.lesson_id == lesson_id, Progress.is_completed == True)
+    )
+    await db.execute(
+        update(CourseProgressCounter)
+        .where(
+            CourseProgressCounter.course_id == course_id,
+            CourseProgressCounter.user_id.in_(completed_by)
+        )
+        .values(completed_count=CourseProgressCounter.completed_count - 1)
+    )
+    await db.execute(delete(Progress).where(Progress.lesson_id == lesson_id))
+    material_ids = (await db.execute(
+        delete(Material).where(Material.lesson_id == lesson_id).returning(Material.id)
+    )).scalars().all()
+    await db.execute(delete(Lesson).where(Lesson.id == lesson_id))
+    await db.execute(
+        update(Course)
+        .where(Course.id == course_id)
+        .values(lesson_count=Course.lesson_count - 1)
+    )
+    await search_index.delete(db, LESSON, [lesson_id])
+    await search_index.delete(db, MATERIAL, material_ids)
+    await db.commit()
+    await sticky_reads.mark(CATALOG_SCOPE)
+    await catalog_cache.invalidate(
+        tags=[
+            lesson_tag(lesson_id),
+            course_lessons_tag(course_id),
+            lesson_materials_tag(lesson_id),
+            *(material_tag(material_id) for material_id in material_ids),
+        ]
+    )
+    return
+
 @router.get(
     "/{lesson_id}",
     response_model=LessonOut,
     summary="Получить урок по ID",
-    description="Возвращает подробную информацию о конкретном уроке по его ID. Доступно всем авторизованным пользователям."
+    description="Возвращает подробную информацию о конкретном уроке по его ID. Поддерживает `If-None-Match`: если урок не менялся, возвращается `304 Not Modified`. Доступно всем авторизованным пользователям."
 )
-async def get_lesson(lesson_id: int, db: AsyncSession = Depends(get_db)):
-    lesson = await db.get(Lesson, lesson_id)
-    if not lesson:
-        raise HTTPException(status_code=404, detail="Lesson not found")
-    return lesson
+async def get_lesson(
+    lesson_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_catalog_read_db)
+):
+    async def load():
+        lesson = await db.get(Lesson, lesson_id)
+        if not lesson:
+            raise HTTPException(status_code=404, detail="Lesson not found")
+        return {
+            "etag": entity_etag("lesson", lesson.id, lesson.version),
+            "body": LessonOut.model_validate(lesson).model_dump(mode="json"),
+        }
+
+    async def load_etag():
+        version = await db.scalar(select(Lesson.version).where(Lesson.id == lesson_id))
+        return None if version is None else entity_etag("lesson", lesson_id, version)
+
+    return await cached_conditional_get(
+        request, response, db, lesson_key(lesson_id), [lesson_tag(lesson_id)], load, load_etag
+    )
 
 @router.get(
     "/{course_id}/lessons",
     response_model=List[LessonOut],
     summary="Получить уроки для конкретного курса",
-    description="Возвращает список всех уроков, принадлежащих конкретному курсу, с поддержкой пагинации. Доступно для авторизованных пользователей."
+    description="Возвращает уроки курса, упорядоченные по дате проведения. Для перехода на следующую страницу передайте значение заголовка `X-Next-Cursor` в параметре `cursor` (`skip` оставлен для совместимости). Параметр `fields` ограничивает набор полей в ответе. Поддерживает `If-None-Match`. Доступно для авторизованных пользователей."
 )
 async def get_lessons_for_course(
     course_id: int,
-    skip: int = Query(0, ge=0, description="Сколько уроков пропустить"),
-    limit: int = Query(100, ge=1, description="Максимальное количество уроков для возврата"),
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Курсор следующей страницы из заголовка X-Next-Cursor"),
+    skip: int = Query(0, ge=0, description="Сколько уроков пропустить (устарело, используйте cursor)"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Максимальное количество уроков для возврата"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_catalog_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
-    course = await db.get(Course, course_id)
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
-
-    query = (
-        select(Lesson)
-        .where(Lesson.course_id == course_id)
-        .offset(skip)
-        .limit(limit)
+    names = parse_fields(fields, LESSON_FIELDS)
+
+    async def load():
+        # Ключ курсора (scheduled_at, id) и version выбираются всегда.
+        page = (
+            select(*projection_columns(LESSON_COLUMNS, names, "scheduled_at", "id", "version"))
+            .where(Lesson.course_id == course_id)
+            .order_by(Lesson.scheduled_at, Lesson.id)
+            .limit(limit + 1)
+        )
+        if cursor:
+            last_scheduled_at, last_id = decode_cursor(cursor, (datetime, int))
+            page = page.where(tuple_(Lesson.scheduled_at, Lesson.id) > tuple_(last_scheduled_at, last_id))
+        elif skip:
+            page = page.offset(skip)
+        # Курс и страница уроков - одним запросом.
+        query, sub = with_parent(Course.id, course_id, page)
+        result = await db.execute(query.order_by(sub.c.scheduled_at, sub.c.id))
+        lessons = parent_rows(result.all())
+        if lessons is None:
+            raise HTTPException(status_code=404, detail="Course not found")
+
+        headers = {}
+        if len(lessons) > limit:
+            lessons = lessons[:limit]
+            headers[NEXT_CURSOR_HEADER] = encode_cursor(lessons[-1].scheduled_at, lessons[-1].id)
+        return {
+            "etag": collection_etag([(l.id, l.version) for l in lessons], headers, names),
+            "body": row_dicts(lessons, names),
+            "headers": headers,
+        }
+
+    return await cached_conditional_get(
+        request,
+        response,
+        db,
+        list_key(course_lessons_tag(course_id), cursor=cursor, skip=skip, limit=limit, fields=",".join(names)),
+        [course_lessons_tag(course_id)],
+        load,
+        fast=True,
+        partial=names != LESSON_FIELDS,
     )
-    result = await db.execute(query)
-    lessons = result.scalars().all()
-
-    return lessons
 
 
 class ProgressStatus(str, Enum):
@@ -89,25 +254,27 @@ class ProgressStatus(str, Enum):
     "/{course_id}/progress",
     response_model=List[LessonWithProgress],
     summary="Получить прогресс по урокам курса",
-    description="Возвращает список уроков курса с информацией о прогрессе текущего пользователя. Позволяет фильтровать по статусу `completed` или `uncompleted`."
+    description="Возвращает список уроков курса с информацией о прогрессе текущего пользователя. Позволяет фильтровать по статусу `completed` или `uncompleted`; параметр `fields` ограничивает набор полей в ответе. Поддерживает `If-None-Match`."
 )
 async def get_course_progress(
         course_id: int,
+        request: Request,
+        response: Response,
         status: Optional[ProgressStatus] = Query(None, description="Фильтр по статусу прохождения"),
-        db: AsyncSession = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+        fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+        db: AsyncSession = Depends(get_user_read_db),
+        current_user: Principal = Depends(get_current_principal)
 ):
-    course = await db.get(Course, course_id)
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
-
-    query = (
-        select(
-            Lesson.id,
-            Lesson.title,
-            Lesson.scheduled_at,
-            func.coalesce(Progress.is_completed, False).label("is_completed")
-        )
+    names = parse_fields(fields, LESSON_PROGRESS_FIELDS)
+    columns = {
+        "id": Lesson.id,
+        "title": Lesson.title,
+        "scheduled_at": Lesson.scheduled_at,
+        "is_completed": func.coalesce(Progress.is_completed, False).label("is_completed"),
+    }
+    # id выбирается всегда - по нему отличаются строки в ETag.
+    page = (
+        select(*projection_columns(columns, names, "id"))
         .select_from(Lesson)
         .outerjoin(
             Progress,
@@ -117,14 +284,26 @@ async def get_course_progress(
     )
 
     if status == ProgressStatus.completed:
-        query = query.where(Progress.is_completed == True)
+        page = page.where(Progress.is_completed == True)
     elif status == ProgressStatus.uncompleted:
-        query = query.where((Progress.is_completed == False) | (Progress.is_completed.is_(None)))
+        page = page.where((Progress.is_completed == False) | (Progress.is_completed.is_(None)))
 
+    # Курс и уроки с прогрессом - одним запросом.
+    query, sub = with_parent(Course.id, course_id, page)
     result = await db.execute(query)
-    lessons_with_progress = result.mappings().all()
+    lessons_with_progress = parent_rows(result.all())
+    if lessons_with_progress is None:
+        raise HTTPException(status_code=404, detail="Course not found")
 
-    return lessons_with_progress
+    # Ответ персональный и не кешируется, но 304 избавляет от сериализации и передачи тела.
+    etag = collection_etag([tuple(row)[:-1] for row in lessons_with_progress], names)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    body = row_dicts(lessons_with_progress, names)
+    if FAST_LIST_RESPONSES or names != LESSON_PROGRESS_FIELDS:
+        return json_response(body, response)
+    return body
 
 
 @router.post(
@@ -138,19 +317,25 @@ async def create_material_for_lesson(
         lesson_id: int,
         material_data: MaterialCreate,
         db: AsyncSession = Depends(get_db),
-        current_user: User = Depends(get_current_admin_user)
+        current_user: Principal = Depends(get_current_admin_principal)
 ):
-    lesson = await db.get(Lesson, lesson_id)
-    if not lesson:
-        raise HTTPException(status_code=404, detail="Lesson not found")
-
-    db_material = Material(
-        **material_data.model_dump(),
-        lesson_id=lesson_id
+    # INSERT ... SELECT из lessons: для несуществующего урока ничего не вставится.
+    data = material_data.model_dump()
+    stmt = (
+        insert(Material)
+        .from_select(
+            [*data, "lesson_id"],
+            select(*(literal(value, Material.__table__.c[key].type) for key, value in data.items()), Lesson.id).where(Lesson.id == lesson_id),
+        )
+        .returning(*schema_columns(MaterialOut, Material))
     )
-    db.add(db_material)
+    db_material = (await db.execute(stmt)).one_or_none()
+    if db_material is None:
+        raise HTTPException(status_code=404, detail="Lesson not found")
+    await search_index.upsert(db, [material_document(db_material.id, db_material.title, db_material.text)])
     await db.commit()
-    await db.refresh(db_material)
+    await sticky_reads.mark(CATALOG_SCOPE)
+    await catalog_cache.invalidate(tags=[lesson_materials_tag(lesson_id)])
 
     return db_material
 
@@ -159,22 +344,125 @@ async def create_material_for_lesson(
     "/{lesson_id}/materials",
     response_model=List[MaterialOut],
     summary="Получить материалы урока",
-    description="Возвращает список всех учебных материалов для конкретного урока. Доступно для авторизованных пользователей."
+    description="Возвращает список учебных материалов урока. Текст материалов по умолчанию не возвращается - запросите его через `fields` (например `fields=id,title,text`) или получите материал целиком по ID. Поддерживает `If-None-Match`. Доступно для авторизованных пользователей."
 )
 async def get_materials_for_lesson(
         lesson_id: int,
-        db: AsyncSession = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+        request: Request,
+        response: Response,
+        fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION + "; по умолчанию все, кроме `text`"),
+        db: AsyncSession = Depends(get_catalog_read_db),
+        current_user: Principal = Depends(get_current_principal)
 ):
-    lesson = await db.get(Lesson, lesson_id)
-    if not lesson:
-        raise HTTPException(status_code=404, detail="Lesson not found")
+    names = parse_fields(fields, MATERIAL_FIELDS, MATERIAL_LIST_FIELDS)
 
-    query = select(Material).where(Material.lesson_id == lesson_id)
-    result = await db.execute(query)
-    materials = result.scalars().all()
+    async def load():
+        page = (
+            select(*projection_columns(MATERIAL_COLUMNS, names, "id", "version"))
+            .where(Material.lesson_id == lesson_id)
+        )
+        query, sub = with_parent(Lesson.id, lesson_id, page)
+        result = await db.execute(query.order_by(sub.c.id))
+        materials = parent_rows(result.all())
+        if materials is None:
+            raise HTTPException(status_code=404, detail="Lesson not found")
+        return {
+            "etag": collection_etag([(m.id, m.version) for m in materials], names),
+            "body": row_dicts(materials, names),
+        }
+
+    async def load_etag():
+        # Только id и версии - без текстов материалов.
+        page = select(Material.id, Material.version).where(Material.lesson_id == lesson_id)
+        query, sub = with_parent(Lesson.id, lesson_id, page)
+        versions = parent_rows((await db.execute(query.order_by(sub.c.id))).all())
+        # Урока нет - 404 вернёт полная загрузка.
+        return None if versions is None else collection_etag([(m.id, m.version) for m in versions], names)
+
+    return await cached_conditional_get(
+        request,
+        response,
+        db,
+        list_key(lesson_materials_tag(lesson_id), fields=",".join(names)),
+        [lesson_materials_tag(lesson_id)],
+        load,
+        load_etag,
+        fast=True,
+        partial=names != MATERIAL_FIELDS,
+    )
 
-    return materials
+
+@router.get(
+    "/materials/{material_id}",
+    response_model=MaterialOut,
+    summary="Получить материал по ID",
+    description="Возвращает материал целиком, включая текст. Поддерживает `If-None-Match`: если материал не менялся, возвращается `304 Not Modified`. Доступно для авторизованных пользователей."
+)
+async def get_material(
+        material_id: int,
+        request: Request,
+        response: Response,
+        db: AsyncSession = Depends(get_catalog_read_db),
+        current_user: Principal = Depends(get_current_principal)
+):
+    async def load():
+        material = await db.get(Material, material_id)
+        if not material:
+            raise HTTPException(status_code=404, detail="Material not found")
+        return {
+            "etag": entity_etag("material", material.id, material.version),
+            "body": MaterialOut.model_validate(material).model_dump(mode="json"),
+        }
+
+    async def load_etag():
+        version = await db.scalar(select(Material.version).where(Material.id == material_id))
+        return None if version is None else entity_etag("material", material_id, version)
+
+    return await cached_conditional_get(
+        request, response, db, material_key(material_id), [material_tag(material_id)], load, load_etag
+    )
+
+
+@router.get(
+    "/materials/{material_id}/text",
+    response_class=Response,
+    summary="Получить текст материала",
+    description="Отдаёт текст материала как `text/plain`. Текст хранится сжатым: если клиент принимает gzip (`Accept-Encoding`), сжатые байты отдаются как есть с `Content-Encoding: gzip`, без сжатия на каждый запрос. Поддерживает `If-None-Match`. Доступно для авторизованных пользователей.",
+    responses={200: {"content": {"text/plain": {}}}},
+)
+async def get_material_text(
+        material_id: int,
+        request: Request,
+        db: AsyncSession = Depends(get_catalog_read_db),
+        current_user: Principal = Depends(get_current_principal)
+):
+    # В кеше - версия и сжатый текст одной записью: b"<version>\n<gzip>".
+    entry = await catalog_cache.get_bytes(material_text_key(material_id))
+    if entry is None:
+        row = (await db.execute(
+            # type_coerce - сжатые байты из БД без распаковки.
+            select(Material.version, type_coerce(Material.text, LargeBinary)).where(Material.id == material_id)
+        )).one_or_none()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Material not found")
+        entry = b"%d\n" % row[0] + (row[1] or b"")
+        if await cache_fill_allowed(db):
+            await catalog_cache.set_bytes(material_text_key(material_id), entry, [material_tag(material_id)])
+
+    version, _, compressed = entry.partition(b"\n")
+    compress = bool(compressed) and accepts_gzip(request)
+    # У сжатого и несжатого представлений разные ETag (RFC 9110, 8.8.3).
+    etag = entity_etag("material-text-gzip" if compress else "material-text", material_id, int(version))
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    headers = {"ETag": etag, "Vary": "Accept-Encoding"}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+        body = compressed
+    else:
+        with timed("serialize"):
+            body = gzip.decompress(compressed) if compressed else b""
+    return Response(content=body, media_type="text/plain; charset=utf-8", headers=headers)
 
 
 @router.put(
@@ -187,18 +475,25 @@ async def update_material(
         material_id: int,
         material_data: MaterialUpdate,
         db: AsyncSession = Depends(get_db),
-        current_user: User = Depends(get_current_admin_user)
+        current_user: Principal = Depends(get_current_admin_principal)
 ):
-    db_material = await db.get(Material, material_id)
-    if not db_material:
-        raise HTTPException(status_code=404, detail="Material not found")
-
     update_data = material_data.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_material, key, value)
+    db_material = (await db.execute(
+        update(Material)
+        .where(Material.id == material_id)
+        .values(**update_data, version=Material.version + 1)
+        .returning(*schema_columns(MaterialOut, Material))
+    )).one_or_none()
+    if db_material is None:
+        raise HTTPException(status_code=404, detail="Material not found")
+    if "title" in update_data or "text" in update_data:
+        await search_index.upsert(db, [material_document(material_id, db_material.title, db_material.text)])
 
     await db.commit()
-    await db.refresh(db_material)
+    await sticky_reads.mark(CATALOG_SCOPE)
+    await catalog_cache.invalidate(
+        tags=[lesson_materials_tag(db_material.lesson_id), material_tag(material_id)]
+    )
 
     return db_material
 
@@ -212,13 +507,18 @@ async def update_material(
 async def delete_material(
         material_id: int,
         db: AsyncSession = Depends(get_db),
-        current_user: User = Depends(get_current_admin_user)
+        current_user: Principal = Depends(get_current_admin_principal)
 ):
     db_material = await db.get(Material, material_id)
     if not db_material:
         raise HTTPException(status_code=404, detail="Material not found")
 
     await db.delete(db_material)
+    await search_index.delete(db, MATERIAL, [material_id])
     await db.commit()
+    await sticky_reads.mark(CATALOG_SCOPE)
+    await catalog_cache.invalidate(
+        tags=[lesson_materials_tag(db_material.lesson_id), material_tag(material_id)]
+    )
 
     return None
\ No newline at end of file
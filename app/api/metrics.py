@@ -0,0 +1,20 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.metrics import collectors  # noqa: F401 - регистрирует сборщики пула и кешей
+from app.metrics.registry import registry
+
+router = APIRouter(tags=["Metrics"])
+
+# Версия текстового формата экспозиции Prometheus.
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    include_in_schema=False,
+    summary="Метрики в формате Prometheus",
+)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
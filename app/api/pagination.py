@@ -0,0 +1,40 @@
+import base64
+import json
+import os
+from datetime import datetime
+from typing import Any, Sequence
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, status
+
+load_dotenv()
+
+# Жёсткий предел размера страницы для всех списков.
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "200"))
+# Заголовок, в котором отдаётся курсор следующей страницы.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    # Непрозрачный курсор: значения ключа последней строки страницы.
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, types: Sequence[type]) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != len(types):
+            raise ValueError
+        values = []
+        for value, type_ in zip(payload, types):
+            if type_ is datetime:
+                value = datetime.fromisoformat(value)
+            elif not isinstance(value, type_) or isinstance(value, bool):
+                raise ValueError
+            values.append(value)
+        return tuple(values)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
@@ -1,16 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database.database import get_db
+from app.database.routing import get_user_read_db, sticky_reads, user_scope
+from app.database.upsert import insert_for
+from app.models import utcnow
 from app.models.course import Course
+from app.models.course_progress import CourseProgressCounter
 from app.models.progress import Progress
 from app.models.lesson import Lesson
-from app.auth.utils import get_current_user
-from app.models.user import User
-from sqlalchemy import select, func, and_
+from app.auth.utils import get_current_principal
+from app.events.hub import SubscriptionLimitExceeded
+from app.events.progress import SSE_MAX_STREAM_SECONDS, progress_event, progress_events, sse_stream, user_channel
+from app.metrics.route import TimedRoute
+from app.schemas.user import Principal
+from sqlalchemy import select, func, and_, literal, true
+
+from app.schemas.progress import (
+    BulkCompletionRequest,
+    BulkCompletionResponse,
+    CourseProgressSummary,
+    LessonCompletion,
+)
+
+router = APIRouter(prefix="/progress", tags=["Progress"], route_class=TimedRoute)
+
 
-from app.schemas.progress import CourseProgressSummary
+def lesson_course_total(lesson_id: int):
+    """
+    Число уроков курса, к которому относится урок, - для RETURNING счётчика, чтобы
+    собрать событие прогресса без отдельного SELECT. Подзапросы не коррелируют с
+    изменяемой таблицей и содержат по одной таблице: SQLite пишет колонки в RETURNING
+    без имени таблицы.
+    """
+    course_id = select(Lesson.course_id).where(Lesson.id == lesson_id).scalar_subquery()
+    return select(Course.lesson_count).where(Course.id == course_id).scalar_subquery()
 
-router = APIRouter(prefix="/progress", tags=["Progress"])
 
 @router.post(
     "/complete/{lesson_id}",
@@ -21,28 +50,157 @@ router = APIRouter(prefix="/progress", tags=["Progress"])
 async def complete_lesson(
     lesson_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    lesson = await db.get(Lesson, lesson_id)
-    if not lesson:
-        raise HTTPException(status_code=404, detail="Lesson not found")
-
-    result = await db.execute(
-        select(Progress).where(
-            Progress.user_id == current_user.id,
-            Progress.lesson_id == lesson_id
-        )
+    # Вставка идёт из SELECT по урокам, поэтому для несуществующего урока ничего
+    # не вставится. Уже пройденный урок не обновляется, и RETURNING тоже пуст.
+    now = utcnow()
+    stmt = insert_for(db, Progress).from_select(
+        ["user_id", "lesson_id", "is_completed", "completed_at", "updated_at"],
+        # FOR KEY SHARE: конкурирующее удаление урока (FOR UPDATE) дождётся этой отметки,
+        # либо отметка дождётся удаления и не найдёт урок.
+        select(literal(current_user.id), Lesson.id, true(), literal(now), literal(now))
+        .where(Lesson.id == lesson_id)
+        .with_for_update(read=True, key_share=True),
     )
-    progress = result.scalars().first()
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Progress.user_id, Progress.lesson_id],
+        set_={
+            "is_completed": True,
+            "completed_at": func.coalesce(Progress.completed_at, stmt.excluded.completed_at),
+            # onupdate не срабатывает для ON CONFLICT DO UPDATE - выставляем явно.
+            "updated_at": now,
+        },
+        where=Progress.is_completed.is_not(True),
+    ).returning(Progress.id)
 
-    if not progress:
-        progress = Progress(user_id=current_user.id, lesson_id=lesson_id)
-        db.add(progress)
+    result = await db.execute(stmt)
+    if result.scalar_one_or_none() is None:
+        lesson_exists = await db.scalar(select(Lesson.id).where(Lesson.id == lesson_id))
+        if lesson_exists is None:
+            raise HTTPException(status_code=404, detail="Lesson not found")
+        # Урок уже был пройден - счётчики не меняются.
+        return {"message": "Lesson marked as completed"}
 
-    progress.is_completed = True
+    counter = insert_for(db, CourseProgressCounter).from_select(
+        ["user_id", "course_id", "completed_count"],
+        select(literal(current_user.id), Lesson.course_id, literal(1)).where(Lesson.id == lesson_id),
+    )
+    counter = counter.on_conflict_do_update(
+        index_elements=[CourseProgressCounter.user_id, CourseProgressCounter.course_id],
+        set_={"completed_count": CourseProgressCounter.completed_count + 1},
+    ).returning(
+        CourseProgressCounter.course_id, CourseProgressCounter.completed_count, lesson_course_total(lesson_id)
+    )
+    course_id, completed, total = (await db.execute(counter)).one()
     await db.commit()
+    # Ближайшие чтения прогресса этого пользователя должны увидеть запись - идём в основную БД.
+    await sticky_reads.mark(user_scope(current_user.id))
+    # Событие - только после commit: клиент, получивший его, прочитает уже записанное.
+    await progress_events.publish(
+        user_channel(current_user.id), progress_event(course_id, [lesson_id], completed, total)
+    )
     return {"message": "Lesson marked as completed"}
 
+
+@router.post(
+    "/complete",
+    response_model=BulkCompletionResponse,
+    summary="Отметить несколько уроков как пройденные",
+    description="Принимает список ID уроков или пар (`lesson_id`, `completed_at`) и отмечает их пройденными одной транзакцией. Для каждого урока возвращает результат: `completed` или `not_found`. Размер пакета ограничен `PROGRESS_BATCH_MAX_SIZE`; `completed_at` из будущего (с запасом `PROGRESS_CLOCK_SKEW_SECONDS` на расхождение часов) отклоняется с 422."
+)
+async def complete_lessons_bulk(
+    batch: BulkCompletionRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    now = utcnow()
+    # Повторы одного урока схлопываем, оставляя самое раннее время прохождения.
+    completed_at: dict[int, datetime] = {}
+    for item in batch.items:
+        if not isinstance(item, LessonCompletion):
+            item = LessonCompletion(lesson_id=item)
+        # completed_at уже приведено к UTC без часового пояса при валидации.
+        ts = item.completed_at or now
+        if item.lesson_id not in completed_at or ts < completed_at[item.lesson_id]:
+            completed_at[item.lesson_id] = ts
+
+    result = await db.execute(
+        select(Lesson.id, Lesson.course_id, Course.lesson_count)
+        .join(Course, Course.id == Lesson.course_id)
+        .where(Lesson.id.in_(completed_at.keys()))
+        # Как в complete_lesson: отметки и удаление урока не перекрываются.
+        .with_for_update(read=True, key_share=True, of=Lesson)
+    )
+    lesson_courses = {}
+    # Число уроков курса - для событий прогресса.
+    course_totals: dict[int, int] = {}
+    for row in result:
+        lesson_courses[row.id] = row.course_id
+        course_totals[row.course_id] = row.lesson_count
+
+    if lesson_courses:
+        # Строки в порядке ключей: параллельные пакеты блокируют строки progress и
+        # счётчиков в одном порядке и не взаимоблокируются.
+        stmt = insert_for(db, Progress).values([
+            {
+                "user_id": current_user.id,
+                "lesson_id": lesson_id,
+                "is_completed": True,
+                "completed_at": completed_at[lesson_id],
+                "updated_at": now,
+            }
+            for lesson_id in sorted(lesson_courses)
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Progress.user_id, Progress.lesson_id],
+            set_={
+                "is_completed": True,
+                "completed_at": func.coalesce(Progress.completed_at, stmt.excluded.completed_at),
+                "updated_at": now,
+            },
+            where=Progress.is_completed.is_not(True),
+        ).returning(Progress.lesson_id)
+        newly_completed = (await db.execute(stmt)).scalars().all()
+
+        # Счётчики увеличиваем только на действительно новые прохождения.
+        per_course: dict[int, int] = {}
+        for lesson_id in newly_completed:
+            course_id = lesson_courses[lesson_id]
+            per_course[course_id] = per_course.get(course_id, 0) + 1
+        if per_course:
+            counter = insert_for(db, CourseProgressCounter).values([
+                {"user_id": current_user.id, "course_id": course_id, "completed_count": count}
+                for course_id, count in sorted(per_course.items())
+            ])
+            counter = counter.on_conflict_do_update(
+                index_elements=[CourseProgressCounter.user_id, CourseProgressCounter.course_id],
+                set_={
+                    "completed_count": CourseProgressCounter.completed_count + counter.excluded.completed_count
+                },
+            ).returning(CourseProgressCounter.course_id, CourseProgressCounter.completed_count)
+            counters = (await db.execute(counter)).all()
+        else:
+            counters = []
+        await db.commit()
+        await sticky_reads.mark(user_scope(current_user.id))
+        for course_id, completed in counters:
+            lesson_ids = [i for i in newly_completed if lesson_courses[i] == course_id]
+            await progress_events.publish(
+                user_channel(current_user.id),
+                progress_event(course_id, lesson_ids, completed, course_totals[course_id]),
+            )
+
+    results = [
+        {"lesson_id": lesson_id, "status": "completed" if lesson_id in lesson_courses else "not_found"}
+        for lesson_id in completed_at
+    ]
+    return {
+        "completed": len(lesson_courses),
+        "not_found": len(completed_at) - len(lesson_courses),
+        "results": results,
+    }
+
 @router.get(
     "/{course_id}/stats",
     response_model=CourseProgressSummary,
@@ -51,34 +209,34 @@ async def complete_lesson(
 )
 async def get_course_progress_summary(
     course_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_user_read_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
-    course = await db.get(Course, course_id)
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
-
+    # Счётчики поддерживаются при записи, здесь только поиск по первичным ключам.
     query = (
         select(
-            func.count(Lesson.id).label("total_lessons"),
-            func.count(Progress.id).filter(Progress.is_completed == True).label("completed_lessons")
+            Course.lesson_count.label("total_lessons"),
+            func.coalesce(CourseProgressCounter.completed_count, 0).label("completed_lessons"),
         )
-        .select_from(Lesson)
+        .select_from(Course)
         .outerjoin(
-            Progress,
+            CourseProgressCounter,
             and_(
-                Lesson.id == Progress.lesson_id,
-                Progress.user_id == current_user.id
+                CourseProgressCounter.course_id == Course.id,
+                CourseProgressCounter.user_id == current_user.id
             )
         )
-        .where(Lesson.course_id == course_id)
+        .where(Course.id == course_id)
     )
 
     result = await db.execute(query)
-    stats = result.one()
+    stats = result.one_or_none()
+    if stats is None:
+        raise HTTPException(status_code=404, detail="Course not found")
 
     total = stats.total_lessons
-    completed = stats.completed_lessons
+    # Защита от рассинхронизации счётчиков до их пересчёта.
+    completed = min(stats.completed_lessons, total)
 
     if total == 0:
         progress_percentage = 0.0
@@ -92,4 +250,37 @@ async def get_course_progress_summary(
         "completed_lessons": completed,
         "uncompleted_lessons": uncompleted,
         "progress_percentage": progress_percentage,
-    }
\ No newline at end of file
+    }
+
+
+@router.get(
+    "/events",
+    response_class=StreamingResponse,
+    summary="Поток изменений прогресса (Server-Sent Events)",
+    description=f"Держит открытым поток `text/event-stream` с изменениями прогресса текущего пользователя вместо периодического опроса `/progress/{{course_id}}/stats` и `/lessons/{{course_id}}/progress`. После каждой отметки уроков приходит событие `progress` с `course_id`, `lesson_ids` и сводкой курса в форме `/progress/{{course_id}}/stats`; событие `resync` означает, что часть событий потеряна и состояние нужно перечитать. Состояние на момент подключения (и переподключения) читайте обычными запросами. В простое приходят комментарии-пинги; через {SSE_MAX_STREAM_SECONDS:g} с поток закрывается, и клиент переподключается сам (`retry`). `course_id` ограничивает события выбранными курсами. Число одновременных потоков на пользователя ограничено (429).",
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def stream_progress_events(
+    course_id: Optional[List[int]] = Query(None, description="Только события этих курсов"),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    # Это та же сессия, что проверяла токен: отдаём соединение в пул, а не держим его весь поток.
+    await db.close()
+    try:
+        subscriber = await progress_events.open(user_channel(current_user.id))
+    except SubscriptionLimitExceeded as exc:
+        if exc.scope == "channel":
+            raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail="Too many event streams")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Event stream capacity exhausted",
+            headers={"Retry-After": "5"},
+        )
+    return StreamingResponse(
+        sse_stream(subscriber, course_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Если генератор так и не был запущен (клиент ушёл сразу), подписку снимет фоновая задача.
+        background=BackgroundTask(subscriber.close),
+    )
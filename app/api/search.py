@@ -0,0 +1,96 @@
+from enum import Enum
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.auth.utils import get_current_principal
+from app.database.routing import get_catalog_read_db
+from app.metrics.route import TimedRoute
+from app.models.course import Course
+from app.models.lesson import Lesson
+from app.models.material import Material
+from app.schemas.search import SearchHit
+from app.schemas.user import Principal
+from app.search.index import COURSE, LESSON, MATERIAL, SEARCH_SNIPPET_CHARS, search_index
+from app.search.text import parse_query, snippet
+
+router = APIRouter(prefix="/search", tags=["Search"], route_class=TimedRoute)
+
+
+class SearchKind(str, Enum):
+    course = COURSE
+    lesson = LESSON
+    material = MATERIAL
+
+
+async def load_hits(db: AsyncSession, results) -> dict:
+    """Строки найденных сущностей по видам - не больше одного запроса на вид."""
+    ids = {kind: [r.entity_id for r in results if r.kind == kind] for kind in (COURSE, LESSON, MATERIAL)}
+    rows = {}
+    if ids[COURSE]:
+        result = await db.execute(
+            select(Course.id, Course.title, Course.description).where(Course.id.in_(ids[COURSE]))
+        )
+        for id_, title, description in result:
+            rows[(COURSE, id_)] = {"title": title or "", "body": description, "course_id": id_, "lesson_id": None}
+    if ids[LESSON]:
+        result = await db.execute(
+            select(Lesson.id, Lesson.title, Lesson.course_id).where(Lesson.id.in_(ids[LESSON]))
+        )
+        for id_, title, course_id in result:
+            rows[(LESSON, id_)] = {"title": title, "body": None, "course_id": course_id, "lesson_id": id_}
+    if ids[MATERIAL]:
+        result = await db.execute(
+            select(Material.id, Material.title, Material.text, Material.lesson_id, Lesson.course_id)
+            .join(Lesson, Lesson.id == Material.lesson_id)
+            .where(Material.id.in_(ids[MATERIAL]))
+        )
+        for id_, title, text, lesson_id, course_id in result:
+            rows[(MATERIAL, id_)] = {"title": title, "body": text, "course_id": course_id, "lesson_id": lesson_id}
+    return rows
+
+
+@router.get(
+    "/",
+    response_model=List[SearchHit],
+    summary="Полнотекстовый поиск по каталогу",
+    description="Ищет курсы (название и описание), уроки (название) и материалы (название и текст). Слова запроса через пробел обязательны все, `-слово` исключает документы со словом. Результаты упорядочены по релевантности, у каждого - фрагмент текста с подсветкой совпадений. Для перехода на следующую страницу передайте значение заголовка `X-Next-Cursor` в параметре `cursor`. Доступно для авторизованных пользователей."
+)
+async def search_catalog(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="Поисковый запрос"),
+    kind: Optional[List[SearchKind]] = Query(None, description="Искать только среди сущностей этих видов"),
+    cursor: Optional[str] = Query(None, description="Курсор следующей страницы из заголовка X-Next-Cursor"),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE, description="Максимальное количество результатов"),
+    db: AsyncSession = Depends(get_catalog_read_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    # Порядок по релевантности пересчитывается на каждый запрос, поэтому курсор - смещение.
+    offset = decode_cursor(cursor, (int,))[0] if cursor else 0
+    kinds = [k.value for k in kind or ()]
+    results = await search_index.search(db, q, kinds, limit + 1, offset)
+    if len(results) > limit:
+        results = results[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(offset + limit)
+
+    rows = await load_hits(db, results)
+    terms, _ = parse_query(q)
+    hits = []
+    for result in results:
+        row = rows.get((result.kind, result.entity_id))
+        if row is None:
+            # Сущность удалена после поиска или индекс отстаёт (реплика).
+            continue
+        hits.append({
+            "kind": result.kind,
+            "id": result.entity_id,
+            "title": row["title"],
+            "snippet": snippet(row["body"] or row["title"], terms, SEARCH_SNIPPET_CHARS),
+            "score": result.score,
+            "course_id": row["course_id"],
+            "lesson_id": row["lesson_id"],
+        })
+    return hits
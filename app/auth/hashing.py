@@ -0,0 +1,152 @@
+# app/auth/hashing.py
+
+import asyncio
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+import bcrypt
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# "thread" или "process": bcrypt отпускает GIL, поэтому потоков обычно достаточно.
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+# Сколько операций bcrypt может выполняться одновременно, остальные ждут в очереди.
+PASSWORD_HASH_CONCURRENCY = int(os.getenv("PASSWORD_HASH_CONCURRENCY", str(PASSWORD_HASH_WORKERS)))
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+LATENCY_WINDOW = 1000
+
+
+def hash_password(password: str, rounds: int = BCRYPT_ROUNDS) -> str:
+    # Синхронное хеширование; функция верхнего уровня, чтобы её можно было передать в процесс.
+    salt = bcrypt.gensalt(rounds=rounds)
+    return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
+
+
+def check_password(password: str, hashed_password: str) -> bool:
+    return bcrypt.checkpw(password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+
+def hash_rounds(hashed_password: str) -> Optional[int]:
+    # Стоимость хранится в самом хеше: $2b$12$<salt+hash>
+    try:
+        return int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class PasswordHasher:
+    """Выполняет bcrypt в пуле потоков/процессов, не блокируя event loop."""
+
+    def __init__(
+        self,
+        executor: str = PASSWORD_HASH_EXECUTOR,
+        workers: int = PASSWORD_HASH_WORKERS,
+        concurrency: int = PASSWORD_HASH_CONCURRENCY,
+        rounds: int = BCRYPT_ROUNDS,
+    ):
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unknown PASSWORD_HASH_EXECUTOR: {executor}")
+        self.executor_kind = executor
+        self.workers = workers
+        self.concurrency = concurrency
+        self.rounds = rounds
+        self._executor: Optional[Executor] = None
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._waits: deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def _run(self, func, *args):
+        queued_at = time.perf_counter()
+        self._queued += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            # Уменьшаем и при отмене запроса, который так и не дошёл до пула.
+            self._queued -= 1
+        self._running += 1
+        started_at = time.perf_counter()
+        self._waits.append(started_at - queued_at)
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(self._get_executor(), func, *args)
+        except BaseException:
+            self._finish(started_at)
+            raise
+        # Слот занят, пока задача не завершится в пуле, а не пока её ждёт запрос: при отмене
+        # запроса bcrypt всё равно выполняется, и лимит с глубиной очереди должны это учитывать.
+        future.add_done_callback(lambda done: self._finish(started_at, done))
+        return await asyncio.shield(future)
+
+    def _finish(self, started_at: float, future: Optional[asyncio.Future] = None) -> None:
+        if future is not None and not future.cancelled():
+            # Результат отменённого запроса никто не ждёт - помечаем исключение полученным.
+            future.exception()
+        self._running -= 1
+        self._completed += 1
+        self._latencies.append(time.perf_counter() - started_at)
+        self._semaphore.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password, self.rounds)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(check_password, password, hashed_password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        # Хеш создан с другой стоимостью - пересчитываем при следующем успешном входе.
+        return hash_rounds(hashed_password) != self.rounds
+
+    def stats(self) -> dict:
+        latencies = list(self._latencies)
+        waits = list(self._waits)
+        return {
+            "executor": self.executor_kind,
+            "workers": self.workers,
+            "concurrency": self.concurrency,
+            "rounds": self.rounds,
+            "queue_depth": self._queued,
+            "in_flight": self._running,
+            "completed": self._completed,
+            "hash_latency_ms": {
+                "p50": round(_percentile(latencies, 0.50) * 1000, 2),
+                "p95": round(_percentile(latencies, 0.95) * 1000, 2),
+                "max": round(max(latencies, default=0.0) * 1000, 2),
+            },
+            "queue_wait_ms": {
+                "p50": round(_percentile(waits, 0.50) * 1000, 2),
+                "p95": round(_percentile(waits, 0.95) * 1000, 2),
+                "max": round(max(waits, default=0.0) * 1000, 2),
+            },
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
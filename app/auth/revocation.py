@@ -0,0 +1,61 @@
+# app/auth/revocation.py
+
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User
+
+load_dotenv()
+
+# Сколько секунд доверять закешированной версии токенов пользователя.
+TOKEN_VERSION_TTL = float(os.getenv("TOKEN_VERSION_TTL", "30"))
+# Сколько пользователей держать в кеше версий.
+TOKEN_VERSION_CACHE_SIZE = int(os.getenv("TOKEN_VERSION_CACHE_SIZE", "100000"))
+
+
+class TokenVersionCache:
+    """
+    Короткоживущий кеш users.token_version для проверки отзыва токенов.
+    Записи упорядочены по времени записи: истёкшие вытесняются с начала, размер ограничен.
+    """
+
+    def __init__(self, ttl: float = TOKEN_VERSION_TTL, max_size: int = TOKEN_VERSION_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._versions: OrderedDict[int, tuple[Optional[int], float]] = OrderedDict()
+
+    async def get(self, db: AsyncSession, user_id: int) -> Optional[int]:
+        # None - пользователь удалён.
+        entry = self._versions.get(user_id)
+        now = time.monotonic()
+        if entry is not None:
+            if now - entry[1] < self.ttl:
+                return entry[0]
+            del self._versions[user_id]
+        result = await db.execute(select(User.token_version).where(User.id == user_id))
+        version = result.scalar_one_or_none()
+        self._put(user_id, version, now)
+        return version
+
+    def set(self, user_id: int, version: int) -> None:
+        self._put(user_id, version, time.monotonic())
+
+    def _put(self, user_id: int, version: Optional[int], now: float) -> None:
+        self._versions[user_id] = (version, now)
+        self._versions.move_to_end(user_id)
+        while self._versions and (
+            len(self._versions) > self.max_size or now - next(iter(self._versions.values()))[1] >= self.ttl
+        ):
+            self._versions.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        self._versions.pop(user_id, None)
+
+
+token_versions = TokenVersionCache()
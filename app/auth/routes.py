@@ -1,21 +1,28 @@
 # app/auth/routes.py (ФИНАЛЬНАЯ ВЕРСИЯ)
 
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, status, Body, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
 
 from app.database.database import get_db
 from app.models.user import User
+from app.api.fast_json import schema_columns
 from app.schemas.user import UserCreate, UserOut, UserLogin
 from app.schemas.token import Token
+from app.auth.hashing import password_hasher
+from app.auth.revocation import token_versions
 from app.auth.utils import (
-    get_password_hash,
-    verify_password,
-    create_access_token,
-    get_current_user
+    create_user_access_token,
+    get_current_user,
+    get_current_principal
 )
+from app.schemas.user import Principal
+from app.metrics.route import TimedRoute
 
-router = APIRouter(prefix="/auth", tags=["Auth"])
+router = APIRouter(prefix="/auth", tags=["Auth"], route_class=TimedRoute)
 
 
 
@@ -25,30 +32,58 @@ async def get_user_by_username(db: AsyncSession, username: str) -> User | None:
     return result.scalar_one_or_none()
 
 
+def duplicate_user_field(exc: IntegrityError) -> Optional[str]:
+    """
+    Какое поле пользователя уже занято, по нарушенному ограничению уникальности: SQLite
+    называет колонку (users.email), PostgreSQL - индекс ("ix_users_email"); None - другое
+    ограничение. Смотрим только первую строку: в DETAIL PostgreSQL есть само значение.
+    """
+    lines = str(exc.orig).splitlines()
+    message = lines[0] if lines else ""
+    for field, column in (("Email", "email"), ("Username", "username")):
+        if f"UNIQUE constraint failed: users.{column}" in message or f'"ix_users_{column}"' in message:
+            return field
+    return None
+
+
+async def create_user(db: AsyncSession, user: UserCreate, is_admin: bool = False):
+    """
+    Один INSERT ... RETURNING; уникальность имени и email проверяют индексы БД,
+    а не отдельные SELECT перед вставкой (между ними мог успеть зарегистрироваться другой).
+    Пароль хешируется до вставки, так что повторная регистрация тоже занимает слот
+    bcrypt в общем с входом пуле (PASSWORD_HASH_CONCURRENCY).
+    """
+    hashed_password = await password_hasher.hash(user.password)
+    try:
+        db_user = (await db.execute(
+            insert(User)
+            .values(
+                username=user.username,
+                email=user.email,
+                hashed_password=hashed_password,
+                is_admin=is_admin,
+            )
+            .returning(*schema_columns(UserOut, User))
+        )).one()
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        field = duplicate_user_field(exc)
+        if field is None:
+            raise
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"{field} already registered")
+    return db_user
+
+
 @router.post(
     "/register",
     response_model=UserOut,
     status_code=status.HTTP_201_CREATED,
     summary="Регистрация нового пользователя",
-    description="Создает нового обычного пользователя (не администратора). Проверяет уникальность имени пользователя и адреса электронной почты перед созданием."
+    description="Создает нового обычного пользователя (не администратора). Имя пользователя и адрес электронной почты должны быть уникальными."
 )
 async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
-    if await get_user_by_username(db, user.username):
-        raise HTTPException(status_code=400, detail="Username already registered")
-
-    result = await db.execute(select(User).where(User.email == user.email))
-    if result.scalar_one_or_none():
-        raise HTTPException(status_code=400, detail="Email already registered")
-
-    db_user = User(
-        username=user.username,
-        email=user.email,
-        hashed_password=get_password_hash(user.password) # <-- ИСПОЛЬЗУЕМ НОВУЮ ФУНКЦИЮ
-    )
-    db.add(db_user)
-    await db.commit()
-    await db.refresh(db_user)
-    return db_user
+    return await create_user(db, user)
 
 
 @router.post(
@@ -63,13 +98,19 @@ async def login(
 ):
     user = await get_user_by_username(db, schema.username)
 
-    if not user or not verify_password(schema.password, user.hashed_password):
+    if not user or not await password_hasher.verify(schema.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password"
         )
 
-    access_token = create_access_token(data={"sub": str(user.id)})
+    # Стоимость bcrypt изменилась - пароль известен, прозрачно пересчитываем хеш.
+    if password_hasher.needs_rehash(user.hashed_password):
+        user.hashed_password = await password_hasher.hash(schema.password)
+        await db.commit()
+
+    token_versions.set(user.id, user.token_version)
+    access_token = create_user_access_token(user)
     return {"access_token": access_token, "token_type": "bearer"}
 
 
@@ -82,6 +123,28 @@ async def login(
 async def read_users_me(current_user: User = Depends(get_current_user)): # <-- ИСПОЛЬЗУЕМ НОВУЮ ЗАВИСИМОСТЬ
     return current_user
 
+
+@router.post(
+    "/logout-all",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Отозвать все токены",
+    description="Делает недействительными все выданные текущему пользователю токены. На других воркерах отзыв вступает в силу в течение TOKEN_VERSION_TTL секунд."
+)
+async def logout_all(
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    result = await db.execute(
+        update(User)
+        .where(User.id == current_user.id)
+        .values(token_version=User.token_version + 1)
+        .returning(User.token_version)
+    )
+    version = result.scalar_one()
+    await db.commit()
+    token_versions.set(current_user.id, version)
+    return
+
 @router.post(
     "/register/admin",
     response_model=UserOut,
@@ -101,22 +164,4 @@ async def register_admin(
             detail="Неверный ключ доступа для создания администратора"
         )
 
-
-    if await get_user_by_username(db, admin_data.username):
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Username already registered")
-
-    result = await db.execute(select(User).where(User.email == admin_data.email))
-    if result.scalar_one_or_none():
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
-
-    db_admin = User(
-        username=admin_data.username,
-        email=admin_data.email,
-        hashed_password=get_password_hash(admin_data.password),
-        is_admin=True
-    )
-    db.add(db_admin)
-    await db.commit()
-    await db.refresh(db_admin)
-
-    return db_admin
\ No newline at end of file
+    return await create_user(db, admin_data, is_admin=True)
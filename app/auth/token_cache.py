@@ -0,0 +1,77 @@
+# app/auth/token_cache.py
+
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from app.schemas.token import TokenData
+
+load_dotenv()
+
+# Сколько проверенных токенов держать в памяти; 0 отключает кеш.
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "10000"))
+
+
+class VerifiedTokenCache:
+    """LRU уже проверенных JWT. Запись живёт до `exp` токена."""
+
+    def __init__(self, max_size: int = JWT_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: OrderedDict[bytes, tuple[TokenData, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        # Храним дайджест, а не сам токен.
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> Optional[TokenData]:
+        if self.max_size <= 0:
+            return None
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        token_data, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return token_data
+
+    def put(self, token: str, token_data: TokenData, expires_at: Optional[float]) -> None:
+        # Токены без exp не кешируем: у записи не было бы срока жизни.
+        if self.max_size <= 0 or expires_at is None:
+            return
+        key = self._key(token)
+        self._entries[key] = (token_data, float(expires_at))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+token_cache = VerifiedTokenCache()
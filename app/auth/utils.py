@@ -1,6 +1,6 @@
 # app/security.py
 
-import bcrypt
+import os
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
@@ -10,33 +10,34 @@ from jose import JWTError, jwt
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.auth.hashing import BCRYPT_ROUNDS, check_password, hash_password
+from app.auth.revocation import token_versions
+from app.auth.token_cache import token_cache
 from app.database.database import get_db
+from app.metrics.timing import timed
 from app.models.user import User
 from app.schemas.token import TokenData
+from app.schemas.user import Principal
 
 SECRET_KEY = "a_very_secret_key_for_course_platform"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 120
+# Класть ли username/email/is_admin в токен при входе.
+JWT_EMBED_CLAIMS = os.getenv("JWT_EMBED_CLAIMS", "0") == "1"
+# Аудитория токена ленты календаря: decode_token (без audience) такой токен отвергает,
+# а decode_calendar_token не принимает обычные токены доступа.
+CALENDAR_TOKEN_AUDIENCE = "calendar"
 
 
 
 def get_password_hash(password: str) -> str:
-    # Получение хеша пароля.
-    password_bytes = password.encode('utf-8')
-
-    salt = bcrypt.gensalt()
-    hashed_password_bytes = bcrypt.hashpw(password_bytes, salt)
-
-    return hashed_password_bytes.decode('utf-8')
+    # Получение хеша пароля. Блокирует поток - в обработчиках используйте password_hasher.
+    return hash_password(password, BCRYPT_ROUNDS)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     # Сверяет обычный пароль с захешированным паролем.
-    plain_password_bytes = plain_password.encode('utf-8')
-
-    hashed_password_bytes = hashed_password.encode('utf-8')
-
-    return bcrypt.checkpw(plain_password_bytes, hashed_password_bytes)
+    return check_password(plain_password, hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -51,37 +52,76 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def create_user_access_token(user: User, expires_delta: Optional[timedelta] = None) -> str:
+    # Создает токен для пользователя; с JWT_EMBED_CLAIMS в него попадают данные пользователя.
+    data = {"sub": str(user.id)}
+    if JWT_EMBED_CLAIMS:
+        data.update({
+            "username": user.username,
+            "email": user.email,
+            "is_admin": bool(user.is_admin),
+            "ver": user.token_version or 0,
+        })
+    return create_access_token(data=data, expires_delta=expires_delta)
+
+def create_calendar_token(user_id: int, token_version: int) -> str:
+    # Бессрочный: календарь опрашивает ссылку на ленту месяцами. Отзыв - POST /auth/logout-all.
+    data = {"sub": str(user_id), "ver": token_version, "aud": CALENDAR_TOKEN_AUDIENCE}
+    return jwt.encode(data, SECRET_KEY, algorithm=ALGORITHM)
+
+def decode_calendar_token(token: str) -> TokenData:
+    payload = jwt.decode(
+        token, SECRET_KEY, algorithms=ALGORITHM, audience=CALENDAR_TOKEN_AUDIENCE, options={"require_aud": True}
+    )
+    return TokenData.model_validate(payload)
+
 def decode_token(token: str) -> TokenData:
     #Декодирует токен и возвращает данные токена.
+    # Повторно присланный токен берём из кеша без проверки подписи.
+    token_data = token_cache.get(token)
+    if token_data is not None:
+        return token_data
 
     payload = jwt.decode(token, SECRET_KEY, algorithms=ALGORITHM)
 
-    return TokenData.model_validate(payload)
+    token_data = TokenData.model_validate(payload)
+    token_cache.put(token, token_data, payload.get("exp"))
+    return token_data
 
-async def check_jwt(credentials: HTTPBearer = Depends(HTTPBearer(auto_error=False))) -> int:
-    # Проверяет токен пользователя, используется в роутерах.
+async def get_token_data(credentials: HTTPBearer = Depends(HTTPBearer(auto_error=False))) -> TokenData:
+    # Проверяет токен и возвращает его содержимое.
     try:
         if not credentials:
             raise JWTError
-        token_data = decode_token(credentials.credentials)
-        return int(token_data.sub)
+        with timed("auth"):
+            token_data = decode_token(credentials.credentials)
+        if token_data.sub is None:
+            raise JWTError
+        return token_data
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Ошибка аутентификации")
+
+async def check_jwt(token_data: TokenData = Depends(get_token_data)) -> int:
+    # Проверяет токен пользователя, используется в роутерах.
+    return int(token_data.sub)
 async def check_admin(user: User) -> User:
     if not user.is_admin:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Недостаточно прав для выполнения этого действия.")
     return user
 
 async def get_current_user(
-    user_id: int = Depends(check_jwt),
+    token_data: TokenData = Depends(get_token_data),
     db: AsyncSession = Depends(get_db)
 ) -> User:
     """Получает user_id из токена, затем загружает пользователя из БД."""
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    with timed("auth"):
+        result = await db.execute(select(User).where(User.id == int(token_data.sub)))
+        user = result.scalar_one_or_none()
     if not user:
         # Эта ситуация маловероятна, если токен валиден, но это хорошая проверка
         raise HTTPException(status_code=404, detail="User not found")
+    if (token_data.ver or 0) != user.token_version:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Ошибка аутентификации")
     return user
 async def get_current_admin_user(
     current_user: User = Depends(get_current_user)
@@ -97,3 +137,42 @@ async def get_current_admin_user(
             detail="Недостаточно прав для выполнения этого действия."
         )
     return current_user
+
+async def get_current_principal(
+    token_data: TokenData = Depends(get_token_data),
+    db: AsyncSession = Depends(get_db)
+) -> Principal:
+    """
+    Собирает текущего пользователя из claims токена.
+    В БД обращается только за версией токенов (с коротким кешем) или,
+    для токенов без claims, за самим пользователем.
+    """
+    user_id = int(token_data.sub)
+    if token_data.username is None or token_data.email is None:
+        user = await get_current_user(token_data, db)
+        token_versions.set(user.id, user.token_version)
+        return Principal.model_validate(user)
+
+    with timed("auth"):
+        version = await token_versions.get(db, user_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    if (token_data.ver or 0) != version:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Ошибка аутентификации")
+    return Principal(
+        id=user_id,
+        username=token_data.username,
+        email=token_data.email,
+        is_admin=bool(token_data.is_admin),
+    )
+
+async def get_current_admin_principal(
+    current_user: Principal = Depends(get_current_principal)
+) -> Principal:
+    """То же, что get_current_admin_user, но без загрузки пользователя из БД."""
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Недостаточно прав для выполнения этого действия."
+        )
+    return current_user
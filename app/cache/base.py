@@ -0,0 +1,45 @@
+from abc import ABC, abstractmethod
+from typing import Iterable, Optional
+
+
+class CacheBackend(ABC):
+    """Хранилище байтовых значений с TTL и тегами для точечной инвалидации."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float, tags: Iterable[str] = ()) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        ...
+
+    @abstractmethod
+    async def invalidate_tags(self, *tags: str) -> int:
+        """Удаляет все ключи с любым из тегов, возвращает количество удалённых ключей."""
+
+    @abstractmethod
+    def stats(self) -> dict:
+        ...
+
+
+class NullCacheBackend(CacheBackend):
+    """Кеш выключен: всегда промах."""
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    async def set(self, key: str, value: bytes, ttl: float, tags: Iterable[str] = ()) -> None:
+        return None
+
+    async def delete(self, *keys: str) -> None:
+        return None
+
+    async def invalidate_tags(self, *tags: str) -> int:
+        return 0
+
+    def stats(self) -> dict:
+        return {"backend": "none"}
@@ -0,0 +1,113 @@
+import json
+import os
+from typing import Any, Iterable, Optional
+
+from dotenv import load_dotenv
+
+from app.cache.base import CacheBackend, NullCacheBackend
+from app.cache.memory import MemoryCacheBackend
+from app.cache.shared import InMemoryKeyValueStore, SharedCacheBackend
+
+load_dotenv()
+
+# memory - кеш в процессе, shared - общий (Redis по CACHE_REDIS_URL или локальная замена), none - выключен.
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_TTL = float(os.getenv("CACHE_TTL", "60"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL")
+
+
+def create_backend(name: str = CACHE_BACKEND) -> CacheBackend:
+    if name == "none":
+        return NullCacheBackend()
+    if name == "memory":
+        return MemoryCacheBackend(max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES)
+    if name == "shared":
+        if CACHE_REDIS_URL:
+            try:
+                from redis.asyncio import Redis
+            except ImportError as exc:
+                raise RuntimeError("CACHE_REDIS_URL requires the `redis` package") from exc
+            return SharedCacheBackend(Redis.from_url(CACHE_REDIS_URL))
+        return SharedCacheBackend(InMemoryKeyValueStore())
+    raise ValueError(f"Unknown CACHE_BACKEND: {name}")
+
+
+# Ключи и теги каталога. Тег описывает, при изменении чего запись устаревает.
+def course_key(course_id: int) -> str:
+    return f"course:{course_id}"
+
+
+def course_tag(course_id: int) -> str:
+    return f"course:{course_id}"
+
+
+COURSES_TAG = "courses"
+
+
+def course_lessons_tag(course_id: int) -> str:
+    return f"course:{course_id}:lessons"
+
+
+def lesson_key(lesson_id: int) -> str:
+    return f"lesson:{lesson_id}"
+
+
+def lesson_tag(lesson_id: int) -> str:
+    return f"lesson:{lesson_id}"
+
+
+def lesson_materials_tag(lesson_id: int) -> str:
+    return f"lesson:{lesson_id}:materials"
+
+
+def material_key(material_id: int) -> str:
+    return f"material:{material_id}"
+
+
+def material_text_key(material_id: int) -> str:
+    return f"material:{material_id}:text"
+
+
+def material_tag(material_id: int) -> str:
+    return f"material:{material_id}"
+
+
+def list_key(prefix: str, **params: Any) -> str:
+    return prefix + ":" + "&".join(f"{name}={params[name]}" for name in sorted(params))
+
+
+class CatalogCache:
+    """Read-through кеш JSON-представлений каталога поверх любого CacheBackend."""
+
+    def __init__(self, backend: CacheBackend, ttl: float = CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+
+    async def get_json(self, key: str) -> Optional[Any]:
+        raw = await self.backend.get(key)
+        return None if raw is None else json.loads(raw)
+
+    async def set_json(self, key: str, value: Any, tags: Iterable[str] = ()) -> None:
+        raw = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        await self.backend.set(key, raw, self.ttl, tags)
+
+    async def get_bytes(self, key: str) -> Optional[bytes]:
+        return await self.backend.get(key)
+
+    async def set_bytes(self, key: str, value: bytes, tags: Iterable[str] = ()) -> None:
+        await self.backend.set(key, value, self.ttl, tags)
+
+    async def invalidate(self, keys: Iterable[str] = (), tags: Iterable[str] = ()) -> None:
+        keys, tags = tuple(keys), tuple(tags)
+        if keys:
+            await self.backend.delete(*keys)
+        if tags:
+            await self.backend.invalidate_tags(*tags)
+
+    def stats(self) -> dict:
+        return {"ttl": self.ttl, **self.backend.stats()}
+
+
+catalog_cache = CatalogCache(create_backend())
@@ -0,0 +1,144 @@
+import time
+from typing import Iterable, Optional, Protocol
+
+from app.cache.base import CacheBackend
+
+TAG_PREFIX = "tag:"
+
+
+class KeyValueStore(Protocol):
+    """Подмножество API redis.asyncio.Redis, которого достаточно общему кешу."""
+
+    async def get(self, key: str) -> Optional[bytes]: ...
+
+    async def set(self, key: str, value: bytes, ex: Optional[int] = None) -> object: ...
+
+    async def delete(self, *keys: str) -> int: ...
+
+    async def exists(self, *keys: str) -> int: ...
+
+    async def sadd(self, key: str, *members: str) -> int: ...
+
+    async def smembers(self, key: str) -> set: ...
+
+    async def expire(self, key: str, seconds: int) -> object: ...
+
+
+class InMemoryKeyValueStore:
+    """Локальная замена Redis для разработки и тестов (один процесс)."""
+
+    def __init__(self):
+        self._values: dict[str, tuple[object, Optional[float]]] = {}
+
+    def _get(self, key: str):
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._values[key]
+            return None
+        return value
+
+    async def get(self, key: str) -> Optional[bytes]:
+        value = self._get(key)
+        return value if isinstance(value, bytes) else None
+
+    async def set(self, key: str, value: bytes, ex: Optional[int] = None) -> bool:
+        self._values[key] = (value, time.monotonic() + ex if ex else None)
+        return True
+
+    async def delete(self, *keys: str) -> int:
+        return sum(self._values.pop(key, None) is not None for key in keys)
+
+    async def exists(self, *keys: str) -> int:
+        return sum(self._get(key) is not None for key in keys)
+
+    async def sadd(self, key: str, *members: str) -> int:
+        current = self._get(key)
+        if not isinstance(current, set):
+            current = set()
+            self._values[key] = (current, None)
+        before = len(current)
+        current.update(m.encode("utf-8") for m in members)
+        return len(current) - before
+
+    async def smembers(self, key: str) -> set:
+        value = self._get(key)
+        return set(value) if isinstance(value, set) else set()
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        value = self._get(key)
+        if value is None:
+            return False
+        self._values[key] = (value, time.monotonic() + seconds)
+        return True
+
+    def memory_usage(self) -> int:
+        total = 0
+        for value, _ in self._values.values():
+            if isinstance(value, bytes):
+                total += len(value)
+            elif isinstance(value, set):
+                total += sum(len(m) for m in value)
+        return total
+
+
+class SharedCacheBackend(CacheBackend):
+    """Кеш во внешнем хранилище (Redis), общий для всех воркеров. Теги - множества ключей."""
+
+    def __init__(self, store: KeyValueStore, prefix: str = "catalog:"):
+        self.store = store
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        value = await self.store.get(self.prefix + key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float, tags: Iterable[str] = ()) -> None:
+        ttl = max(1, int(ttl))
+        await self.store.set(self.prefix + key, value, ex=ttl)
+        for tag in tags:
+            tag_key = self.prefix + TAG_PREFIX + tag
+            await self.store.sadd(tag_key, key)
+            # Множество тега живёт не дольше самих ключей, чтобы не копить мусор.
+            await self.store.expire(tag_key, ttl)
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            self.invalidations += await self.store.delete(*(self.prefix + key for key in keys))
+
+    async def invalidate_tags(self, *tags: str) -> int:
+        keys = set()
+        for tag in tags:
+            members = await self.store.smembers(self.prefix + TAG_PREFIX + tag)
+            keys.update(m.decode("utf-8") if isinstance(m, bytes) else m for m in members)
+        if tags:
+            await self.store.delete(*(self.prefix + TAG_PREFIX + tag for tag in tags))
+        if not keys:
+            return 0
+        removed = await self.store.delete(*(self.prefix + key for key in keys))
+        self.invalidations += removed
+        return removed
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        stats = {
+            "backend": "shared",
+            "store": type(self.store).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+        memory_usage = getattr(self.store, "memory_usage", None)
+        if callable(memory_usage):
+            stats["bytes"] = memory_usage()
+        return stats
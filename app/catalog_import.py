@@ -0,0 +1,186 @@
+# app/catalog_import.py
+# Потоковый импорт каталога из NDJSON: одна строка - курс с уроками и материалами.
+
+import json
+import os
+from datetime import datetime
+from typing import AsyncIterator
+
+from dotenv import load_dotenv
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.bulk import insert_returning_ids
+from app.models.course import Course
+from app.models.lesson import Lesson
+from app.models.material import Material
+from app.schemas.catalog_import import CourseImport
+from app.search.index import course_document, lesson_document, material_document, search_index
+
+load_dotenv()
+
+# Сколько строк (курсы + уроки + материалы) вставлять одной транзакцией.
+IMPORT_BATCH_ROWS = int(os.getenv("IMPORT_BATCH_ROWS", "2000"))
+# Максимальная длина одной строки NDJSON - ограничивает память на разбор.
+IMPORT_MAX_LINE_BYTES = int(os.getenv("IMPORT_MAX_LINE_BYTES", str(16 * 1024 * 1024)))
+# Сколько ошибок возвращать в отчёте; остальные только считаются.
+IMPORT_MAX_ERRORS = 1000
+
+
+class LineTooLong(ValueError):
+    def __init__(self, line: int):
+        super().__init__(f"Line is longer than {IMPORT_MAX_LINE_BYTES} bytes")
+        self.line = line
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, bytes]]:
+    """Разбивает поток байтов на строки по мере поступления; в памяти не больше одной строки."""
+    buffer = b""
+    number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            number += 1
+            if len(line) > IMPORT_MAX_LINE_BYTES:
+                raise LineTooLong(number)
+            yield number, line
+        if len(buffer) > IMPORT_MAX_LINE_BYTES:
+            raise LineTooLong(number + 1)
+    if buffer:
+        yield number + 1, buffer
+
+
+def _format_validation_error(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'record'}: {error['msg']}"
+        for error in exc.errors()[:5]
+    )
+
+
+def _database_error(exc: SQLAlchemyError) -> str:
+    return f"Database error: {getattr(exc, 'orig', None) or exc}"
+
+
+def _row_count(course: CourseImport) -> int:
+    return 1 + sum(1 + len(lesson.materials) for lesson in course.lessons)
+
+
+class CatalogImporter:
+    """Копит разобранные курсы и вставляет их пачками многострочных INSERT ... RETURNING (insert_returning_ids)."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.batch: list[tuple[int, CourseImport]] = []
+        self.batch_rows = 0
+        self.report = {"lines": 0, "courses": 0, "lessons": 0, "materials": 0, "failed": 0, "errors": []}
+
+    def error(self, line: int, message: str) -> None:
+        self.report["failed"] += 1
+        if len(self.report["errors"]) < IMPORT_MAX_ERRORS:
+            self.report["errors"].append({"line": line, "error": message})
+
+    async def add(self, line: int, raw: bytes) -> None:
+        raw = raw.strip()
+        if not raw:
+            return
+        self.report["lines"] += 1
+        try:
+            course = CourseImport.model_validate(json.loads(raw))
+        except json.JSONDecodeError as exc:
+            self.error(line, f"Invalid JSON: {exc.msg}")
+            return
+        except ValidationError as exc:
+            self.error(line, _format_validation_error(exc))
+            return
+        self.batch.append((line, course))
+        self.batch_rows += _row_count(course)
+        if self.batch_rows >= IMPORT_BATCH_ROWS:
+            await self.flush()
+
+    async def flush(self) -> None:
+        batch, self.batch, self.batch_rows = self.batch, [], 0
+        if not batch:
+            return
+        try:
+            counts = await self._insert([course for _, course in batch])
+        except SQLAlchemyError as exc:
+            await self.db.rollback()
+            if len(batch) == 1:
+                self.error(batch[0][0], _database_error(exc))
+                return
+            # Пачка не вставилась - повторяем по одному курсу, чтобы найти виноватую строку.
+            for line, course in batch:
+                try:
+                    counts = await self._insert([course])
+                except SQLAlchemyError as exc:
+                    await self.db.rollback()
+                    self.error(line, _database_error(exc))
+                    continue
+                self._count(counts)
+            return
+        self._count(counts)
+
+    def _count(self, counts: dict) -> None:
+        for key, value in counts.items():
+            self.report[key] += value
+
+    async def _insert(self, courses: list[CourseImport]) -> dict:
+        # lesson_count заполняется сразу - отдельный пересчёт счётчиков не нужен.
+        course_ids = await insert_returning_ids(self.db, Course, [
+            {"title": c.title, "description": c.description, "lesson_count": len(c.lessons)}
+            for c in courses
+        ])
+
+        lessons = [
+            (course_id, lesson)
+            for course_id, course in zip(course_ids, courses)
+            for lesson in course.lessons
+        ]
+        lesson_ids = []
+        if lessons:
+            now = datetime.now()
+            lesson_ids = await insert_returning_ids(self.db, Lesson, [
+                {
+                    "course_id": course_id,
+                    "title": lesson.title,
+                    # Как в create_lesson: часовой пояс отбрасывается, без даты - текущее время.
+                    "scheduled_at": lesson.scheduled_at.replace(tzinfo=None) if lesson.scheduled_at else now,
+                }
+                for course_id, lesson in lessons
+            ])
+
+        materials = [
+            {"lesson_id": lesson_id, "title": material.title, "text": material.text}
+            for lesson_id, (_, lesson) in zip(lesson_ids, lessons)
+            for material in lesson.materials
+        ]
+        material_ids = await insert_returning_ids(self.db, Material, materials)
+
+        await search_index.upsert(self.db, [
+            *(course_document(i, c.title, c.description) for i, c in zip(course_ids, courses)),
+            *(lesson_document(i, lesson.title) for i, (_, lesson) in zip(lesson_ids, lessons)),
+            *(material_document(i, m["title"], m["text"]) for i, m in zip(material_ids, materials)),
+        ])
+        await self.db.commit()
+        return {"courses": len(course_ids), "lessons": len(lesson_ids), "materials": len(materials)}
+
+
+async def import_ndjson(db: AsyncSession, chunks: AsyncIterator[bytes]) -> dict:
+    """
+    Импортирует курсы из потока NDJSON. Ошибочные строки попадают в отчёт и не
+    прерывают импорт; корректные пачки фиксируются по мере вставки.
+    """
+    importer = CatalogImporter(db)
+    try:
+        async for line, raw in iter_lines(chunks):
+            await importer.add(line, raw)
+    except LineTooLong as exc:
+        # Дальше строки не разобрать: сохраняем уже прочитанное и сообщаем, где остановились.
+        importer.error(exc.line, str(exc))
+    await importer.flush()
+
+    report = importer.report
+    report["errors_truncated"] = report["failed"] > len(report["errors"])
+    return report
@@ -0,0 +1,34 @@
+from typing import Union
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+
+async def insert_returning_ids(db: Union[AsyncSession, AsyncConnection], model, rows: list[dict]) -> list[int]:
+    """
+    Вставляет строки пачками и возвращает их id в порядке rows - по ним сопоставляются
+    внешние ключи. PostgreSQL: executemany с sort_by_parameter_order, SQLAlchemy сам
+    собирает многострочные INSERT. В SQLite этот режим выполняется построчно, поэтому
+    строки вставляются одним INSERT ... VALUES на пачку: rowid выдаются по порядку VALUES,
+    а порядок строк RETURNING не гарантирован - возвращённые id сортируются.
+    Все строки должны содержать одинаковый набор колонок.
+    """
+    if not rows:
+        return []
+    dialect = db.dialect if isinstance(db, AsyncConnection) else db.bind.dialect
+    if dialect.name != "sqlite":
+        result = await db.execute(insert(model).returning(model.id, sort_by_parameter_order=True), rows)
+        return list(result.scalars().all())
+
+    # Размер пачки - в пределах лимита параметров SQLite на выражение (с колонками по умолчанию).
+    columns = len(model.__table__.columns)
+    batch_size = max(1, min(dialect.insertmanyvalues_page_size, dialect.insertmanyvalues_max_parameters // columns))
+    ids = []
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        result = await db.execute(insert(model).values(batch).returning(model.id))
+        batch_ids = sorted(result.scalars().all())
+        if len(batch_ids) != len(batch):
+            raise RuntimeError(f"Inserted {len(batch)} rows into {model.__tablename__}, got {len(batch_ids)} ids")
+        ids.extend(batch_ids)
+    return ids
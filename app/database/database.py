@@ -1,13 +1,68 @@
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 import os
 
+from app.database.pool import InstrumentedAsyncPool
+from app.database.sql_log import install_sql_logging
+from app.metrics.timing import install_db_timing
+
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+# Реплика для чтения; без неё чтение идёт в основную БД.
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+
+# Размер пула на воркер: всего соединений к БД до workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW).
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+# Сколько секунд ждать свободного соединения, прежде чем вернуть ошибку.
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Пересоздавать соединения старше N секунд (-1 - никогда).
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+# Кеш подготовленных выражений asyncpg и SQLAlchemy на соединение; за pgbouncer
+# в режиме transaction оба нужно выставить в 0.
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+DB_PREPARED_STATEMENT_CACHE_SIZE = int(os.getenv("DB_PREPARED_STATEMENT_CACHE_SIZE", "100"))
+# Логировать каждый запрос (только для отладки; в бою - SQL_SLOW_QUERY_MS / SQL_LOG_SAMPLE_RATE).
+SQL_ECHO = os.getenv("SQL_ECHO", "0") == "1"
+
+
+def engine_options(database_url: str, name: str = "primary") -> dict:
+    """Параметры create_async_engine для данного URL; name различает пулы в статистике."""
+    url = make_url(database_url)
+    options = {"echo": SQL_ECHO, "pool_logging_name": name}
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # БД в памяти живёт в единственном соединении - пул не настраиваем.
+        return options
+    options.update(
+        poolclass=InstrumentedAsyncPool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+    if url.get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": DB_PREPARED_STATEMENT_CACHE_SIZE,
+        }
+    return options
+
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+engine = create_async_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+install_sql_logging(engine.sync_engine)
+install_db_timing(engine.sync_engine)
+
+if DATABASE_READ_URL:
+    read_engine = create_async_engine(DATABASE_READ_URL, **engine_options(DATABASE_READ_URL, "replica"))
+    install_sql_logging(read_engine.sync_engine)
+    install_db_timing(read_engine.sync_engine)
+else:
+    read_engine = engine
 
 AsyncSessionLocal = sessionmaker(
     bind=engine,
@@ -15,6 +70,18 @@ AsyncSessionLocal = sessionmaker(
     expire_on_commit=False
 )
 
+ReadSessionLocal = sessionmaker(
+    bind=read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+) if read_engine is not engine else AsyncSessionLocal
+
 async def get_db():
     async with AsyncSessionLocal() as session:
-        yield session
\ No newline at end of file
+        yield session
+
+async def get_read_db():
+    # Сессия только для чтения: реплика, если задан DATABASE_READ_URL. Для чтения
+    # сразу после записи используйте зависимости из app.database.routing.
+    async with ReadSessionLocal() as session:
+        yield session
@@ -0,0 +1,66 @@
+import logging
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+# strict - не стартовать на устаревшей схеме, warn - только предупредить, off - не проверять.
+SCHEMA_CHECK = os.getenv("SCHEMA_CHECK", "strict")
+
+
+def get_alembic_config(configure_logger: bool = False) -> Config:
+    config = Config(str(ALEMBIC_INI))
+    config.attributes["configure_logger"] = configure_logger
+    return config
+
+
+@lru_cache(maxsize=1)
+def get_head_revision() -> Optional[str]:
+    return ScriptDirectory.from_config(get_alembic_config()).get_current_head()
+
+
+async def get_current_revision(engine: AsyncEngine) -> Optional[str]:
+    async with engine.connect() as conn:
+        try:
+            result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+        except DBAPIError:
+            # Таблицы alembic_version ещё нет - миграции не применялись.
+            return None
+        return result.scalar_one_or_none()
+
+
+async def check_schema_revision(engine: AsyncEngine) -> None:
+    # Вместо create_all на старте только сверяем ревизию схемы с последней миграцией.
+    if SCHEMA_CHECK == "off":
+        return
+    head = get_head_revision()
+    current = await get_current_revision(engine)
+    if current == head:
+        return
+    message = f"Схема БД на ревизии {current}, ожидается {head}. Выполните `python -m app.migrate`."
+    if SCHEMA_CHECK == "warn":
+        logger.warning(message)
+        return
+    raise RuntimeError(message)
+
+
+def upgrade(revision: str = "head") -> None:
+    # Синхронная функция: env.py сам запускает event loop.
+    command.upgrade(get_alembic_config(configure_logger=True), revision)
+
+
+def stamp(revision: str) -> None:
+    command.stamp(get_alembic_config(configure_logger=True), revision)
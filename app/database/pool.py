@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+LATENCY_WINDOW = 1000
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class PoolStats:
+    """
+    Время ожидания соединения из пула и насыщение.
+    Хранится отдельно от пула: engine.dispose() пересоздаёт пул, а статистика должна сохраниться.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waits: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.peak_checked_out = 0
+
+    def record(self, wait: float, checked_out: int) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self._waits.append(wait)
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            waits = list(self._waits)
+            checkouts, timeouts, peak = self.checkouts, self.timeouts, self.peak_checked_out
+        return {
+            "checkouts": checkouts,
+            "timeouts": timeouts,
+            "peak_checked_out": peak,
+            "checkout_wait_ms": {
+                "p50": round(_percentile(waits, 0.50) * 1000, 2),
+                "p95": round(_percentile(waits, 0.95) * 1000, 2),
+                "max": round(max(waits, default=0.0) * 1000, 2),
+            },
+        }
+
+
+_pool_stats: dict[str, PoolStats] = {}
+
+
+def get_pool_stats(name: str) -> PoolStats:
+    # Статистика по имени пула (pool_logging_name движка): primary, replica.
+    return _pool_stats.setdefault(name, PoolStats())
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool, который замеряет ожидание свободного соединения."""
+
+    def _do_get(self):
+        stats = get_pool_stats(self._orig_logging_name or "default")
+        started_at = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            stats.record_timeout()
+            raise
+        stats.record(time.perf_counter() - started_at, self.checkedout())
+        return connection
+
+
+def pool_status(pool) -> dict:
+    # Текущее состояние пула движка; для пулов без очереди (StaticPool и т.п.) - только тип.
+    status = {"pool": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        capacity = pool.size() + max(pool._max_overflow, 0)
+        checked_out = pool.checkedout()
+        status.update({
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+            "checked_out": checked_out,
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "saturation": round(checked_out / capacity, 3) if capacity else None,
+        })
+    status.update(get_pool_stats(getattr(pool, "_orig_logging_name", None) or "default").snapshot())
+    return status
@@ -0,0 +1,36 @@
+from typing import Any, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, select, true
+from sqlalchemy.sql.elements import ColumnElement
+
+
+def with_parent(parent_id_column: ColumnElement, parent_id: Any, page: Select) -> Tuple[Select, Any]:
+    """
+    Проверка существования родителя и выборка страницы дочерних строк одним запросом:
+
+        SELECT page.*, parent.id AS parent_id
+        FROM parent LEFT JOIN (page) AS page ON true
+        WHERE parent.id = :parent_id
+
+    Подзапрос не коррелирован (LATERAL не нужен), поэтому работает и в PostgreSQL, и в SQLite.
+    Колонка parent_id идёт последней, чтобы не сдвигать колонки страницы.
+    Возвращает запрос и подзапрос - по колонкам подзапроса сортируют внешний запрос.
+    """
+    sub = page.subquery()
+    query = (
+        select(*sub.c, parent_id_column.label("parent_id"))
+        .select_from(parent_id_column.table)
+        .outerjoin(sub, true())
+        .where(parent_id_column == parent_id)
+    )
+    return query, sub
+
+
+def parent_rows(rows: Sequence) -> Optional[list]:
+    """
+    Результат запроса with_parent -> строки страницы или None, если родителя нет.
+    Пустая страница приходит одной строкой с NULL вместо колонок страницы.
+    """
+    if not rows:
+        return None
+    return [row for row in rows if row.id is not None]
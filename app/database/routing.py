@@ -0,0 +1,150 @@
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from dotenv import load_dotenv
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.utils import get_current_principal
+from app.cache.shared import KeyValueStore
+from app.database.database import AsyncSessionLocal, ReadSessionLocal
+from app.schemas.user import Principal
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Сколько секунд после записи читать из основной БД (должно перекрывать отставание реплики).
+READ_STICKY_SECONDS = float(os.getenv("READ_STICKY_SECONDS", "5"))
+# Общее хранилище отметок (Redis): без него следующий запрос, попавший в другой воркер,
+# отметку не увидит и прочитает реплику.
+READ_STICKY_REDIS_URL = os.getenv("READ_STICKY_REDIS_URL")
+MAX_STICKY_SCOPES = 100_000
+
+# Область каталога: после изменений курсов/уроков/материалов каталог читается из основной БД,
+# иначе кеш каталога заполнился бы устаревшими данными с реплики.
+CATALOG_SCOPE = "catalog"
+
+
+def user_scope(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+class StickyReads:
+    """
+    Read-your-writes: область (пользователь, каталог), в которую недавно писали,
+    какое-то время читается из основной БД.
+    Отметки хранятся в процессе и, если задано общее хранилище, в нём - так их видят
+    все воркеры. Без общего хранилища гарантия действует только в пределах воркера.
+    """
+
+    def __init__(
+        self,
+        store: Optional[KeyValueStore] = None,
+        ttl: float = READ_STICKY_SECONDS,
+        max_scopes: int = MAX_STICKY_SCOPES,
+        prefix: str = "sticky:",
+    ):
+        self.store = store
+        self.ttl = ttl
+        self.max_scopes = max_scopes
+        self.prefix = prefix
+        self._until: OrderedDict[str, float] = OrderedDict()
+        self._store_errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return ReadSessionLocal is not AsyncSessionLocal and self.ttl > 0
+
+    async def mark(self, *scopes: str) -> None:
+        if not self.enabled:
+            return
+        until = time.monotonic() + self.ttl
+        for scope in scopes:
+            self._until[scope] = until
+            self._until.move_to_end(scope)
+        # Записи упорядочены по сроку: сначала выбрасываем истёкшие, затем лишние.
+        now = time.monotonic()
+        while self._until and (len(self._until) > self.max_scopes or next(iter(self._until.values())) <= now):
+            self._until.popitem(last=False)
+        if self.store is None:
+            return
+        try:
+            for scope in scopes:
+                await self.store.set(self.prefix + scope, b"1", ex=max(1, math.ceil(self.ttl)))
+        except Exception:
+            # Запись уже зафиксирована; другие воркеры какое-то время могут читать реплику.
+            self._store_errors += 1
+            logger.exception("Failed to store sticky read marks %s", scopes)
+
+    async def is_sticky(self, *scopes: str) -> bool:
+        if not self.enabled:
+            return False
+        now = time.monotonic()
+        if any(self._until.get(scope, 0) > now for scope in scopes):
+            return True
+        if self.store is None:
+            return False
+        try:
+            return await self.store.exists(*(self.prefix + scope for scope in scopes)) > 0
+        except Exception:
+            # Хранилище недоступно - основная БД заведомо не отдаст устаревшие данные.
+            self._store_errors += 1
+            logger.exception("Failed to read sticky read marks")
+            return True
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "ttl": self.ttl,
+            "store": type(self.store).__name__ if self.store is not None else None,
+            "local_scopes": len(self._until),
+            "store_errors": self._store_errors,
+        }
+
+
+def create_sticky_store(url: Optional[str] = READ_STICKY_REDIS_URL) -> Optional[KeyValueStore]:
+    if not url:
+        return None
+    try:
+        from redis.asyncio import Redis
+    except ImportError as exc:
+        raise RuntimeError("READ_STICKY_REDIS_URL requires the `redis` package") from exc
+    return Redis.from_url(url)
+
+
+sticky_reads = StickyReads(create_sticky_store())
+
+
+def is_replica_session(session: AsyncSession) -> bool:
+    return session.info.get("replica", False)
+
+
+async def cache_fill_allowed(session: AsyncSession) -> bool:
+    """
+    Можно ли класть прочитанное в кеш каталога. Чтение с реплики, во время которого
+    каталог изменили, могло вернуть данные до изменения - в общий кеш их не кладём,
+    иначе они отдавались бы весь CACHE_TTL.
+    """
+    return not (is_replica_session(session) and await sticky_reads.is_sticky(CATALOG_SCOPE))
+
+
+async def get_catalog_read_db():
+    # Сессия для чтения каталога: реплика, кроме короткого окна после изменений каталога.
+    factory = AsyncSessionLocal if await sticky_reads.is_sticky(CATALOG_SCOPE) else ReadSessionLocal
+    async with factory() as session:
+        session.info["replica"] = factory is not AsyncSessionLocal
+        yield session
+
+
+async def get_user_read_db(current_user: Principal = Depends(get_current_principal)):
+    # Сессия для чтения данных пользователя: после его записей - основная БД.
+    sticky = await sticky_reads.is_sticky(user_scope(current_user.id), CATALOG_SCOPE)
+    factory = AsyncSessionLocal if sticky else ReadSessionLocal
+    async with factory() as session:
+        session.info["replica"] = factory is not AsyncSessionLocal
+        yield session
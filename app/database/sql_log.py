@@ -0,0 +1,55 @@
+import logging
+import os
+import random
+import time
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+load_dotenv()
+
+logger = logging.getLogger("app.sql")
+
+# Логировать запросы медленнее N мс (0 - не логировать по порогу).
+SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "500"))
+# Доля запросов, которые логируются независимо от длительности (0..1).
+SQL_LOG_SAMPLE_RATE = float(os.getenv("SQL_LOG_SAMPLE_RATE", "0"))
+# Запросы длиннее обрезаются - в лог не должны попадать многокилобайтные INSERT.
+SQL_LOG_MAX_LENGTH = 1000
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Время старта - в контексте выполнения: запрос с ошибкой не вызывает after_cursor_execute,
+    # и на соединении из пула ничего не должно копиться.
+    if context is not None:
+        context._sql_log_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started_at = getattr(context, "_sql_log_started_at", None)
+    if started_at is None:
+        return
+    elapsed_ms = (time.perf_counter() - started_at) * 1000
+    slow = SQL_SLOW_QUERY_MS > 0 and elapsed_ms >= SQL_SLOW_QUERY_MS
+    if not slow and not (SQL_LOG_SAMPLE_RATE > 0 and random.random() < SQL_LOG_SAMPLE_RATE):
+        return
+    logger.log(
+        logging.WARNING if slow else logging.INFO,
+        "%s query %.1f ms: %s",
+        "slow" if slow else "sampled",
+        elapsed_ms,
+        " ".join(statement.split())[:SQL_LOG_MAX_LENGTH],
+    )
+
+
+def install_sql_logging(engine: Engine) -> bool:
+    """
+    Вешает на движок логирование медленных и выборочных запросов.
+    Если оба режима выключены, обработчики не регистрируются и накладных расходов нет.
+    """
+    if SQL_SLOW_QUERY_MS <= 0 and SQL_LOG_SAMPLE_RATE <= 0:
+        return False
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    return True
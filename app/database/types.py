@@ -0,0 +1,32 @@
+import gzip
+from typing import Optional
+
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+# Тексты сжимаются один раз при записи и читаются многократно - уровень максимальный.
+TEXT_GZIP_LEVEL = 9
+
+
+def compress_text(value: str) -> bytes:
+    # mtime=0: одинаковый текст даёт одинаковые байты (стабильные ETag и дедупликация).
+    return gzip.compress(value.encode("utf-8"), compresslevel=TEXT_GZIP_LEVEL, mtime=0)
+
+
+def decompress_text(value: bytes) -> str:
+    return gzip.decompress(value).decode("utf-8")
+
+
+class GzipText(TypeDecorator):
+    """
+    Строка, которая хранится в БД gzip-потоком. Для кода приложения колонка остаётся
+    строковой; сжатые байты как есть читаются через type_coerce(column, LargeBinary).
+    """
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[str], dialect) -> Optional[bytes]:
+        return None if value is None else compress_text(value)
+
+    def process_result_value(self, value: Optional[bytes], dialect) -> Optional[str]:
+        return None if value is None else decompress_text(value)
@@ -0,0 +1,13 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def insert_for(db: AsyncSession, table):
+    """INSERT с поддержкой ON CONFLICT для диалекта текущей сессии."""
+    dialect = db.bind.dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(table)
+    if dialect == "sqlite":
+        return sqlite.insert(table)
+    # Ошибка конфигурации (DATABASE_URL), а не недописанная ветка.
+    raise RuntimeError(f"ON CONFLICT is not supported for dialect {dialect}")
@@ -0,0 +1,32 @@
+from abc import ABC, abstractmethod
+from typing import Callable
+
+# Получатель сообщений канала; брокер вызывает его в цикле событий воркера.
+Deliver = Callable[[str, bytes], None]
+
+
+class EventBroker(ABC):
+    """
+    Транспорт событий между воркерами. Воркер подписан на канал, пока у него есть
+    локальные слушатели этого канала; раздачу по соединениям делает EventHub.
+    Доставка «не более одного раза»: пропущенное событие клиент восполняет обычным GET.
+    """
+
+    @abstractmethod
+    async def publish(self, channel: str, message: bytes) -> None:
+        ...
+
+    @abstractmethod
+    async def subscribe(self, channel: str, deliver: Deliver) -> None:
+        ...
+
+    @abstractmethod
+    async def unsubscribe(self, channel: str) -> None:
+        ...
+
+    async def close(self) -> None:
+        return None
+
+    @abstractmethod
+    def stats(self) -> dict:
+        ...
@@ -0,0 +1,169 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from app.api.fast_json import dumps
+from app.events.base import EventBroker
+
+logger = logging.getLogger(__name__)
+
+
+class SubscriptionLimitExceeded(Exception):
+    """Лимит соединений исчерпан: scope = "worker" (на воркер) или "channel" (на канал)."""
+
+    def __init__(self, scope: str):
+        super().__init__(f"Too many event subscriptions per {scope}")
+        self.scope = scope
+
+
+class Subscriber:
+    """Одно соединение-слушатель канала с ограниченной очередью событий."""
+
+    def __init__(self, hub: "EventHub", channel: str, queue_size: int):
+        self.hub = hub
+        self.channel = channel
+        self.closed = False
+        self._queue: asyncio.Queue[bytes] = asyncio.Queue(queue_size)
+        self._overflowed = False
+
+    def put(self, message: bytes) -> None:
+        if self._queue.full():
+            # Медленный клиент: теряем самое старое событие и просим клиента перечитать состояние.
+            self._queue.get_nowait()
+            self._overflowed = True
+            self.hub._dropped += 1
+        self._queue.put_nowait(message)
+
+    async def get(self, timeout: float) -> Optional[bytes]:
+        """Следующее событие или None, если за timeout секунд событий не было."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def take_overflow(self) -> bool:
+        overflowed, self._overflowed = self._overflowed, False
+        return overflowed
+
+    async def close(self) -> None:
+        await self.hub.close(self)
+
+
+class EventHub:
+    """
+    Раздача событий соединениям воркера. Брокер подписан на канал, пока у воркера есть
+    хотя бы один его слушатель, поэтому событие доставляется в воркер один раз и
+    дальше расходится по очередям соединений без обращений к БД.
+    """
+
+    def __init__(self, broker: EventBroker, max_connections: int, max_per_channel: int, queue_size: int):
+        self.broker = broker
+        self.max_connections = max_connections
+        self.max_per_channel = max_per_channel
+        self.queue_size = queue_size
+        self._channels: dict[str, set[Subscriber]] = {}
+        # Каналы, на которые брокер действительно подписан, - отдельно от слушателей:
+        # слушатель регистрируется сразу, подписка брокера догоняет его под блокировкой канала.
+        self._subscribed: set[str] = set()
+        # Блокировка канала и число её пользователей; удаляется, когда канал никому не нужен.
+        self._locks: dict[str, tuple[asyncio.Lock, int]] = {}
+        self._connections = 0
+        self._published = 0
+        self._publish_errors = 0
+        self._delivered = 0
+        self._dropped = 0
+        self._rejected = 0
+
+    @asynccontextmanager
+    async def _channel_lock(self, channel: str):
+        # subscribe/unsubscribe брокера по одному каналу не должны перекрываться: иначе
+        # запоздавший unsubscribe ушедшего слушателя снимет подписку только что открытого.
+        lock, users = self._locks.get(channel) or (asyncio.Lock(), 0)
+        self._locks[channel] = (lock, users + 1)
+        try:
+            async with lock:
+                yield
+        finally:
+            lock, users = self._locks[channel]
+            if users == 1:
+                del self._locks[channel]
+            else:
+                self._locks[channel] = (lock, users - 1)
+
+    async def open(self, channel: str) -> Subscriber:
+        subscribers = self._channels.get(channel)
+        if self._connections >= self.max_connections:
+            self._rejected += 1
+            raise SubscriptionLimitExceeded("worker")
+        if subscribers is not None and len(subscribers) >= self.max_per_channel:
+            self._rejected += 1
+            raise SubscriptionLimitExceeded("channel")
+
+        subscriber = Subscriber(self, channel, self.queue_size)
+        self._channels.setdefault(channel, set()).add(subscriber)
+        self._connections += 1
+        try:
+            async with self._channel_lock(channel):
+                # Каждый открывающий сам убеждается, что подписка есть: если подписка
+                # первого слушателя не удалась, её повторит следующий.
+                if channel not in self._subscribed and not subscriber.closed:
+                    await self.broker.subscribe(channel, self._deliver)
+                    self._subscribed.add(channel)
+        except BaseException:
+            await self.close(subscriber)
+            raise
+        return subscriber
+
+    async def close(self, subscriber: Subscriber) -> None:
+        # Вызывается и из генератора потока, и фоновой задачей ответа - второй вызов ничего не делает.
+        if subscriber.closed:
+            return
+        subscriber.closed = True
+        self._connections -= 1
+        channel = subscriber.channel
+        subscribers = self._channels.get(channel)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._channels[channel]
+        async with self._channel_lock(channel):
+            # Пока ждали блокировку, канал мог снова понадобиться - тогда подписку оставляем.
+            if channel in self._subscribed and channel not in self._channels:
+                self._subscribed.discard(channel)
+                await self.broker.unsubscribe(channel)
+
+    def _deliver(self, channel: str, message: bytes) -> None:
+        for subscriber in self._channels.get(channel, ()):
+            subscriber.put(message)
+            self._delivered += 1
+
+    async def publish(self, channel: str, event: dict) -> None:
+        """
+        Публикует событие после commit. Ошибка брокера не должна ломать уже выполненную
+        запись: событие теряется, клиент увидит изменения при следующем чтении.
+        """
+        try:
+            await self.broker.publish(channel, dumps(event))
+            self._published += 1
+        except Exception:
+            self._publish_errors += 1
+            logger.exception("Failed to publish event to %s", channel)
+
+    async def shutdown(self) -> None:
+        await self.broker.close()
+
+    def stats(self) -> dict:
+        return {
+            "connections": self._connections,
+            "channels": len(self._channels),
+            "subscribed_channels": len(self._subscribed),
+            "max_connections": self.max_connections,
+            "max_per_channel": self.max_per_channel,
+            "published": self._published,
+            "publish_errors": self._publish_errors,
+            "delivered": self._delivered,
+            "dropped": self._dropped,
+            "rejected": self._rejected,
+            "broker": self.broker.stats(),
+        }
@@ -0,0 +1,22 @@
+from app.events.base import Deliver, EventBroker
+
+
+class InMemoryBroker(EventBroker):
+    """Брокер в памяти процесса: события видят только слушатели этого же воркера."""
+
+    def __init__(self):
+        self._channels: dict[str, Deliver] = {}
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        deliver = self._channels.get(channel)
+        if deliver is not None:
+            deliver(channel, message)
+
+    async def subscribe(self, channel: str, deliver: Deliver) -> None:
+        self._channels[channel] = deliver
+
+    async def unsubscribe(self, channel: str) -> None:
+        self._channels.pop(channel, None)
+
+    def stats(self) -> dict:
+        return {"backend": "memory", "channels": len(self._channels)}
@@ -0,0 +1,101 @@
+# app/events/progress.py
+# События прогресса для клиентов: GET /progress/events (Server-Sent Events).
+
+import json
+import os
+import time
+from typing import AsyncIterator, Iterable, Optional
+
+from dotenv import load_dotenv
+
+from app.events.base import EventBroker
+from app.events.hub import EventHub, Subscriber
+from app.events.memory import InMemoryBroker
+
+load_dotenv()
+
+# memory - события видят только клиенты того же воркера; redis - общий pub/sub по EVENTS_REDIS_URL.
+EVENTS_BROKER = os.getenv("EVENTS_BROKER", "memory")
+EVENTS_REDIS_URL = os.getenv("EVENTS_REDIS_URL")
+# Лимиты потоков: на воркер и на одного пользователя (вкладки браузера).
+SSE_MAX_CONNECTIONS = int(os.getenv("SSE_MAX_CONNECTIONS", "1000"))
+SSE_MAX_CONNECTIONS_PER_USER = int(os.getenv("SSE_MAX_CONNECTIONS_PER_USER", "5"))
+# Комментарий-пинг в простаивающем потоке: держит соединение через прокси и выявляет ушедших клиентов.
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+# Поток закрывается через столько секунд, клиент переподключается (retry) - соединения
+# перераспределяются между воркерами, а остановка воркера не ждёт вечных потоков.
+SSE_MAX_STREAM_SECONDS = float(os.getenv("SSE_MAX_STREAM_SECONDS", "300"))
+SSE_RETRY_MS = 3000
+# Сколько событий копится для медленного клиента, прежде чем старые начнут отбрасываться.
+SSE_QUEUE_SIZE = 100
+
+
+def create_broker(name: str = EVENTS_BROKER) -> EventBroker:
+    if name == "memory":
+        return InMemoryBroker()
+    if name == "redis":
+        if not EVENTS_REDIS_URL:
+            raise RuntimeError("EVENTS_BROKER=redis requires EVENTS_REDIS_URL")
+        try:
+            from redis.asyncio import Redis
+        except ImportError as exc:
+            raise RuntimeError("EVENTS_BROKER=redis requires the `redis` package") from exc
+        from app.events.redis_broker import RedisBroker
+        return RedisBroker(Redis.from_url(EVENTS_REDIS_URL))
+    raise ValueError(f"Unknown EVENTS_BROKER: {name}")
+
+
+progress_events = EventHub(
+    create_broker(),
+    max_connections=SSE_MAX_CONNECTIONS,
+    max_per_channel=SSE_MAX_CONNECTIONS_PER_USER,
+    queue_size=SSE_QUEUE_SIZE,
+)
+
+
+def user_channel(user_id: int) -> str:
+    return f"progress:user:{user_id}"
+
+
+def progress_event(course_id: int, lesson_ids: list[int], completed: int, total: int) -> dict:
+    """Событие в форме CourseProgressSummary - клиенту не нужно перечитывать /progress/{id}/stats."""
+    # Как в get_course_progress_summary: защита от рассинхронизации счётчиков.
+    completed = min(completed, total)
+    return {
+        "course_id": course_id,
+        "lesson_ids": lesson_ids,
+        "total_lessons": total,
+        "completed_lessons": completed,
+        "uncompleted_lessons": total - completed,
+        "progress_percentage": round(completed / total * 100, 2) if total else 0.0,
+    }
+
+
+def _sse(event: str, data: bytes) -> bytes:
+    return b"event: " + event.encode("ascii") + b"\ndata: " + data + b"\n\n"
+
+
+async def sse_stream(subscriber: Subscriber, course_ids: Optional[Iterable[int]] = None) -> AsyncIterator[bytes]:
+    """
+    Поток text/event-stream: события progress, resync (часть событий потеряна -
+    перечитайте состояние) и комментарии-пинги. Подписка снимается при выходе.
+    """
+    courses = set(course_ids) if course_ids else None
+    deadline = time.monotonic() + SSE_MAX_STREAM_SECONDS
+    try:
+        yield b"retry: %d\n: connected\n\n" % SSE_RETRY_MS
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            message = await subscriber.get(min(SSE_HEARTBEAT_SECONDS, remaining))
+            if subscriber.take_overflow():
+                yield _sse("resync", b"{}")
+            if message is None:
+                yield b": ping\n\n"
+                continue
+            if courses is not None and json.loads(message)["course_id"] not in courses:
+                continue
+            yield _sse("progress", message)
+    finally:
+        await subscriber.close()
@@ -0,0 +1,76 @@
+import asyncio
+import logging
+from typing import Optional
+
+from app.events.base import Deliver, EventBroker
+
+logger = logging.getLogger(__name__)
+
+
+class RedisBroker(EventBroker):
+    """
+    Redis pub/sub: событие, опубликованное любым воркером, получают воркеры, у которых
+    есть слушатели канала. Одно соединение подписки на воркер, каналы добавляются
+    и снимаются по мере подключения и ухода клиентов.
+    """
+
+    def __init__(self, redis, prefix: str = "events:"):
+        self.redis = redis
+        self.prefix = prefix
+        self._pubsub = None
+        self._reader: Optional[asyncio.Task] = None
+        self._handlers: dict[str, Deliver] = {}
+        self._errors = 0
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        await self.redis.publish(self.prefix + channel, message)
+
+    async def subscribe(self, channel: str, deliver: Deliver) -> None:
+        if self._pubsub is None:
+            self._pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        self._handlers[channel] = deliver
+        await self._pubsub.subscribe(self.prefix + channel)
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read(), name="events-redis-reader")
+
+    async def unsubscribe(self, channel: str) -> None:
+        self._handlers.pop(channel, None)
+        if self._pubsub is not None:
+            await self._pubsub.unsubscribe(self.prefix + channel)
+
+    async def _read(self) -> None:
+        while True:
+            try:
+                message = await self._pubsub.get_message(timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Обрыв соединения: redis-py переподключится и восстановит подписки.
+                self._errors += 1
+                logger.exception("Redis event subscription failed")
+                await asyncio.sleep(1.0)
+                continue
+            if message is None or message.get("type") != "message":
+                continue
+            channel = message["channel"]
+            if isinstance(channel, bytes):
+                channel = channel.decode("utf-8")
+            channel = channel[len(self.prefix):]
+            deliver = self._handlers.get(channel)
+            if deliver is not None:
+                deliver(channel, message["data"])
+
+    async def close(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+
+    def stats(self) -> dict:
+        return {"backend": "redis", "channels": len(self._handlers), "errors": self._errors}
@@ -0,0 +1,123 @@
+# app/export.py
+# Потоковая выгрузка каталога и прогресса (NDJSON / CSV) для хранилища отчётов.
+
+import csv
+import io
+import os
+import zlib
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import AsyncIterator, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import select
+
+from app.api.fast_json import dumps, json_datetime
+from app.database.database import read_engine
+from app.models import utcnow
+from app.models.course import Course
+from app.models.lesson import Lesson
+from app.models.material import Material
+from app.models.progress import Progress
+
+load_dotenv()
+
+# Сколько строк забирать из курсора за раз; столько же уходит в одном куске ответа.
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "1000"))
+# На сколько секунд водяной знак отстаёт от начала выгрузки. Должно перекрывать самую
+# долгую пишущую транзакцию и отставание реплики, иначе строки с более ранним
+# updated_at, зафиксированные позже, пропадут из следующей инкрементальной выгрузки.
+EXPORT_WATERMARK_LAG_SECONDS = int(os.getenv("EXPORT_WATERMARK_LAG_SECONDS", "60"))
+EXPORT_GZIP_LEVEL = 6
+
+
+class ExportEntity(str, Enum):
+    courses = "courses"
+    lessons = "lessons"
+    materials = "materials"
+    progress = "progress"
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+EXPORT_MODELS = {
+    "courses": Course,
+    "lessons": Lesson,
+    "materials": Material,
+    "progress": Progress,
+}
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def watermark() -> datetime:
+    """Значение since для следующей выгрузки; повторно выгруженные строки сопоставляются по id."""
+    return utcnow() - timedelta(seconds=EXPORT_WATERMARK_LAG_SECONDS)
+
+
+def export_query(entity: str, since: Optional[datetime] = None):
+    model = EXPORT_MODELS[entity]
+    query = select(*model.__table__.columns)
+    if since is None:
+        return query.order_by(model.id)
+    # Границу включаем: лучше выгрузить строку дважды, чем потерять.
+    return query.where(model.updated_at >= since).order_by(model.updated_at, model.id)
+
+
+def _ndjson_chunk(names: list[str], rows) -> bytes:
+    return b"".join(
+        dumps({
+            name: json_datetime(value) if isinstance(value, datetime) else value
+            for name, value in zip(names, row)
+        }) + b"\n"
+        for row in rows
+    )
+
+
+def _csv_chunk(rows) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerows(
+        [json_datetime(value) if isinstance(value, datetime) else value for value in row]
+        for row in rows
+    )
+    return buffer.getvalue().encode("utf-8")
+
+
+async def export_rows(
+    entity: str,
+    fmt: str,
+    since: Optional[datetime] = None,
+    compress: bool = False,
+) -> AsyncIterator[bytes]:
+    """
+    Выгружает таблицу через серверный курсор (stream + yield_per): в памяти не больше
+    EXPORT_CHUNK_ROWS строк. Каждый кусок отдаётся только после того, как клиент
+    принял предыдущий, так что медленный клиент притормаживает чтение из БД.
+    """
+    query = export_query(entity, since).execution_options(yield_per=EXPORT_CHUNK_ROWS)
+    compressor = zlib.compressobj(EXPORT_GZIP_LEVEL, zlib.DEFLATED, 31) if compress else None
+
+    def encode(chunk: bytes) -> bytes:
+        return compressor.compress(chunk) if compressor is not None else chunk
+
+    # Своё соединение, а не сессия запроса: тело читается уже после выхода из обработчика.
+    # Выгрузки читают с реплики, если она настроена.
+    async with read_engine.connect() as conn:
+        result = await conn.stream(query)
+        names = list(result.keys())
+        if fmt == "csv":
+            chunk = encode(_csv_chunk([names]))
+            if chunk:
+                yield chunk
+        async for rows in result.partitions():
+            chunk = encode(_csv_chunk(rows) if fmt == "csv" else _ndjson_chunk(names, rows))
+            if chunk:
+                yield chunk
+    if compressor is not None:
+        yield compressor.flush()
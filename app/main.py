@@ -1,11 +1,28 @@
+import logging
+
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.openapi.utils import get_openapi
+from app.analytics import analytics_refresher
 from app.api.courses import router as courses_router
 from app.api.lessons import router as lessons_router
 from app.api.progress import router as progress_router
+from app.api.admin import router as admin_router
+from app.api.calendar import router as calendar_router
+from app.api.compression import GZIP_LEVEL, GZIP_MINIMUM_SIZE
+from app.api.metrics import router as metrics_router
+from app.api.search import router as search_router
 
 from app.auth.routes import router as auth_router
-from app.models.create_tables import init_models
+from app.events.progress import progress_events
+from app.auth.hashing import password_hasher
+from app.database.database import engine, read_engine
+from app.database.migrations import check_schema_revision
+from app.database.routing import sticky_reads
+from app.database.pool import pool_status
+from app.metrics.middleware import MetricsMiddleware
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="🎓 Сервис учета учебных курсов",
@@ -18,12 +35,41 @@ app.include_router(auth_router)
 app.include_router(courses_router)
 app.include_router(lessons_router)
 app.include_router(progress_router)
+app.include_router(search_router)
+app.include_router(calendar_router)
+app.include_router(admin_router)
+app.include_router(metrics_router)
+
+# Сжатие ответов; уже сжатые (Content-Encoding выставлен обработчиком) пропускаются как есть.
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE, compresslevel=GZIP_LEVEL)
+# Метрики по маршрутам и заголовок Server-Timing (внешний слой - время включает сжатие).
+app.add_middleware(MetricsMiddleware)
 
 
 @app.on_event("startup")
 async def on_startup():
-    await init_models()
+    # Схема создаётся миграциями (python -m app.migrate), здесь только проверка ревизии.
+    await check_schema_revision(engine)
+    logger.info("DB pool: %s", pool_status(engine.pool))
+    if read_engine is not engine:
+        logger.info("DB replica pool: %s", pool_status(read_engine.pool))
+        if sticky_reads.store is None:
+            logger.warning(
+                "READ_STICKY_REDIS_URL is not set: reads after a write stick to the primary only within this worker"
+            )
+    # Фоновое обновление сводок аналитики (ANALYTICS_REFRESH_SECONDS=0 - выключено).
+    analytics_refresher.start()
+
 
+@app.on_event("shutdown")
+async def on_shutdown():
+    await analytics_refresher.stop()
+    await progress_events.shutdown()
+    password_hasher.shutdown()
+    # Итог за время работы воркера: ожидание соединений и пиковая загрузка пула.
+    logger.info("DB pool: %s", pool_status(engine.pool))
+    if read_engine is not engine:
+        logger.info("DB replica pool: %s", pool_status(read_engine.pool))
 
 
 @app.get("/")
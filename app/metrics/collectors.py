@@ -0,0 +1,81 @@
+from app.analytics import analytics_refresher
+from app.auth.hashing import password_hasher
+from app.auth.token_cache import token_cache
+from app.cache.catalog import catalog_cache
+from app.database.database import engine, read_engine
+from app.database.pool import pool_status
+from app.events.progress import progress_events
+from app.metrics.registry import registry
+
+# Значения ниже снимаются со stats() компонентов в момент запроса /metrics.
+db_pool_size = registry.gauge("db_pool_size", "Размер пула соединений", ("pool",))
+db_pool_checked_out = registry.gauge("db_pool_checked_out", "Выданные соединения", ("pool",))
+db_pool_overflow = registry.gauge("db_pool_overflow", "Соединения сверх размера пула", ("pool",))
+db_pool_saturation = registry.gauge("db_pool_saturation", "Доля занятых соединений от максимума", ("pool",))
+db_pool_checkouts = registry.counter("db_pool_checkouts_total", "Выдачи соединений из пула", ("pool",))
+db_pool_timeouts = registry.counter("db_pool_checkout_timeouts_total", "Таймауты ожидания соединения", ("pool",))
+db_pool_wait_p95 = registry.gauge("db_pool_checkout_wait_p95_seconds", "p95 ожидания соединения", ("pool",))
+
+password_hash_queue = registry.gauge("password_hash_queue_depth", "Операции bcrypt в очереди")
+password_hash_in_flight = registry.gauge("password_hash_in_flight", "Выполняемые операции bcrypt")
+
+cache_hits = registry.counter("cache_hits_total", "Попадания в кеш", ("cache",))
+cache_misses = registry.counter("cache_misses_total", "Промахи кеша", ("cache",))
+cache_entries = registry.gauge("cache_entries", "Записей в кеше", ("cache",))
+
+sse_connections = registry.gauge("sse_connections", "Открытые потоки событий прогресса")
+events_published = registry.counter("events_published_total", "Опубликованные события прогресса")
+events_delivered = registry.counter("events_delivered_total", "События, переданные в потоки клиентов")
+events_dropped = registry.counter("events_dropped_total", "События, отброшенные из-за медленных клиентов")
+events_rejected = registry.counter("sse_rejected_total", "Потоки, отклонённые из-за лимита соединений")
+
+analytics_runs = registry.counter("analytics_refresh_runs_total", "Обновления сводок аналитики в этом воркере")
+analytics_failures = registry.counter("analytics_refresh_failures_total", "Неудачные обновления сводок аналитики")
+analytics_duration = registry.gauge("analytics_refresh_duration_seconds", "Длительность последнего обновления сводок")
+analytics_rows = registry.gauge("analytics_refresh_rows", "Строк сводок, пересчитанных последним обновлением", ("table",))
+
+
+def collect_pools() -> None:
+    pools = {"primary": engine.pool}
+    if read_engine is not engine:
+        pools["replica"] = read_engine.pool
+    for name, pool in pools.items():
+        status = pool_status(pool)
+        if "size" in status:
+            db_pool_size.set(status["size"], pool=name)
+            db_pool_checked_out.set(status["checked_out"], pool=name)
+            db_pool_overflow.set(status["overflow"], pool=name)
+            db_pool_saturation.set(status["saturation"] or 0, pool=name)
+        db_pool_checkouts.set(status["checkouts"], pool=name)
+        db_pool_timeouts.set(status["timeouts"], pool=name)
+        db_pool_wait_p95.set(status["checkout_wait_ms"]["p95"] / 1000, pool=name)
+
+
+def collect_components() -> None:
+    hasher = password_hasher.stats()
+    password_hash_queue.set(hasher["queue_depth"])
+    password_hash_in_flight.set(hasher["in_flight"])
+
+    for name, stats in (("jwt", token_cache.stats()), ("catalog", catalog_cache.stats())):
+        cache_hits.set(stats["hits"], cache=name)
+        cache_misses.set(stats["misses"], cache=name)
+        cache_entries.set(stats.get("entries", stats.get("size", 0)), cache=name)
+
+    events = progress_events.stats()
+    sse_connections.set(events["connections"])
+    events_published.set(events["published"])
+    events_delivered.set(events["delivered"])
+    events_dropped.set(events["dropped"])
+    events_rejected.set(events["rejected"])
+
+    analytics = analytics_refresher.stats()
+    analytics_runs.set(analytics["runs"])
+    analytics_failures.set(analytics["failures"])
+    if analytics["last"] is not None:
+        analytics_duration.set(analytics["last"]["duration_ms"] / 1000)
+        analytics_rows.set(analytics["last"]["courses"], table="course_analytics")
+        analytics_rows.set(analytics["last"]["lessons"], table="lesson_analytics")
+
+
+registry.add_collector(collect_pools)
+registry.add_collector(collect_components)
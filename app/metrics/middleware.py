@@ -0,0 +1,92 @@
+import os
+import time
+
+from dotenv import load_dotenv
+
+from app.metrics.registry import registry
+from app.metrics.timing import RequestTimings, current_timings
+
+load_dotenv()
+
+# Добавлять ли заголовок Server-Timing с разбивкой времени запроса.
+SERVER_TIMING = os.getenv("SERVER_TIMING", "1") == "1"
+
+# Пути, которые не попадают в метрики (сам /metrics опрашивается постоянно).
+EXCLUDED_PATHS = {"/metrics"}
+
+http_requests_total = registry.counter(
+    "http_requests_total", "Количество обработанных HTTP-запросов", ("method", "route", "status")
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "Длительность HTTP-запроса", ("method", "route")
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "Запросы, обрабатываемые в данный момент"
+)
+http_request_db_statements = registry.histogram(
+    "http_request_db_statements",
+    "Количество SQL-выражений на запрос",
+    ("method", "route"),
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50),
+)
+http_request_db_duration = registry.histogram(
+    "http_request_db_duration_seconds", "Суммарное время SQL-выражений на запрос", ("method", "route")
+)
+
+
+def _route_label(scope) -> str:
+    # Шаблон пути, а не сам путь: /lessons/{course_id}/lessons, иначе метки не ограничены.
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def server_timing(timings: RequestTimings, now: float) -> bytes:
+    parts = [f'db;dur={timings.db_seconds * 1000:.2f};desc="{timings.db_statements} queries"']
+    for name in ("auth", "serialize"):
+        seconds = timings.spans.get(name, 0.0)
+        if name == "serialize" and timings.endpoint_done_at is not None:
+            seconds += now - timings.endpoint_done_at
+        parts.append(f"{name};dur={seconds * 1000:.2f}")
+    parts.append(f"total;dur={(now - timings.started_at) * 1000:.2f}")
+    return ", ".join(parts).encode("latin-1")
+
+
+class MetricsMiddleware:
+    """
+    ASGI-middleware: гистограммы длительности по маршрутам, запросы в работе,
+    количество и время SQL-выражений на запрос, заголовок Server-Timing.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in EXCLUDED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if SERVER_TIMING:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", server_timing(timings, time.perf_counter())))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+            current_timings.reset(token)
+            method, route = scope["method"], _route_label(scope)
+            http_requests_total.inc(method=method, route=route, status=str(status_code))
+            http_request_duration.observe(time.perf_counter() - timings.started_at, method=method, route=route)
+            http_request_db_statements.observe(timings.db_statements, method=method, route=route)
+            http_request_db_duration.observe(timings.db_seconds, method=method, route=route)
@@ -0,0 +1,28 @@
+import functools
+import inspect
+
+from fastapi.routing import APIRoute
+
+from app.metrics.timing import mark_endpoint_done
+
+
+class TimedRoute(APIRoute):
+    """
+    APIRoute, отмечающий момент возврата из обработчика: всё, что после него и до
+    отправки заголовков ответа, - валидация response_model и сериализация (span serialize).
+    Подключается через APIRouter(route_class=TimedRoute).
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if inspect.iscoroutinefunction(endpoint):
+            original = endpoint
+
+            # functools.wraps сохраняет сигнатуру - FastAPI строит зависимости по ней.
+            @functools.wraps(original)
+            async def endpoint(*args, **kw):
+                try:
+                    return await original(*args, **kw)
+                finally:
+                    mark_endpoint_done()
+
+        super().__init__(path, endpoint, **kwargs)
@@ -0,0 +1,69 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class RequestTimings:
+    """Разбивка времени одного запроса: БД, авторизация, сериализация."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.db_seconds = 0.0
+        self.db_statements = 0
+        self.spans: Dict[str, float] = {}
+        # Когда обработчик вернул результат: дальше FastAPI валидирует и сериализует ответ.
+        self.endpoint_done_at: Optional[float] = None
+        self._active: set = set()
+
+    def add(self, name: str, seconds: float) -> None:
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+@contextmanager
+def timed(name: str):
+    # Добавляет длительность блока к span name текущего запроса; вложенные блоки с тем же
+    # именем (get_current_principal -> get_current_user) не считаются дважды.
+    timings = current_timings.get()
+    if timings is None or name in timings._active:
+        yield
+        return
+    timings._active.add(name)
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings._active.discard(name)
+        timings.add(name, time.perf_counter() - started_at)
+
+
+def mark_endpoint_done() -> None:
+    timings = current_timings.get()
+    if timings is not None:
+        timings.endpoint_done_at = time.perf_counter()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timings = current_timings.get()
+    started_at = getattr(context, "_metrics_started_at", None)
+    if timings is None or started_at is None:
+        return
+    timings.db_seconds += time.perf_counter() - started_at
+    timings.db_statements += 1
+
+
+def install_db_timing(engine: Engine) -> None:
+    # Время и количество SQL-выражений складываются в RequestTimings текущего запроса.
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,70 @@
+# app/migrate.py
+# Применение миграций: python -m app.migrate
+# Отчёт о времени старта воркера: python -m app.migrate --check-startup
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Бюджет времени на импорт приложения и startup-хуки одного воркера.
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "1500"))
+
+
+async def _run_startup(app) -> dict:
+    timings = {}
+    for handler in app.router.on_startup:
+        started_at = time.perf_counter()
+        await handler()
+        timings[handler.__name__] = round((time.perf_counter() - started_at) * 1000, 2)
+    for handler in app.router.on_shutdown:
+        await handler()
+    return timings
+
+
+def check_startup(budget_ms: float) -> int:
+    started_at = time.perf_counter()
+    from app.main import app
+    import_ms = round((time.perf_counter() - started_at) * 1000, 2)
+
+    handlers_ms = asyncio.run(_run_startup(app))
+    total_ms = round(import_ms + sum(handlers_ms.values()), 2)
+
+    report = {
+        "import_ms": import_ms,
+        "startup_handlers_ms": handlers_ms,
+        "total_ms": total_ms,
+        "budget_ms": budget_ms,
+        "within_budget": total_ms <= budget_ms,
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0 if report["within_budget"] else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Миграции схемы БД")
+    parser.add_argument("--revision", default="head", help="До какой ревизии обновить схему")
+    parser.add_argument("--stamp", metavar="REVISION", help="Пометить БД ревизией без выполнения миграций")
+    parser.add_argument("--check-startup", action="store_true", help="Замерить время старта воркера")
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    args = parser.parse_args()
+
+    if args.check_startup:
+        return check_startup(args.budget_ms)
+
+    from app.database.migrations import stamp, upgrade
+    if args.stamp:
+        stamp(args.stamp)
+    else:
+        upgrade(args.revision)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
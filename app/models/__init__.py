@@ -1,2 +1,9 @@
+from datetime import datetime, timezone
+
 from sqlalchemy.orm import declarative_base
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
+
+
+def utcnow() -> datetime:
+    # В БД время хранится без часового пояса, в UTC.
+    return datetime.now(timezone.utc).replace(tzinfo=None)
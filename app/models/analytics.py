@@ -0,0 +1,42 @@
+from sqlalchemy import Column, Integer, Float, DateTime, Index
+from app.models.course import Base
+
+class CourseAnalytics(Base):
+    """
+    Сводка по курсу, пересчитывается фоновым обновлением (app/analytics.py).
+    Внешних ключей нет: сводки производные, строки удалённых курсов убирает обновление.
+    """
+    __tablename__ = "course_analytics"
+
+    course_id = Column(Integer, primary_key=True)
+    lesson_count = Column(Integer, nullable=False, default=0)
+    learners = Column(Integer, nullable=False, default=0)  # прошли хотя бы один урок
+    completers = Column(Integer, nullable=False, default=0)  # прошли все уроки
+    completions = Column(Integer, nullable=False, default=0)  # всего пройденных уроков
+    active_learners = Column(Integer, nullable=False, default=0)  # отмечали уроки за последние N дней
+    updated_at = Column(DateTime, nullable=False)
+
+
+class LessonAnalytics(Base):
+    """Количество прохождений урока; накапливается по приращениям прогресса."""
+    __tablename__ = "lesson_analytics"
+    __table_args__ = (
+        Index("ix_lesson_analytics_course_id", "course_id"),
+    )
+
+    lesson_id = Column(Integer, primary_key=True)
+    course_id = Column(Integer, nullable=False)
+    completions = Column(Integer, nullable=False, default=0)
+
+
+class AnalyticsState(Base):
+    """Состояние обновления сводок (одна строка, id = 1)."""
+    __tablename__ = "analytics_state"
+
+    id = Column(Integer, primary_key=True)
+    # До какого момента (progress.updated_at) изменения уже учтены.
+    watermark = Column(DateTime, nullable=True)
+    refreshed_at = Column(DateTime, nullable=True)
+    duration_ms = Column(Float, nullable=True)
+    courses = Column(Integer, nullable=False, default=0)
+    lessons = Column(Integer, nullable=False, default=0)
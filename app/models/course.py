@@ -1,10 +1,23 @@
-from sqlalchemy import Integer, String, Column
+from sqlalchemy import Integer, String, Column, DateTime, Index
 from sqlalchemy.ext.declarative import declarative_base
 
+from app.models import utcnow
+
 Base = declarative_base()
 
 class Course(Base):
     __tablename__ = "courses"
+    __table_args__ = (
+        # Выборка изменённых строк для инкрементальной выгрузки.
+        Index("ix_courses_updated_at_id", "updated_at", "id"),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
-    description = Column(String)
\ No newline at end of file
+    description = Column(String)
+    # Денормализованное количество уроков, поддерживается create_lesson / delete_lesson.
+    lesson_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Увеличивается при каждом изменении; из неё строится ETag.
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # Время последнего изменения (UTC) - водяной знак инкрементальной выгрузки.
+    updated_at = Column(DateTime, nullable=False, default=utcnow, onupdate=utcnow)
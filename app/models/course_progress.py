@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, ForeignKey, Index
+from app.models.course import Base
+
+class CourseProgressCounter(Base):
+    """Количество пройденных пользователем уроков курса (поддерживается при записи прогресса)."""
+    __tablename__ = "course_progress_counters"
+    __table_args__ = (
+        # Сводка аналитики по курсу (app/analytics.py) читает счётчики одного курса.
+        Index("ix_course_progress_counters_course_id", "course_id"),
+    )
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), primary_key=True)
+    completed_count = Column(Integer, nullable=False, default=0, server_default="0")
@@ -1,25 +0,0 @@
-# create_tables.py
-import asyncio
-from sqlalchemy.ext.asyncio import create_async_engine
-from app.models.course import Base
-from app.models.user import User
-from app.models.course import Course
-from app.models.lesson import Lesson
-from app.models.progress import Progress
-from app.models.material import Material
-from dotenv import load_dotenv
-import os
-
-load_dotenv()
-
-DATABASE_URL = os.getenv("DATABASE_URL")
-
-async def init_models():
-    engine = create_async_engine(DATABASE_URL, echo=True)
-    async with engine.begin() as conn:
-        # await conn.run_sync(Base.metadata.drop_all)
-        await conn.run_sync(Base.metadata.create_all)
-    await engine.dispose()
-
-if __name__ == "__main__":
-    asyncio.run(init_models())
\ No newline at end of file
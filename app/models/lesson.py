@@ -1,11 +1,23 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from app.models import utcnow
 from app.models.course import Base
 from datetime import datetime
 
 class Lesson(Base):
     __tablename__ = "lessons"
+    __table_args__ = (
+        # Ключ постраничной выборки уроков курса.
+        Index("ix_lessons_course_id_scheduled_at_id", "course_id", "scheduled_at", "id"),
+        Index("ix_lessons_updated_at_id", "updated_at", "id"),
+        # Календарь: уроки в интервале дат по набору курсов.
+        Index("ix_lessons_scheduled_at_course_id", "scheduled_at", "course_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     course_id = Column(Integer, ForeignKey("courses.id"), nullable=False)
     title = Column(String, nullable=False)
-    scheduled_at = Column(DateTime, default=datetime.now)
\ No newline at end of file
+    scheduled_at = Column(DateTime, default=datetime.now)
+    # Увеличивается при каждом изменении; из неё строится ETag.
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # Время последнего изменения (UTC) - водяной знак инкрементальной выгрузки.
+    updated_at = Column(DateTime, nullable=False, default=utcnow, onupdate=utcnow)
@@ -1,10 +1,20 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from app.database.types import GzipText
+from app.models import utcnow
 from app.models.course import Base
 
 class Material(Base):
     __tablename__ = "materials"
+    __table_args__ = (
+        Index("ix_materials_updated_at_id", "updated_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     lesson_id = Column(Integer, ForeignKey("lessons.id"), nullable=False)  # привязка к занятию
     title = Column(String, nullable=False)
-    text = Column(String, nullable=True)
\ No newline at end of file
+    # Хранится сжатым (gzip); сжатые байты отдаются клиентам без пересжатия.
+    text = Column(GzipText, nullable=True)
+    # Увеличивается при каждом изменении; из неё строится ETag.
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # Время последнего изменения (UTC) - водяной знак инкрементальной выгрузки.
+    updated_at = Column(DateTime, nullable=False, default=utcnow, onupdate=utcnow)
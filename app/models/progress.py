@@ -1,10 +1,20 @@
-from sqlalchemy import Column, Integer, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, Boolean, DateTime, ForeignKey, Index
+from app.models import utcnow
 from app.models.course import Base
 
 class Progress(Base):
     __tablename__ = "progress"
+    __table_args__ = (
+        # Одна запись на пару (пользователь, урок) - цель для ON CONFLICT.
+        Index("ix_progress_user_id_lesson_id", "user_id", "lesson_id", unique=True),
+        Index("ix_progress_updated_at_id", "updated_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     lesson_id = Column(Integer, ForeignKey("lessons.id"), nullable=False)
-    is_completed = Column(Boolean, default=False)
\ No newline at end of file
+    is_completed = Column(Boolean, default=False)
+    # Когда урок впервые отмечен пройденным (UTC).
+    completed_at = Column(DateTime, nullable=True)
+    # Время последнего изменения (UTC) - водяной знак инкрементальной выгрузки.
+    updated_at = Column(DateTime, nullable=False, default=utcnow, onupdate=utcnow)
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from app.models.course import Base
+
+class SearchEntry(Base):
+    """Полнотекстовый индекс каталога (только PostgreSQL, см. app/search/postgres.py)."""
+    __tablename__ = "search_entries"
+    __table_args__ = (
+        Index("ix_search_entries_document", "document", postgresql_using="gin"),
+    )
+
+    kind = Column(String, primary_key=True)  # course / lesson / material
+    entity_id = Column(Integer, primary_key=True)
+    document = Column(TSVECTOR, nullable=False)
@@ -8,4 +8,6 @@ class User(Base):
     username = Column(String, unique=True, index=True, nullable=False)
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
-    is_admin = Column(Boolean, default=False)
\ No newline at end of file
+    is_admin = Column(Boolean, default=False)
+    # Увеличивается при отзыве всех выданных пользователю токенов.
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
\ No newline at end of file
@@ -0,0 +1,47 @@
+# app/progress_counters.py
+# Пересчёт денормализованных счётчиков прогресса: python -m app.progress_counters
+
+import asyncio
+import json
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.course import Course
+from app.models.course_progress import CourseProgressCounter
+from app.models.lesson import Lesson
+from app.models.progress import Progress
+
+
+async def rebuild_counters(db: AsyncSession) -> dict:
+    """Пересчитывает courses.lesson_count и course_progress_counters с нуля в одной транзакции."""
+    lesson_count = (
+        select(func.count(Lesson.id))
+        .where(Lesson.course_id == Course.id)
+        .scalar_subquery()
+    )
+    courses = await db.execute(update(Course).values(lesson_count=lesson_count))
+
+    await db.execute(delete(CourseProgressCounter))
+    counters = await db.execute(
+        insert(CourseProgressCounter).from_select(
+            ["user_id", "course_id", "completed_count"],
+            select(Progress.user_id, Lesson.course_id, func.count(Progress.id))
+            .join(Lesson, Lesson.id == Progress.lesson_id)
+            .where(Progress.is_completed == True)
+            .group_by(Progress.user_id, Lesson.course_id),
+        )
+    )
+    await db.commit()
+    return {"courses": courses.rowcount, "counters": counters.rowcount}
+
+
+async def main() -> None:
+    from app.database.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        print(json.dumps(await rebuild_counters(db)))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,31 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class CourseAnalyticsOut(BaseModel):
+    course_id: int
+    title: Optional[str] = None
+    lesson_count: int
+    learners: int = Field(..., description="Прошли хотя бы один урок")
+    completers: int = Field(..., description="Прошли все уроки курса")
+    completion_rate: float = Field(..., description="Доля завершивших среди начавших, %")
+    completions: int = Field(..., description="Всего пройденных уроков")
+    active_learners: int = Field(..., description="Отмечали уроки за последние `ANALYTICS_ACTIVE_DAYS` дней")
+    updated_at: Optional[datetime] = Field(None, description="Когда сводка курса пересчитана (UTC)")
+
+
+class LessonAnalyticsOut(BaseModel):
+    lesson_id: int
+    title: str
+    scheduled_at: datetime
+    completions: int
+    completion_rate: float = Field(..., description="Доля прошедших урок среди начавших курс, %")
+    drop_off: Optional[int] = Field(
+        None, description="Насколько меньше прохождений, чем у предыдущего по расписанию урока"
+    )
+
+
+class CourseAnalyticsDetail(CourseAnalyticsOut):
+    lessons: List[LessonAnalyticsOut]
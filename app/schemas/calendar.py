@@ -0,0 +1,16 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class CalendarLesson(BaseModel):
+    id: int
+    course_id: int
+    course_title: Optional[str] = None
+    title: str
+    scheduled_at: datetime
+
+
+class CalendarFeed(BaseModel):
+    url: str
@@ -0,0 +1,33 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from app.schemas.course import CourseCreate
+from app.schemas.material import MaterialCreate
+
+
+class LessonImport(BaseModel):
+    title: str
+    scheduled_at: Optional[datetime] = None
+    materials: List[MaterialCreate] = []
+
+
+class CourseImport(CourseCreate):
+    """Одна строка NDJSON: курс со всеми уроками и материалами."""
+    lessons: List[LessonImport] = []
+
+
+class ImportLineError(BaseModel):
+    line: int = Field(..., description="Номер строки во входном файле (с 1)")
+    error: str
+
+
+class ImportReport(BaseModel):
+    lines: int = Field(..., description="Обработано непустых строк")
+    courses: int
+    lessons: int
+    materials: int
+    failed: int = Field(..., description="Строк, которые не удалось импортировать")
+    errors: List[ImportLineError]
+    errors_truncated: bool = Field(False, description="Ошибок больше, чем показано")
@@ -1,8 +1,59 @@
-from pydantic import BaseModel, Field
+import os
+from datetime import datetime, timedelta, timezone
+from typing import List, Literal, Optional, Union
+
+from dotenv import load_dotenv
+from pydantic import BaseModel, Field, field_validator
+
+from app.models import utcnow
+
+load_dotenv()
+
+# Максимальное количество уроков в одном запросе массовой отметки.
+PROGRESS_BATCH_MAX_SIZE = int(os.getenv("PROGRESS_BATCH_MAX_SIZE", "500"))
+# На сколько секунд completed_at может опережать часы сервера (расхождение часов клиента).
+PROGRESS_CLOCK_SKEW_SECONDS = int(os.getenv("PROGRESS_CLOCK_SKEW_SECONDS", "300"))
 
 
 class CourseProgressSummary(BaseModel):
     total_lessons: int = Field(..., description="Общее количество уроков в курсе")
     completed_lessons: int = Field(..., description="Количество пройденных уроков")
     uncompleted_lessons: int = Field(..., description="Количество непройденных уроков")
-    progress_percentage: float = Field(..., ge=0, le=100, description="Процент прохождения курса")
\ No newline at end of file
+    progress_percentage: float = Field(..., ge=0, le=100, description="Процент прохождения курса")
+
+
+class LessonCompletion(BaseModel):
+    lesson_id: int
+    completed_at: Optional[datetime] = Field(None, description="Когда урок пройден (по умолчанию - время запроса)")
+
+    @field_validator("completed_at")
+    @classmethod
+    def not_in_future(cls, value: Optional[datetime]) -> Optional[datetime]:
+        if value is None:
+            return None
+        # Время без часового пояса считается UTC - так же оно и сохраняется.
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        if value > utcnow() + timedelta(seconds=PROGRESS_CLOCK_SKEW_SECONDS):
+            raise ValueError("completed_at is in the future")
+        return value
+
+
+class BulkCompletionRequest(BaseModel):
+    items: List[Union[int, LessonCompletion]] = Field(
+        ...,
+        min_length=1,
+        max_length=PROGRESS_BATCH_MAX_SIZE,
+        description="ID уроков или пары (lesson_id, completed_at)",
+    )
+
+
+class LessonCompletionResult(BaseModel):
+    lesson_id: int
+    status: Literal["completed", "not_found"]
+
+
+class BulkCompletionResponse(BaseModel):
+    completed: int
+    not_found: int
+    results: List[LessonCompletionResult]
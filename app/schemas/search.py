@@ -0,0 +1,13 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class SearchHit(BaseModel):
+    kind: str = Field(..., description="course, lesson или material")
+    id: int
+    title: str
+    snippet: str = Field(..., description="Фрагмент с подсветкой совпадений в <mark>; HTML экранирован")
+    score: float
+    course_id: Optional[int] = None
+    lesson_id: Optional[int] = None
@@ -12,6 +12,10 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     username: str | None = None
     sub: Optional[str] = None
+    # Необязательные подписанные claims: позволяют не ходить в БД за пользователем.
+    email: str | None = None
+    is_admin: bool | None = None
+    ver: int | None = None
 class TokenValidationResponse(BaseModel):
     valid: bool
     user: UserOut | None
@@ -19,4 +19,14 @@ class UserOut(BaseModel):
     username: str
     email: str
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+
+class Principal(BaseModel):
+    """Текущий пользователь, собранный из claims токена (без обращения к БД)."""
+    id: int
+    username: str
+    email: str
+    is_admin: bool = False
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,51 @@
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Iterable, NamedTuple, Optional, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class SearchDocument(NamedTuple):
+    kind: str
+    entity_id: int
+    title: str
+    body: Optional[str]
+
+
+class SearchResult(NamedTuple):
+    kind: str
+    entity_id: int
+    score: float
+
+
+class SearchBackend(ABC):
+    """
+    Полнотекстовый индекс каталога. upsert/delete вызываются до commit в той же сессии,
+    что и запись сущностей: изменения индекса фиксируются или откатываются вместе с ней.
+    """
+
+    @abstractmethod
+    async def upsert(self, db: AsyncSession, documents: Iterable[SearchDocument]) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, db: AsyncSession, kind: str, entity_ids: Iterable[int]) -> None:
+        ...
+
+    @abstractmethod
+    async def search(
+        self,
+        db: AsyncSession,
+        query: str,
+        kinds: Sequence[str],
+        limit: int,
+        offset: int,
+    ) -> list[SearchResult]:
+        """Результаты по убыванию релевантности, при равной - по (kind, entity_id)."""
+
+    @abstractmethod
+    async def rebuild(self, db: AsyncSession, documents: AsyncIterator[list[SearchDocument]]) -> int:
+        """Строит индекс заново из пачек документов; возвращает количество документов."""
+
+    @abstractmethod
+    def stats(self) -> dict:
+        ...
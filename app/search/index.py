@@ -0,0 +1,87 @@
+# app/search/index.py
+# Полнотекстовый поиск по каталогу. Перестроение индекса: python -m app.search.index
+
+import asyncio
+import json
+import os
+from typing import AsyncIterator, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.database import DATABASE_URL
+from app.models.course import Course
+from app.models.lesson import Lesson
+from app.models.material import Material
+from app.search.base import SearchBackend, SearchDocument
+from app.search.memory import MemorySearchBackend
+
+load_dotenv()
+
+# auto - PostgreSQL (tsvector + GIN) для PostgreSQL, иначе индекс в памяти процесса.
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "auto")
+# Конфигурация текстового поиска PostgreSQL: simple - без стемминга, russian - со стеммингом.
+SEARCH_TS_CONFIG = os.getenv("SEARCH_TS_CONFIG", "simple")
+# Длина фрагмента с подсветкой в результатах поиска.
+SEARCH_SNIPPET_CHARS = int(os.getenv("SEARCH_SNIPPET_CHARS", "200"))
+SEARCH_REBUILD_BATCH = 1000
+
+COURSE, LESSON, MATERIAL = "course", "lesson", "material"
+SEARCH_KINDS = (COURSE, LESSON, MATERIAL)
+
+
+def course_document(course_id: int, title: Optional[str], description: Optional[str]) -> SearchDocument:
+    return SearchDocument(COURSE, course_id, title or "", description)
+
+
+def lesson_document(lesson_id: int, title: str) -> SearchDocument:
+    return SearchDocument(LESSON, lesson_id, title, None)
+
+
+def material_document(material_id: int, title: str, text: Optional[str]) -> SearchDocument:
+    return SearchDocument(MATERIAL, material_id, title, text)
+
+
+async def catalog_documents(db: AsyncSession) -> AsyncIterator[list[SearchDocument]]:
+    """Все документы каталога пачками; строки читаются потоком, без загрузки таблиц целиком."""
+    sources = (
+        (select(Course.id, Course.title, Course.description), course_document),
+        (select(Lesson.id, Lesson.title), lesson_document),
+        (select(Material.id, Material.title, Material.text), material_document),
+    )
+    for query, build in sources:
+        result = await db.stream(query.execution_options(yield_per=SEARCH_REBUILD_BATCH))
+        async for rows in result.partitions():
+            yield [build(*row) for row in rows]
+
+
+def create_backend(name: str = SEARCH_BACKEND, database_url: str = DATABASE_URL) -> SearchBackend:
+    if name == "auto":
+        name = "postgres" if database_url.startswith("postgresql") else "memory"
+    if name == "postgres":
+        from app.search.postgres import PostgresSearchBackend
+        return PostgresSearchBackend(SEARCH_TS_CONFIG)
+    if name == "memory":
+        return MemorySearchBackend(catalog_documents)
+    raise ValueError(f"Unknown SEARCH_BACKEND: {name}")
+
+
+search_index = create_backend()
+
+
+async def reindex(db: AsyncSession) -> dict:
+    """Перестраивает индекс из текущего содержимого каталога."""
+    documents = await search_index.rebuild(db, catalog_documents(db))
+    return {"documents": documents, **search_index.stats()}
+
+
+async def main() -> None:
+    from app.database.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        print(json.dumps(await reindex(db)))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,160 @@
+import asyncio
+import heapq
+import math
+from collections import Counter
+from typing import AsyncIterator, Callable, Iterable, Optional, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.search.base import SearchBackend, SearchDocument, SearchResult
+from app.search.text import parse_query, tokenize
+
+# Слова заголовка весят больше слов текста (аналог setweight A/B в PostgreSQL).
+TITLE_WEIGHT = 2
+# Параметры BM25.
+K1 = 1.2
+B = 0.75
+
+PENDING_KEY = "search_pending"
+
+DocumentKey = tuple[str, int]
+
+
+class MemorySearchBackend(SearchBackend):
+    """
+    Инвертированный индекс в памяти процесса (для SQLite и разработки).
+    Строится из БД при первом поиске; изменения применяются после commit сессии,
+    в которой они сделаны. Записи других процессов не видны до перезапуска.
+    """
+
+    def __init__(self, load: Callable[[AsyncSession], AsyncIterator[list[SearchDocument]]]):
+        self._load = load
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        self._postings: dict[str, dict[DocumentKey, int]] = {}
+        self._terms: dict[DocumentKey, Counter] = {}
+        self._lengths: dict[DocumentKey, int] = {}
+        self._total_length = 0
+        event.listen(Session, "after_commit", self._after_commit)
+        event.listen(Session, "after_rollback", self._after_rollback)
+
+    # Изменения копятся в session.info и применяются только после успешного commit.
+    def _stage(self, db: AsyncSession, operation: tuple) -> None:
+        db.sync_session.info.setdefault(PENDING_KEY, []).append(operation)
+
+    def _after_commit(self, session: Session) -> None:
+        for operation in session.info.pop(PENDING_KEY, ()):
+            if not self._loaded:
+                # Индекс ещё не построен - изменения попадут в него при загрузке из БД.
+                continue
+            if operation[0] == "upsert":
+                self._add(operation[1])
+            else:
+                self._remove(operation[1])
+
+    def _after_rollback(self, session: Session) -> None:
+        session.info.pop(PENDING_KEY, None)
+
+    async def upsert(self, db: AsyncSession, documents: Iterable[SearchDocument]) -> None:
+        for document in documents:
+            self._stage(db, ("upsert", document))
+
+    async def delete(self, db: AsyncSession, kind: str, entity_ids: Iterable[int]) -> None:
+        for entity_id in entity_ids:
+            self._stage(db, ("delete", (kind, entity_id)))
+
+    def _add(self, document: SearchDocument) -> None:
+        key = (document.kind, document.entity_id)
+        self._remove(key)
+        terms = Counter(tokenize(document.body))
+        for word in tokenize(document.title):
+            terms[word] += TITLE_WEIGHT
+        if not terms:
+            return
+        self._terms[key] = terms
+        length = sum(terms.values())
+        self._lengths[key] = length
+        self._total_length += length
+        for word, count in terms.items():
+            self._postings.setdefault(word, {})[key] = count
+
+    def _remove(self, key: DocumentKey) -> None:
+        terms = self._terms.pop(key, None)
+        if terms is None:
+            return
+        self._total_length -= self._lengths.pop(key)
+        for word in terms:
+            postings = self._postings[word]
+            del postings[key]
+            if not postings:
+                del self._postings[word]
+
+    def _clear(self) -> None:
+        self._postings, self._terms, self._lengths, self._total_length = {}, {}, {}, 0
+
+    async def _ensure_loaded(self, db: AsyncSession) -> None:
+        if self._loaded:
+            return
+        async with self._lock:
+            if not self._loaded:
+                await self.rebuild(db, self._load(db))
+
+    async def rebuild(self, db: AsyncSession, documents: AsyncIterator[list[SearchDocument]]) -> int:
+        self._clear()
+        count = 0
+        async for batch in documents:
+            for document in batch:
+                self._add(document)
+            count += len(batch)
+        self._loaded = True
+        return count
+
+    async def search(
+        self,
+        db: AsyncSession,
+        query: str,
+        kinds: Sequence[str],
+        limit: int,
+        offset: int,
+    ) -> list[SearchResult]:
+        await self._ensure_loaded(db)
+        include, exclude = parse_query(query)
+        if not include:
+            return []
+        postings = [self._postings.get(word, {}) for word in include]
+        # Кандидаты - документы со всеми словами; пересечение начинаем с самого редкого.
+        postings.sort(key=len)
+        candidates: Optional[set] = None
+        for term_postings in postings:
+            candidates = set(term_postings) if candidates is None else candidates & term_postings.keys()
+            if not candidates:
+                return []
+        for word in exclude:
+            candidates -= self._postings.get(word, {}).keys()
+        if kinds:
+            candidates = {key for key in candidates if key[0] in kinds}
+
+        documents = len(self._lengths)
+        average_length = self._total_length / documents if documents else 1
+        scored = []
+        for key in candidates:
+            length_norm = K1 * (1 - B + B * self._lengths[key] / average_length)
+            score = 0.0
+            for term_postings in postings:
+                tf = term_postings[key]
+                idf = math.log(1 + (documents - len(term_postings) + 0.5) / (len(term_postings) + 0.5))
+                score += idf * tf * (K1 + 1) / (tf + length_norm)
+            scored.append(SearchResult(key[0], key[1], round(score, 6)))
+        # Полная сортировка не нужна - только первые offset + limit.
+        top = heapq.nsmallest(offset + limit, scored, key=lambda r: (-r.score, r.kind, r.entity_id))
+        return top[offset:]
+
+    def stats(self) -> dict:
+        return {
+            "backend": "memory",
+            "loaded": self._loaded,
+            "documents": len(self._lengths),
+            "terms": len(self._postings),
+        }
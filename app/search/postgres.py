@@ -0,0 +1,80 @@
+from typing import AsyncIterator, Iterable, Sequence
+
+from sqlalchemy import cast, delete, func, literal, literal_column, select
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.upsert import insert_for
+from app.models.search import SearchEntry
+from app.search.base import SearchBackend, SearchDocument, SearchResult
+
+
+class PostgresSearchBackend(SearchBackend):
+    """Индекс в таблице search_entries: tsvector с GIN-индексом, ранжирование ts_rank_cd."""
+
+    def __init__(self, config: str):
+        self.config = config
+
+    def _config(self):
+        return cast(literal(self.config), REGCONFIG)
+
+    def _vector(self, document: SearchDocument):
+        # Заголовок - вес A, текст - вес B: совпадение в заголовке ранжируется выше.
+        return func.setweight(func.to_tsvector(self._config(), document.title), literal_column("'A'")).op("||")(
+            func.setweight(func.to_tsvector(self._config(), document.body or ""), literal_column("'B'"))
+        )
+
+    async def upsert(self, db: AsyncSession, documents: Iterable[SearchDocument]) -> None:
+        rows = [
+            {"kind": d.kind, "entity_id": d.entity_id, "document": self._vector(d)}
+            for d in documents
+        ]
+        if not rows:
+            return
+        stmt = insert_for(db, SearchEntry).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SearchEntry.kind, SearchEntry.entity_id],
+            set_={"document": stmt.excluded.document},
+        )
+        await db.execute(stmt)
+
+    async def delete(self, db: AsyncSession, kind: str, entity_ids: Iterable[int]) -> None:
+        entity_ids = list(entity_ids)
+        if entity_ids:
+            await db.execute(
+                delete(SearchEntry).where(SearchEntry.kind == kind, SearchEntry.entity_id.in_(entity_ids))
+            )
+
+    async def search(
+        self,
+        db: AsyncSession,
+        query: str,
+        kinds: Sequence[str],
+        limit: int,
+        offset: int,
+    ) -> list[SearchResult]:
+        tsquery = func.websearch_to_tsquery(self._config(), query)
+        rank = func.ts_rank_cd(SearchEntry.document, tsquery).label("score")
+        stmt = (
+            select(SearchEntry.kind, SearchEntry.entity_id, rank)
+            .where(SearchEntry.document.op("@@")(tsquery))
+            .order_by(rank.desc(), SearchEntry.kind, SearchEntry.entity_id)
+            .limit(limit)
+            .offset(offset)
+        )
+        if kinds:
+            stmt = stmt.where(SearchEntry.kind.in_(kinds))
+        result = await db.execute(stmt)
+        return [SearchResult(row.kind, row.entity_id, float(row.score)) for row in result]
+
+    async def rebuild(self, db: AsyncSession, documents: AsyncIterator[list[SearchDocument]]) -> int:
+        await db.execute(delete(SearchEntry))
+        count = 0
+        async for batch in documents:
+            await self.upsert(db, batch)
+            count += len(batch)
+        await db.commit()
+        return count
+
+    def stats(self) -> dict:
+        return {"backend": "postgres", "config": self.config}
@@ -0,0 +1,61 @@
+import html
+import re
+from typing import Iterable, Optional
+
+WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def normalize(word: str) -> str:
+    return word.lower().replace("ё", "е")
+
+
+def tokenize(text: Optional[str]) -> list[str]:
+    return [normalize(word) for word in WORD.findall(text or "")]
+
+
+def parse_query(query: str) -> tuple[list[str], list[str]]:
+    """
+    Упрощённый синтаксис websearch_to_tsquery: слова через пробел - все обязательны,
+    "-слово" - исключить. Возвращает (искомые, исключённые) нормализованные слова.
+    """
+    include: list[str] = []
+    exclude: list[str] = []
+    for part in query.split():
+        target = exclude if part.startswith("-") else include
+        for word in tokenize(part):
+            if word not in target:
+                target.append(word)
+    # "or" в websearch - оператор; в упрощённом разборе просто не ищется.
+    return [word for word in include if word != "or"], exclude
+
+
+def snippet(text: Optional[str], terms: Iterable[str], width: int) -> str:
+    """
+    Фрагмент текста длиной около width символов вокруг первого совпадения;
+    совпавшие слова обёрнуты в <mark>, остальной текст экранирован для HTML.
+    """
+    text = text or ""
+    terms = set(terms)
+    matches = [m for m in WORD.finditer(text) if normalize(m.group()) in terms]
+    start = 0
+    if matches and matches[0].start() > width // 3:
+        # Совпадение ближе к началу окна, но с контекстом перед ним; начало - с границы слова.
+        start = text.rfind(" ", 0, matches[0].start() - width // 3) + 1
+    end = min(len(text), start + width)
+    if end < len(text):
+        end = max(text.rfind(" ", start, end), start + width // 2)
+
+    parts = ["…" if start > 0 else ""]
+    position = start
+    for match in matches:
+        if match.start() < start:
+            continue
+        if match.end() > end:
+            break
+        parts.append(html.escape(text[position:match.start()]))
+        parts.append(f"<mark>{html.escape(match.group())}</mark>")
+        position = match.end()
+    parts.append(html.escape(text[position:end]))
+    if end < len(text):
+        parts.append("…")
+    return "".join(parts)
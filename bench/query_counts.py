@@ -0,0 +1,142 @@
+"""
+Количество SQL-запросов на эндпоинт: прогоняет запросы через приложение и сверяет
+число выполненных выражений с бюджетом. Код возврата 1, если какой-то эндпоинт
+превысил бюджет, - скрипт можно запускать в CI.
+
+    python -m bench.query_counts            # временная SQLite-база
+    DATABASE_URL=postgresql+asyncpg://... python -m bench.query_counts
+
+Кеш каталога на время замера выключен: считаются запросы в БД, а не попадания в кеш.
+Бюджеты рассчитаны на токены с claims (JWT_EMBED_CLAIMS=1, если не задано иное): без них
+каждый защищённый запрос добавляет SELECT пользователя.
+"""
+import os
+import sys
+import tempfile
+
+# Настройки должны быть выставлены до импорта приложения.
+os.environ["CACHE_BACKEND"] = "none"
+os.environ.setdefault("JWT_EMBED_CLAIMS", "1")
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "query_counts.db")
+
+from sqlalchemy import event
+
+from app.database.database import engine, read_engine
+
+# (метод, путь, тело) -> максимально допустимое число SQL-выражений.
+# Чтения замеряются после прогрева (версия токена уже в кеше), записи - с первого вызова.
+READ_BUDGETS = [
+    ("GET", "/courses/", None, 1),
+    ("GET", "/courses/1", None, 1),
+    ("GET", "/lessons/1", None, 1),
+    ("GET", "/lessons/1/lessons", None, 1),
+    ("GET", "/lessons/999/lessons", None, 1),
+    ("GET", "/lessons/1/progress", None, 1),
+    ("GET", "/lessons/999/progress", None, 1),
+    ("GET", "/progress/1/stats", None, 1),
+    ("GET", "/lessons/1/materials", None, 1),
+    ("GET", "/lessons/999/materials", None, 1),
+    ("GET", "/lessons/materials/1", None, 1),
+    ("GET", "/lessons/materials/999", None, 1),
+    ("GET", "/calendar/upcoming", None, 1),
+]
+# Создание и изменение - один INSERT/UPDATE ... RETURNING без повторного SELECT;
+# создание урока дополнительно увеличивает courses.lesson_count.
+WRITE_BUDGETS = [
+    ("POST", "/courses/", {"title": "Ещё один курс"}, 1),
+    ("PUT", "/courses/1", {"description": "Изменён"}, 1),
+    ("PUT", "/courses/999", {"description": "Изменён"}, 1),
+    ("POST", "/lessons/", {"course_id": 1, "title": "Урок 4"}, 2),
+    ("POST", "/lessons/", {"course_id": 999, "title": "Урок"}, 1),
+    ("PUT", "/lessons/materials/1", {"title": "Материал (изменён)"}, 1),
+    ("PUT", "/lessons/materials/999", {"title": "Материал"}, 1),
+    ("POST", "/auth/register", {"username": "qc_new", "email": "qc_new@example.com", "password": "password"}, 1),
+    ("POST", "/auth/register", {"username": "qc_new", "email": "qc_other@example.com", "password": "password"}, 1),
+    ("POST", "/auth/register", {"username": "qc_other", "email": "qc_new@example.com", "password": "password"}, 1),
+    ("POST", "/lessons/1/materials", {"title": "Конспект", "text": "..."}, 1),
+    ("POST", "/lessons/999/materials", {"title": "Конспект"}, 1),
+    ("POST", "/progress/complete/1", None, 2),
+    ("POST", "/progress/complete/1", None, 2),
+    ("POST", "/progress/complete", {"items": [2, 3, 999]}, 3),
+]
+
+
+class QueryCounter:
+    """Считает выражения, выполненные движками приложения (основным и репликой)."""
+
+    def __init__(self, *engines):
+        self.engines = [e.sync_engine for e in dict.fromkeys(engines)]
+        self.statements: list[str] = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        for sync_engine in self.engines:
+            event.listen(sync_engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        for sync_engine in self.engines:
+            event.remove(sync_engine, "before_cursor_execute", self._on_execute)
+
+    def reset(self) -> None:
+        self.statements.clear()
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+def seed(client) -> dict:
+    # Администратор, пользователь, курс с тремя уроками и материал.
+    account = {"username": "qc_admin", "email": "qc_admin@example.com", "password": "password"}
+    client.post("/auth/register/admin", params={"master_key": "admin"}, json=account)
+    token = client.post("/auth/login", json=account).json()["access_token"]
+    admin = {"Authorization": f"Bearer {token}"}
+
+    user = {"username": "qc_user", "email": "qc_user@example.com", "password": "password"}
+    client.post("/auth/register", json=user)
+    token = client.post("/auth/login", json=user).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    client.post("/courses/", json={"title": "Курс для замера"}, headers=admin)
+    for title in ("Урок 1", "Урок 2", "Урок 3"):
+        client.post("/lessons/", json={"course_id": 1, "title": title}, headers=admin)
+    client.post("/lessons/1/materials", json={"title": "Материал"}, headers=admin)
+    return {"admin": admin, "user": headers}
+
+
+def main() -> int:
+    from fastapi.testclient import TestClient
+
+    from app.auth.hashing import password_hasher
+    from app.database.migrations import upgrade
+    from app.main import app
+
+    upgrade()
+    password_hasher.rounds = 4
+
+    failed = False
+    with TestClient(app) as client, QueryCounter(engine, read_engine) as counter:
+        headers = seed(client)
+        for budgets, warm_up in ((READ_BUDGETS, True), (WRITE_BUDGETS, False)):
+            for method, path, body, budget in budgets:
+                admin_only = method != "GET" and path.startswith(("/courses/", "/lessons/"))
+                auth = headers["admin"] if admin_only else headers["user"]
+                if warm_up:
+                    client.request(method, path, json=body, headers=auth)
+                counter.reset()
+                response = client.request(method, path, json=body, headers=auth)
+                ok = counter.count <= budget
+                failed |= not ok
+                print(f"{'ok ' if ok else 'FAIL'} {method:<5} {path:<28} {response.status_code}  {counter.count}/{budget}")
+                if not ok:
+                    for statement in counter.statements:
+                        print("       " + " ".join(statement.split())[:150])
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,405 @@
+"""
+Нагрузочный прогон всех маршрутов приложения в процессе (httpx + ASGI, без сети).
+Для каждого сценария: p50/p95/p99 и среднее время ответа, пропускная способность,
+количество SQL-выражений на запрос (из заголовка Server-Timing), коды ответов.
+Результаты сохраняются в JSON для сравнения между коммитами.
+
+    python -m bench.run                                   # временная SQLite с bench.seed
+    DATABASE_URL=postgresql+asyncpg://... python -m bench.seed
+    DATABASE_URL=postgresql+asyncpg://... python -m bench.run --requests 500 --concurrency 16
+    python -m bench.run --compare bench/results/<прошлый>.json
+
+База должна быть заполнена bench.seed (пользователи user1..userN, администратор bench_admin).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+# Поток событий в прогоне закрывается сразу после открытия: замеряется подключение
+# (аутентификация, подписка, первый кадр), а не ожидание событий.
+os.environ.setdefault("SSE_MAX_STREAM_SECONDS", "0")
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+SERVER_TIMING_QUERIES = re.compile(r'db;[^,]*desc="(\d+) queries"')
+# Переменные окружения, от которых зависят результаты, - попадают в отчёт.
+REPORTED_ENV = (
+    "CACHE_BACKEND", "FAST_LIST_RESPONSES", "DB_POOL_SIZE", "DB_MAX_OVERFLOW",
+    "BCRYPT_ROUNDS", "PASSWORD_HASH_WORKERS", "JWT_EMBED_CLAIMS", "DATABASE_READ_URL",
+)
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Context:
+    """Состояние прогона: клиент, токены, id сущностей из базы и созданные по ходу."""
+
+    def __init__(self, client, rng: random.Random, run_id: str):
+        self.client = client
+        self.rng = rng
+        self.run_id = run_id
+        self.admin: dict = {}
+        self.users: list[dict] = []
+        self.course_ids: list[int] = []
+        self.lesson_ids: list[int] = []
+        self.created: dict[str, list[int]] = {"courses": [], "lessons": [], "materials": [], "users": []}
+
+    def user(self) -> dict:
+        return self.rng.choice(self.users)
+
+    async def login(self, username: str, password: str = "password") -> dict:
+        response = await self.client.post("/auth/login", json={"username": username, "password": password})
+        response.raise_for_status()
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+class Scenario:
+    def __init__(
+        self,
+        method: str,
+        route: str,
+        build: Callable[[Context, int], Awaitable[dict]],
+        after: Optional[Callable[[Context, object], None]] = None,
+        max_requests: Optional[Callable[[Context], int]] = None,
+    ):
+        self.method = method
+        self.route = route
+        self.build = build
+        self.after = after
+        self.max_requests = max_requests
+
+    @property
+    def name(self) -> str:
+        return f"{self.method} {self.route}"
+
+
+def _created(kind: str):
+    def after(ctx: Context, response) -> None:
+        if response.status_code == 201:
+            ctx.created[kind].append(response.json()["id"])
+    return after
+
+
+def _pop_created(kind: str):
+    # Каждый созданный объект удаляется ровно один раз.
+    async def build(ctx: Context, i: int) -> dict:
+        return {"id": ctx.created[kind].pop()}
+    return build
+
+
+async def _logout_user(ctx: Context, i: int) -> dict:
+    # Отзыв токенов - у пользователей, зарегистрированных в этом прогоне; вход не замеряется.
+    username = ctx.created["users"][i % len(ctx.created["users"])]
+    return {"headers": await ctx.login(username)}
+
+
+async def _calendar_feed(ctx: Context, i: int) -> dict:
+    # Ссылка на ленту выдаётся отдельным, незамеряемым запросом; из неё берётся токен.
+    response = await ctx.client.get("/calendar/feed", headers=ctx.user())
+    response.raise_for_status()
+    return {"params": dict(parse_qsl(urlsplit(response.json()["url"]).query))}
+
+
+def build_scenarios() -> list[Scenario]:
+    one = lambda value: (lambda ctx: value)  # noqa: E731
+    return [
+        # Чтение
+        Scenario("GET", "/", lambda ctx, i: _ret({})),
+        Scenario("GET", "/auth/me", lambda ctx, i: _ret({"headers": ctx.user()})),
+        Scenario("GET", "/courses/", lambda ctx, i: _ret({"headers": ctx.user(), "params": {"limit": 100}})),
+        Scenario("GET", "/courses/{course_id}", lambda ctx, i: _ret({"course_id": ctx.rng.choice(ctx.course_ids)})),
+        Scenario("GET", "/lessons/{lesson_id}", lambda ctx, i: _ret({"lesson_id": ctx.rng.choice(ctx.lesson_ids)})),
+        Scenario("GET", "/lessons/{course_id}/lessons", lambda ctx, i: _ret(
+            {"course_id": ctx.rng.choice(ctx.course_ids), "headers": ctx.user(), "params": {"limit": 100}})),
+        Scenario("GET", "/lessons/{course_id}/progress", lambda ctx, i: _ret(
+            {"course_id": ctx.rng.choice(ctx.course_ids), "headers": ctx.user()})),
+        Scenario("GET", "/lessons/{lesson_id}/materials", lambda ctx, i: _ret(
+            {"lesson_id": ctx.rng.choice(ctx.lesson_ids), "headers": ctx.user()})),
+        Scenario("GET", "/progress/{course_id}/stats", lambda ctx, i: _ret(
+            {"course_id": ctx.rng.choice(ctx.course_ids), "headers": ctx.user()})),
+        Scenario("GET", "/search/", lambda ctx, i: _ret({"headers": ctx.user(), "params": {
+            "q": ctx.rng.choice(("Курс", "Урок", "материала", "Описание курса", "Текст -Урок"))}})),
+        Scenario("GET", "/progress/events", lambda ctx, i: _ret({"headers": ctx.user()})),
+        Scenario("GET", "/calendar/upcoming", lambda ctx, i: _ret({"headers": ctx.user(), "params": {
+            "start": "2030-01-01T00:00:00", "end": "2030-03-01T00:00:00"}})),
+        Scenario("GET", "/calendar/upcoming.ics", lambda ctx, i: _ret({"headers": ctx.user(), "params": {
+            "start": "2030-01-01T00:00:00", "end": "2030-03-01T00:00:00"}})),
+        Scenario("GET", "/calendar/feed", lambda ctx, i: _ret({"headers": ctx.user()})),
+        Scenario("GET", "/calendar/feed.ics", _calendar_feed),
+        Scenario("GET", "/admin/password-hashing", lambda ctx, i: _ret({"headers": ctx.admin})),
+        Scenario("GET", "/admin/token-cache", lambda ctx, i: _ret({"headers": ctx.admin})),
+        Scenario("GET", "/admin/cache", lambda ctx, i: _ret({"headers": ctx.admin})),
+        Scenario("GET", "/admin/db-pool", lambda ctx, i: _ret({"headers": ctx.admin})),
+        Scenario("GET", "/admin/events", lambda ctx, i: _ret({"headers": ctx.admin})),
+        Scenario("GET", "/admin/analytics/courses", lambda ctx, i: _ret({"headers": ctx.admin})),
+        Scenario("GET", "/admin/analytics/courses/{course_id}", lambda ctx, i: _ret(
+            {"course_id": ctx.rng.choice(ctx.course_ids), "headers": ctx.admin})),
+        Scenario("GET", "/admin/analytics/status", lambda ctx, i: _ret({"headers": ctx.admin})),
+        # Аутентификация: bcrypt дорогой, поэтому запросов меньше.
+        Scenario("POST", "/auth/register", lambda ctx, i: _ret({"json": {
+            "username": f"bench_{ctx.run_id}_{i}", "email": f"bench_{ctx.run_id}_{i}@example.com",
+            "password": "password"}}),
+            after=lambda ctx, r: r.status_code == 201 and ctx.created["users"].append(r.json()["username"]),
+            max_requests=one(20)),
+        Scenario("POST", "/auth/register/admin", lambda ctx, i: _ret({"params": {"master_key": "admin"}, "json": {
+            "username": f"bench_admin_{ctx.run_id}_{i}", "email": f"bench_admin_{ctx.run_id}_{i}@example.com",
+            "password": "password"}}), max_requests=one(10)),
+        Scenario("POST", "/auth/login", lambda ctx, i: _ret({"json": {
+            "username": f"user{ctx.rng.randint(1, len(ctx.users))}", "password": "password"}}),
+            max_requests=one(50)),
+        # Запись
+        Scenario("POST", "/courses/", lambda ctx, i: _ret({"headers": ctx.admin, "json": {
+            "title": f"Bench course {ctx.run_id} {i}", "description": "Создан bench.run"}}),
+            after=_created("courses")),
+        Scenario("PUT", "/courses/{course_id}", lambda ctx, i: _ret({
+            "course_id": ctx.created["courses"][i % len(ctx.created["courses"])], "headers": ctx.admin,
+            "json": {"description": f"Изменён bench.run {i}"}})),
+        Scenario("POST", "/lessons/", lambda ctx, i: _ret({"headers": ctx.admin, "json": {
+            "course_id": ctx.created["courses"][i % len(ctx.created["courses"])], "title": f"Bench lesson {i}"}}),
+            after=_created("lessons")),
+        Scenario("POST", "/lessons/{lesson_id}/materials", lambda ctx, i: _ret({
+            "lesson_id": ctx.created["lessons"][i % len(ctx.created["lessons"])], "headers": ctx.admin,
+            "json": {"title": f"Bench material {i}", "text": "Текст материала. " * 20}}),
+            after=_created("materials")),
+        Scenario("PUT", "/lessons/materials/{material_id}", lambda ctx, i: _ret({
+            "material_id": ctx.created["materials"][i % len(ctx.created["materials"])], "headers": ctx.admin,
+            "json": {"title": f"Bench material {i} (изменён)"}})),
+        Scenario("GET", "/lessons/materials/{material_id}", lambda ctx, i: _ret({
+            "material_id": ctx.rng.choice(ctx.created["materials"]), "headers": ctx.user()})),
+        Scenario("GET", "/lessons/materials/{material_id}/text", lambda ctx, i: _ret({
+            "material_id": ctx.rng.choice(ctx.created["materials"]), "headers": ctx.user()})),
+        Scenario("POST", "/progress/complete/{lesson_id}", lambda ctx, i: _ret(
+            {"lesson_id": ctx.rng.choice(ctx.lesson_ids), "headers": ctx.user()})),
+        Scenario("POST", "/progress/complete", lambda ctx, i: _ret({"headers": ctx.user(), "json": {
+            "items": ctx.rng.sample(ctx.lesson_ids, min(20, len(ctx.lesson_ids)))}})),
+        # Удаление созданного в этом прогоне (материалы -> уроки -> курсы).
+        Scenario("DELETE", "/lessons/materials/{material_id}", _with_admin(_pop_created("materials"), "material_id"),
+                 max_requests=lambda ctx: len(ctx.created["materials"])),
+        Scenario("DELETE", "/lessons/{lesson_id}", _with_admin(_pop_created("lessons"), "lesson_id"),
+                 max_requests=lambda ctx: len(ctx.created["lessons"])),
+        Scenario("DELETE", "/courses/{course_id}", _with_admin(_pop_created("courses"), "course_id"),
+                 max_requests=lambda ctx: len(ctx.created["courses"])),
+        Scenario("POST", "/auth/logout-all", _logout_user,
+                 max_requests=lambda ctx: min(10, len(ctx.created["users"]))),
+        Scenario("POST", "/admin/rebuild-counters", lambda ctx, i: _ret({"headers": ctx.admin}), max_requests=one(3)),
+        Scenario("GET", "/admin/export/{entity}", lambda ctx, i: _ret({
+            "entity": ("courses", "lessons", "materials", "progress")[i % 4], "headers": ctx.admin}),
+            max_requests=one(8)),
+        Scenario("POST", "/admin/reindex-search", lambda ctx, i: _ret({"headers": ctx.admin}), max_requests=one(2)),
+        # Первый запуск - полный пересчёт, дальше инкрементальные.
+        Scenario("POST", "/admin/analytics/refresh", lambda ctx, i: _ret({"headers": ctx.admin}), max_requests=one(3)),
+        Scenario("POST", "/admin/import", lambda ctx, i: _ret({"headers": ctx.admin, "content": _import_body(i)}),
+                 max_requests=one(3)),
+    ]
+
+
+def _import_body(i: int, courses: int = 20) -> bytes:
+    # Небольшой NDJSON: курсы по 10 уроков с одним материалом у каждого.
+    return "".join(
+        json.dumps({"title": f"Импорт {i}-{n}", "lessons": [
+            {"title": f"Урок {k}", "materials": [{"title": "Материал", "text": "Текст"}]} for k in range(10)
+        ]}, ensure_ascii=False) + "\n"
+        for n in range(courses)
+    ).encode()
+
+
+async def _ret(value: dict) -> dict:
+    return value
+
+
+def _with_admin(build, param: str):
+    async def wrapped(ctx: Context, i: int) -> dict:
+        return {param: (await build(ctx, i))["id"], "headers": ctx.admin}
+    return wrapped
+
+
+async def run_scenario(ctx: Context, scenario: Scenario, requests: int, concurrency: int) -> dict:
+    if scenario.max_requests is not None:
+        requests = min(requests, scenario.max_requests(ctx))
+    latencies, queries, statuses = [], [], {}
+    indexes = iter(range(requests))
+
+    async def worker():
+        for i in indexes:
+            spec = await scenario.build(ctx, i)
+            params = {k: v for k, v in spec.items() if k not in ("headers", "params", "json", "content")}
+            started_at = time.perf_counter()
+            response = await ctx.client.request(
+                scenario.method,
+                scenario.route.format(**params),
+                headers=spec.get("headers"),
+                params=spec.get("params"),
+                json=spec.get("json"),
+                content=spec.get("content"),
+            )
+            latencies.append(time.perf_counter() - started_at)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            match = SERVER_TIMING_QUERIES.search(response.headers.get("server-timing", ""))
+            if match:
+                queries.append(int(match.group(1)))
+            if scenario.after is not None:
+                scenario.after(ctx, response)
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started_at
+    ms = lambda seconds: round(seconds * 1000, 2)  # noqa: E731
+    return {
+        "name": scenario.name,
+        "requests": len(latencies),
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "errors": sum(count for code, count in statuses.items() if code >= 500),
+        "p50_ms": ms(_percentile(latencies, 0.50)),
+        "p95_ms": ms(_percentile(latencies, 0.95)),
+        "p99_ms": ms(_percentile(latencies, 0.99)),
+        "mean_ms": ms(sum(latencies) / len(latencies)) if latencies else 0.0,
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed and latencies else 0.0,
+        "queries_mean": round(sum(queries) / len(queries), 2) if queries else None,
+        "queries_max": max(queries, default=None),
+    }
+
+
+async def load_dataset(ctx: Context, users: int) -> None:
+    from sqlalchemy import select
+
+    from app.database.database import AsyncSessionLocal
+    from app.models.course import Course
+    from app.models.lesson import Lesson
+
+    async with AsyncSessionLocal() as db:
+        ctx.course_ids = list((await db.scalars(select(Course.id).order_by(Course.id))).all())
+        ctx.lesson_ids = list((await db.scalars(select(Lesson.id).order_by(Lesson.id))).all())
+    if not ctx.course_ids or not ctx.lesson_ids:
+        raise SystemExit("База пуста - сначала запустите python -m bench.seed")
+    ctx.admin = await ctx.login("bench_admin")
+    ctx.users = [await ctx.login(f"user{i}") for i in range(1, users + 1)]
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline_path: str) -> None:
+    baseline = {row["name"]: row for row in json.loads(Path(baseline_path).read_text())["results"]}
+    print(f"\nсравнение с {baseline_path} (p95, запросы в БД):")
+    for row in results["results"]:
+        old = baseline.get(row["name"])
+        if old is None or not old["p95_ms"]:
+            continue
+        delta = (row["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100
+        print(f"  {row['name']:<42} {old['p95_ms']:>8.2f} -> {row['p95_ms']:>8.2f} ms ({delta:+.0f}%)"
+              f"  queries {old['queries_mean']} -> {row['queries_mean']}")
+
+
+async def run(args) -> dict:
+    import httpx
+
+    from app.database.database import engine
+    from app.main import app
+
+    for handler in app.router.on_startup:
+        await handler()
+    ctx_rng = random.Random(args.seed)
+    run_id = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            ctx = Context(client, ctx_rng, run_id)
+            await load_dataset(ctx, args.users)
+            scenarios = build_scenarios()
+            if args.only:
+                scenarios = [s for s in scenarios if any(part in s.name for part in args.only)]
+
+            documented = {
+                f"{method.upper()} {path}" for path, ops in app.openapi()["paths"].items() for method in ops
+            }
+            uncovered = sorted(documented - {s.name for s in build_scenarios()})
+
+            results = []
+            for scenario in scenarios:
+                row = await run_scenario(ctx, scenario, args.requests, args.concurrency)
+                results.append(row)
+                print(
+                    f"{row['name']:<42} n={row['requests']:<5} p50={row['p50_ms']:>8.2f} "
+                    f"p95={row['p95_ms']:>8.2f} p99={row['p99_ms']:>8.2f} ms "
+                    f"{row['throughput_rps']:>8.1f} rps  queries={row['queries_mean']}  {row['statuses']}"
+                )
+    finally:
+        for handler in app.router.on_shutdown:
+            await handler()
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "database": engine.url.get_backend_name(),
+            "python": platform.python_version(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "users": args.users,
+            "seed": args.seed,
+            "env": {name: os.getenv(name) for name in REPORTED_ENV if os.getenv(name) is not None},
+            "uncovered_routes": uncovered,
+        },
+        "results": results,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Запросов на сценарий")
+    parser.add_argument("--concurrency", type=int, default=8, help="Одновременных клиентов")
+    parser.add_argument("--users", type=int, default=20, help="Сколько пользователей user1..N авторизовать")
+    parser.add_argument("--seed", type=int, default=42, help="Зерно выбора id - для воспроизводимости")
+    parser.add_argument("--only", nargs="*", help="Запускать только сценарии, в имени которых есть подстрока")
+    parser.add_argument("--output", help="Файл результатов (по умолчанию bench/results/<время>-<коммит>.json)")
+    parser.add_argument("--compare", help="Файл прошлого прогона для сравнения")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if not os.getenv("DATABASE_URL"):
+        # Без базы - временная SQLite с небольшим набором данных.
+        os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+        from bench import seed
+        seed.main(["--users", "200", "--courses", "50", "--seed", str(args.seed)])
+
+    results = asyncio.run(run(args))
+    output = Path(args.output) if args.output else (
+        RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{results['meta']['commit'] or 'nogit'}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, ensure_ascii=False, indent=2))
+    print(f"\nрезультаты: {output}")
+    if results["meta"]["uncovered_routes"]:
+        print("маршруты без сценария:", ", ".join(results["meta"]["uncovered_routes"]))
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""
+Генератор тестовых данных для нагрузочных замеров: пользователи, курсы, уроки,
+материалы и прогресс с неравномерным распределением (несколько больших популярных
+курсов и длинный хвост маленьких, немногие активные пользователи проходят большую
+часть уроков). Строки вставляются пачками напрямую в таблицы app.models.
+
+    python -m bench.seed --users 1000 --courses 200
+    DATABASE_URL=postgresql+asyncpg://... python -m bench.seed --seed 7
+
+Одинаковые параметры и --seed дают одинаковый набор данных. Пароль у всех
+пользователей - "password"; администратор - bench_admin.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select
+
+from app.database.bulk import insert_returning_ids
+from app.models.course import Course
+from app.models.lesson import Lesson
+from app.models.material import Material
+from app.models.progress import Progress
+from app.models.user import User
+
+PASSWORD = "password"
+ADMIN_USERNAME = "bench_admin"
+BATCH_SIZE = 1000
+# Начало расписания; от него же отсчитываются даты прохождения - без привязки к текущему времени.
+SCHEDULE_START = datetime(2030, 1, 1, 9, 0)
+
+
+def zipf_weights(count: int, exponent: float) -> list[float]:
+    # Вес i-го элемента ~ 1 / i^s: первые элементы гораздо популярнее остальных.
+    return [1 / (rank ** exponent) for rank in range(1, count + 1)]
+
+
+def generate(args, hashed_password: str) -> dict:
+    """Строит строки всех таблиц; внешние ключи - порядковые номера, id назначит БД."""
+    rng = random.Random(args.seed)
+
+    users = [
+        {"username": ADMIN_USERNAME, "email": f"{ADMIN_USERNAME}@example.com",
+         "hashed_password": hashed_password, "is_admin": True}
+    ] + [
+        {"username": f"user{i}", "email": f"user{i}@example.com",
+         "hashed_password": hashed_password, "is_admin": False}
+        for i in range(1, args.users + 1)
+    ]
+
+    courses = [
+        {"title": f"Курс {i}", "description": None if i % 4 == 0 else f"Описание курса {i}. " * rng.randint(1, 8)}
+        for i in range(1, args.courses + 1)
+    ]
+
+    # Количество уроков: у первых курсов до max_lessons, у хвоста - единицы.
+    lessons, course_lessons = [], []
+    for course_index, weight in enumerate(zipf_weights(args.courses, 0.8)):
+        count = max(1, round(args.max_lessons * weight * rng.uniform(0.7, 1.0)))
+        start = SCHEDULE_START + timedelta(days=rng.randint(0, 365))
+        indexes = []
+        for n in range(count):
+            indexes.append(len(lessons))
+            lessons.append({
+                "course_index": course_index,
+                "title": f"Урок {n + 1}",
+                "scheduled_at": start + timedelta(days=7 * n, minutes=rng.choice((0, 0, 30, 90))),
+            })
+        course_lessons.append(indexes)
+
+    materials = []
+    for lesson_index in range(len(lessons)):
+        for n in range(rng.choice(args.materials_choices)):
+            size = int(rng.paretovariate(1.5) * 200)
+            materials.append({
+                "lesson_index": lesson_index,
+                "title": f"Материал {n + 1}",
+                "text": ("Текст материала. " * (size // 17 + 1))[:size] if n % 3 != 2 else None,
+            })
+
+    # Прогресс: активность пользователя и популярность курса распределены по Ципфу;
+    # уроки проходятся по порядку, с начала курса.
+    progress = []
+    course_weights = zipf_weights(args.courses, 1.1)
+    for user_index, activity in enumerate(zipf_weights(args.users, 0.6), start=1):
+        enrolled = max(1, round(args.max_enrollments * activity))
+        for course_index in set(rng.choices(range(args.courses), course_weights, k=enrolled)):
+            indexes = course_lessons[course_index]
+            done = int(len(indexes) * min(1.0, rng.betavariate(1.2, 1.8)))
+            for position, lesson_index in enumerate(indexes[:done]):
+                completed_at = lessons[lesson_index]["scheduled_at"] + timedelta(hours=rng.randint(1, 96))
+                progress.append({
+                    "user_index": user_index,
+                    "lesson_index": lesson_index,
+                    "is_completed": True,
+                    "completed_at": completed_at,
+                })
+
+    return {"users": users, "courses": courses, "lessons": lessons, "materials": materials, "progress": progress}
+
+
+async def insert_rows(conn, table, rows: list[dict]) -> None:
+    for start in range(0, len(rows), BATCH_SIZE):
+        await conn.execute(insert(table), rows[start:start + BATCH_SIZE])
+
+
+async def seed(args) -> dict:
+    from app.auth.hashing import password_hasher
+    from app.database.database import AsyncSessionLocal, engine
+    from app.progress_counters import rebuild_counters
+    from app.search.index import reindex
+
+    async with engine.connect() as conn:
+        existing = await conn.scalar(select(func.count(Course.id)))
+    if existing and not args.append:
+        raise SystemExit(f"В базе уже есть курсы ({existing}); используйте --append или пустую базу")
+
+    started_at = time.perf_counter()
+    # Один хеш на всех: bcrypt на каждого пользователя занял бы минуты.
+    data = generate(args, await password_hasher.hash(PASSWORD))
+    if args.append:
+        # Имена пользователей уникальны - при дозаписи добавляем суффикс запуска.
+        suffix = f"_{args.seed}_{int(time.time())}"
+        for user in data["users"]:
+            user["username"] += suffix
+            user["email"] = user["email"].replace("@", suffix + "@")
+
+    async with engine.begin() as conn:
+        user_ids = await insert_returning_ids(conn, User, data["users"])
+        course_ids = await insert_returning_ids(conn, Course, data["courses"])
+        lesson_ids = await insert_returning_ids(conn, Lesson, [
+            {"course_id": course_ids[row["course_index"]], "title": row["title"], "scheduled_at": row["scheduled_at"]}
+            for row in data["lessons"]
+        ])
+        await insert_rows(conn, Material, [
+            {"lesson_id": lesson_ids[row["lesson_index"]], "title": row["title"], "text": row["text"]}
+            for row in data["materials"]
+        ])
+        await insert_rows(conn, Progress, [
+            {"user_id": user_ids[row["user_index"]], "lesson_id": lesson_ids[row["lesson_index"]],
+             "is_completed": row["is_completed"], "completed_at": row["completed_at"]}
+            for row in data["progress"]
+        ])
+
+    # Денормализованные счётчики (lesson_count, прогресс по курсам) - одним пересчётом.
+    async with AsyncSessionLocal() as db:
+        await rebuild_counters(db)
+        # Строки вставлены в обход API - поисковый индекс строится заново.
+        await reindex(db)
+    await engine.dispose()
+
+    return {
+        "seed": args.seed,
+        **{table: len(rows) for table, rows in data.items()},
+        "seconds": round(time.perf_counter() - started_at, 2),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--courses", type=int, default=100)
+    parser.add_argument("--max-lessons", type=int, default=200, help="Уроков в самом большом курсе")
+    parser.add_argument("--max-enrollments", type=int, default=20, help="Курсов у самого активного пользователя")
+    parser.add_argument(
+        "--materials-choices", type=lambda value: [int(x) for x in value.split(",")], default=[0, 1, 1, 2, 3],
+        help="Из чего выбирается количество материалов урока (через запятую)",
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Зерно генератора - для воспроизводимости")
+    parser.add_argument("--append", action="store_true", help="Дописать данные в непустую базу")
+    parser.add_argument("--no-migrate", action="store_true", help="Не применять миграции перед заполнением")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if not args.no_migrate:
+        from app.database.migrations import upgrade
+        upgrade()
+    print(json.dumps(asyncio.run(seed(args)), ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Сравнение сериализации списков каталога: обычный путь FastAPI (валидация response_model
+каждой строки + JSON-энкодер pydantic) и быстрый (кортежи колонок -> orjson).
+
+Проверяет побайтовое совпадение ответов и печатает пропускную способность.
+
+    python -m bench.serialization --rows 200 --seconds 1
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List
+
+from pydantic import TypeAdapter
+
+from app.api.fast_json import dumps, orjson, row_dicts, schema_columns
+from app.models.course import Course
+from app.models.lesson import Lesson
+from app.models.material import Material
+from app.schemas.course import CourseOut
+from app.schemas.lesson import LessonOut, LessonWithProgress
+from app.schemas.material import MaterialOut
+
+
+def make_cases(rows: int) -> dict:
+    base = datetime(2030, 1, 1, 9, 0, 0)
+    courses = [
+        Course(id=i, title=f"Курс №{i}", description=None if i % 3 else f"Описание \"{i}\"\n")
+        for i in range(1, rows + 1)
+    ]
+    lessons = [
+        Lesson(
+            id=i,
+            course_id=1,
+            title=f"Урок {i}",
+            # Встречаются и наивные даты, и UTC, и даты с микросекундами.
+            scheduled_at=(base + timedelta(hours=i, microseconds=i * 7)).replace(
+                tzinfo=timezone.utc if i % 2 else None
+            ),
+        )
+        for i in range(1, rows + 1)
+    ]
+    materials = [
+        Material(id=i, lesson_id=1, title=f"Материал {i}", text="Текст 🎓 " * 20 if i % 4 else None)
+        for i in range(1, rows + 1)
+    ]
+    progress = [
+        {"id": l.id, "title": l.title, "scheduled_at": l.scheduled_at, "is_completed": bool(l.id % 2)}
+        for l in lessons
+    ]
+
+    def columns(schema, model, objects):
+        # То, что вернул бы select(*schema_columns(...)): кортежи в порядке полей схемы.
+        names = [column.key for column in schema_columns(schema, model)]
+        return [tuple(getattr(obj, name) for name in names) for obj in objects]
+
+    return {
+        "courses": (CourseOut, courses, columns(CourseOut, Course, courses)),
+        "lessons": (LessonOut, lessons, columns(LessonOut, Lesson, lessons)),
+        "materials": (MaterialOut, materials, columns(MaterialOut, Material, materials)),
+        "progress": (LessonWithProgress, progress, [tuple(p.values()) for p in progress]),
+    }
+
+
+def standard_path(schema, objects) -> bytes:
+    # Как FastAPI с response_model: валидация каждой строки и dump_json.
+    adapter = TypeAdapter(List[schema])
+    value = adapter.validate_python(objects, from_attributes=True)
+    return adapter.dump_json(value)
+
+
+def fast_path(schema, rows) -> bytes:
+    return dumps(row_dicts(rows, list(schema.model_fields)))
+
+
+def throughput(func: Callable[[], bytes], seconds: float) -> float:
+    calls = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        func()
+        calls += 1
+    return calls / seconds
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200, help="Строк на странице")
+    parser.add_argument("--seconds", type=float, default=1.0, help="Время замера на каждый путь")
+    args = parser.parse_args()
+
+    print(f"encoder: {'orjson' if orjson is not None else 'json (orjson не установлен)'}, rows: {args.rows}")
+    failed = False
+    for name, (schema, objects, rows) in make_cases(args.rows).items():
+        expected = standard_path(schema, objects)
+        actual = fast_path(schema, rows)
+        if expected != actual:
+            failed = True
+            print(f"{name}: ответы различаются")
+            continue
+        slow = throughput(lambda: standard_path(schema, objects), args.seconds)
+        fast = throughput(lambda: fast_path(schema, rows), args.seconds)
+        print(
+            f"{name:<10} identical ({len(actual)} bytes)  "
+            f"standard {slow:8.0f} pages/s  fast {fast:8.0f} pages/s  x{fast / slow:.1f}"
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,41 @@
+"""users.token_version и индекс для постраничной выборки уроков
+
+Revision ID: 0002_token_version_lesson_keyset
+Revises: 0001_initial
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_token_version_lesson_keyset"
+down_revision: Union[str, Sequence[str], None] = "0001_initial"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.add_column(
+            sa.Column("token_version", sa.Integer(), nullable=False, server_default="0")
+        )
+
+    # Уроки без даты не попадают в ключ сортировки - проставляем текущее время.
+    op.execute("UPDATE lessons SET scheduled_at = CURRENT_TIMESTAMP WHERE scheduled_at IS NULL")
+    op.create_index(
+        "ix_lessons_course_id_scheduled_at_id",
+        "lessons",
+        ["course_id", "scheduled_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_lessons_course_id_scheduled_at_id", table_name="lessons")
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_column("token_version")
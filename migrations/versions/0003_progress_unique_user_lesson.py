@@ -0,0 +1,52 @@
+"""Уникальный индекс progress(user_id, lesson_id) с удалением дублей
+
+Revision ID: 0003_progress_unique_user_lesson
+Revises: 0002_token_version_lesson_keyset
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_progress_unique_user_lesson"
+down_revision: Union[str, Sequence[str], None] = "0002_token_version_lesson_keyset"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Из дублей оставляем последнюю запись, но если хоть одна была пройдена -
+    # оставшаяся тоже считается пройденной.
+    op.execute(
+        """
+        UPDATE progress SET is_completed = TRUE
+        WHERE id IN (
+            SELECT MAX(id) FROM progress
+            GROUP BY user_id, lesson_id
+            HAVING COUNT(*) > 1
+               AND MAX(CASE WHEN is_completed THEN 1 ELSE 0 END) = 1
+        )
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM progress
+        WHERE id NOT IN (SELECT MAX(id) FROM progress GROUP BY user_id, lesson_id)
+        """
+    )
+    op.create_index(
+        "ix_progress_user_id_lesson_id",
+        "progress",
+        ["user_id", "lesson_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_progress_user_id_lesson_id", table_name="progress")
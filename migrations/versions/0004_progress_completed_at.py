@@ -0,0 +1,30 @@
+"""progress.completed_at
+
+Revision ID: 0004_progress_completed_at
+Revises: 0003_progress_unique_user_lesson
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_progress_completed_at"
+down_revision: Union[str, Sequence[str], None] = "0003_progress_unique_user_lesson"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("progress") as batch_op:
+        batch_op.add_column(sa.Column("completed_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("progress") as batch_op:
+        batch_op.drop_column("completed_at")
@@ -0,0 +1,56 @@
+"""Счётчики прогресса: courses.lesson_count и course_progress_counters
+
+Revision ID: 0005_progress_counters
+Revises: 0004_progress_completed_at
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_progress_counters"
+down_revision: Union[str, Sequence[str], None] = "0004_progress_completed_at"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("courses") as batch_op:
+        batch_op.add_column(
+            sa.Column("lesson_count", sa.Integer(), nullable=False, server_default="0")
+        )
+    op.create_table(
+        "course_progress_counters",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("course_id", sa.Integer(), nullable=False),
+        sa.Column("completed_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.ForeignKeyConstraint(["course_id"], ["courses.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "course_id"),
+    )
+
+    op.execute(
+        "UPDATE courses SET lesson_count = "
+        "(SELECT COUNT(*) FROM lessons WHERE lessons.course_id = courses.id)"
+    )
+    op.execute(
+        """
+        INSERT INTO course_progress_counters (user_id, course_id, completed_count)
+        SELECT progress.user_id, lessons.course_id, COUNT(progress.id)
+        FROM progress JOIN lessons ON lessons.id = progress.lesson_id
+        WHERE progress.is_completed = TRUE
+        GROUP BY progress.user_id, lessons.course_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("course_progress_counters")
+    with op.batch_alter_table("courses") as batch_op:
+        batch_op.drop_column("lesson_count")
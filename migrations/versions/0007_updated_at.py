@@ -0,0 +1,46 @@
+"""updated_at у каталога и прогресса для инкрементальной выгрузки
+
+Revision ID: 0007_updated_at
+Revises: 0006_catalog_versions
+Create Date: 2026-10-17 00:00:00
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_updated_at"
+down_revision: Union[str, Sequence[str], None] = "0006_catalog_versions"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("courses", "lessons", "materials", "progress")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Существующие строки считаем изменёнными в момент миграции - первая
+    # инкрементальная выгрузка после неё отдаст всё.
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    for table in TABLES:
+        op.add_column(table, sa.Column("updated_at", sa.DateTime(), nullable=True))
+        op.execute(
+            sa.table(table, sa.column("updated_at", sa.DateTime()))
+            .update()
+            .values(updated_at=now)
+        )
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column("updated_at", existing_type=sa.DateTime(), nullable=False)
+        op.create_index(f"ix_{table}_updated_at_id", table, ["updated_at", "id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.drop_index(f"ix_{table}_updated_at_id", table_name=table)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column("updated_at")
@@ -0,0 +1,73 @@
+"""materials.text хранится сжатым (gzip)
+
+Revision ID: 0008_material_text_gzip
+Revises: 0007_updated_at
+Create Date: 2026-10-17 00:00:00
+
+"""
+import gzip
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_material_text_gzip"
+down_revision: Union[str, Sequence[str], None] = "0007_updated_at"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+# Преобразования зафиксированы в миграции и не зависят от кода приложения.
+def compress_text(value: str) -> bytes:
+    return gzip.compress(value.encode("utf-8"), compresslevel=9, mtime=0)
+
+
+def decompress_text(value: bytes) -> str:
+    return gzip.decompress(value).decode("utf-8")
+
+
+def _convert(source_type, target_type, convert) -> None:
+    # Тексты перекодируются в Python пачками: во временную колонку, затем она
+    # занимает место исходной.
+    op.add_column("materials", sa.Column("text_new", target_type, nullable=True))
+    materials = sa.table(
+        "materials",
+        sa.column("id", sa.Integer()),
+        sa.column("text", source_type),
+        sa.column("text_new", target_type),
+    )
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(materials.c.id, materials.c.text)
+            .where(materials.c.id > last_id, materials.c.text.is_not(None))
+            .order_by(materials.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            materials.update()
+            .where(materials.c.id == sa.bindparam("row_id"))
+            .values(text_new=sa.bindparam("value")),
+            [{"row_id": row.id, "value": convert(row.text)} for row in rows],
+        )
+        last_id = rows[-1].id
+    with op.batch_alter_table("materials") as batch_op:
+        batch_op.drop_column("text")
+        batch_op.alter_column("text_new", new_column_name="text", existing_type=target_type)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _convert(sa.String(), sa.LargeBinary(), compress_text)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _convert(sa.LargeBinary(), sa.String(), decompress_text)
@@ -0,0 +1,46 @@
+"""Полнотекстовый индекс search_entries (только PostgreSQL)
+
+Revision ID: 0009_search_entries
+Revises: 0008_material_text_gzip
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009_search_entries"
+down_revision: Union[str, Sequence[str], None] = "0008_material_text_gzip"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # На других СУБД поиск работает по индексу в памяти процесса - таблица не нужна.
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.create_table(
+        "search_entries",
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column("document", postgresql.TSVECTOR(), nullable=False),
+        sa.PrimaryKeyConstraint("kind", "entity_id"),
+    )
+    op.create_index(
+        "ix_search_entries_document", "search_entries", ["document"], postgresql_using="gin"
+    )
+    # Тексты материалов хранятся сжатыми, поэтому индекс заполняется из приложения:
+    # python -m app.search.index
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.drop_index("ix_search_entries_document", table_name="search_entries")
+    op.drop_table("search_entries")
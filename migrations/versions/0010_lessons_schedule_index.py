@@ -0,0 +1,31 @@
+"""Индекс lessons(scheduled_at, course_id) для календаря
+
+Revision ID: 0010_lessons_schedule_index
+Revises: 0009_search_entries
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010_lessons_schedule_index"
+down_revision: Union[str, Sequence[str], None] = "0009_search_entries"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_lessons_scheduled_at_course_id",
+        "lessons",
+        ["scheduled_at", "course_id"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_lessons_scheduled_at_course_id", table_name="lessons")
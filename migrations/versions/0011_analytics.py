@@ -0,0 +1,64 @@
+"""Сводные таблицы аналитики прохождения курсов
+
+Revision ID: 0011_analytics
+Revises: 0010_lessons_schedule_index
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0011_analytics"
+down_revision: Union[str, Sequence[str], None] = "0010_lessons_schedule_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "course_analytics",
+        sa.Column("course_id", sa.Integer(), nullable=False),
+        sa.Column("lesson_count", sa.Integer(), nullable=False),
+        sa.Column("learners", sa.Integer(), nullable=False),
+        sa.Column("completers", sa.Integer(), nullable=False),
+        sa.Column("completions", sa.Integer(), nullable=False),
+        sa.Column("active_learners", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("course_id"),
+    )
+    op.create_table(
+        "lesson_analytics",
+        sa.Column("lesson_id", sa.Integer(), nullable=False),
+        sa.Column("course_id", sa.Integer(), nullable=False),
+        sa.Column("completions", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("lesson_id"),
+    )
+    op.create_index("ix_lesson_analytics_course_id", "lesson_analytics", ["course_id"])
+    # Пересчёт сводки по курсу читает счётчики прогресса только этого курса.
+    op.create_index(
+        "ix_course_progress_counters_course_id", "course_progress_counters", ["course_id"]
+    )
+    op.create_table(
+        "analytics_state",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("watermark", sa.DateTime(), nullable=True),
+        sa.Column("refreshed_at", sa.DateTime(), nullable=True),
+        sa.Column("duration_ms", sa.Float(), nullable=True),
+        sa.Column("courses", sa.Integer(), nullable=False),
+        sa.Column("lessons", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("analytics_state")
+    op.drop_index("ix_course_progress_counters_course_id", table_name="course_progress_counters")
+    op.drop_index("ix_lesson_analytics_course_id", table_name="lesson_analytics")
+    op.drop_table("lesson_analytics")
+    op.drop_table("course_analytics")